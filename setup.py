@@ -3,7 +3,7 @@ import sys
 from setuptools import setup, find_packages
 
 install_requires = (["windows-curses; platform_system == 'Windows'"],)
-extras_require = {"gui": ["pygame"]}
+extras_require = {"gui": ["pygame"], "sim": ["numpy"]}
 
 try:
     import pygame  # noqa: F401
@@ -27,6 +27,11 @@ setup(
     entry_points={
         "console_scripts": [
             "carreras=carreras.main:main",
+            "carreras-sim=carreras.simulation:main",
+            "carreras-oddstable=carreras.oddstable:main",
+            "carreras-tournament=carreras.tournament:main",
+            "carreras-sweep=carreras.sweep:main",
+            "carreras-compare=carreras.compare:main",
         ],
     },
 )
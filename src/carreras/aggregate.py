@@ -0,0 +1,514 @@
+"""Constant-memory streaming aggregators of race summaries"""
+
+import math
+import os
+import random
+from abc import ABC, abstractmethod
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from carreras.simulation import SHARD_SIZE, RaceSummary, race_summaries, shard_seed
+
+
+class Aggregator(ABC):
+    """
+    Consumes a stream of race summaries in constant memory.
+
+    Aggregators of the same kind and settings built from different shards
+    merge into the aggregate of all of them. Numeric aggregators read one
+    field of the summaries, given by name.
+    """
+
+    @abstractmethod
+    def add(self, summary: RaceSummary):
+        """
+        Counts one race.
+        Args:
+            summary (RaceSummary): The summary of the race.
+        """
+
+    @abstractmethod
+    def merge(self, other: "Aggregator"):
+        """
+        Adds the races counted by another aggregator of the same kind.
+        Args:
+            other (Aggregator): The aggregator to merge in.
+        """
+
+    @abstractmethod
+    def empty(self) -> "Aggregator":
+        """
+        Returns a new aggregator with the same settings and no races.
+        Returns:
+            Aggregator: The empty aggregator.
+        """
+
+    def consume(self, summaries: Iterable[RaceSummary]) -> "Aggregator":
+        """
+        Counts every race of a stream.
+        Args:
+            summaries: The stream.
+        Returns:
+            Aggregator: The aggregator itself.
+        """
+        add = self.add
+        for summary in summaries:
+            add(summary)
+        return self
+
+
+class WinCounter(Aggregator):
+    """
+    Counts the races won by every suit.
+    Attributes:
+        wins (Counter): Races won per suit.
+        races (int): Races counted.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty WinCounter.
+        """
+        self.wins = Counter()
+        self.races = 0
+
+    def add(self, summary: RaceSummary):
+        """
+        Counts the winner of one race.
+        Args:
+            summary (RaceSummary): The summary of the race.
+        """
+        self.wins[summary.winner] += 1
+        self.races += 1
+
+    def merge(self, other: "WinCounter"):
+        """
+        Adds the wins counted by another WinCounter.
+        Args:
+            other (WinCounter): The counter to merge in.
+        """
+        self.wins.update(other.wins)
+        self.races += other.races
+
+    def empty(self) -> "WinCounter":
+        """
+        Returns a new WinCounter with no races.
+        Returns:
+            WinCounter: The empty counter.
+        """
+        return WinCounter()
+
+    def rates(self) -> Dict[str, float]:
+        """
+        Returns the share of races won by every suit.
+        Returns:
+            dict: The win rate of every suit that won a race.
+        """
+        return {suit: wins / self.races for suit, wins in self.wins.items()}
+
+
+class Welford(Aggregator):
+    """
+    Mean and variance of a field, by Welford's online algorithm.
+    Attributes:
+        field (str): The summary field measured.
+        count (int): Races counted.
+        mean (float): The running mean.
+    """
+
+    def __init__(self, field: str = "steps"):
+        """
+        Initializes an empty Welford.
+        Args:
+            field (str): The summary field measured.
+        """
+        self.field = field
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, summary: RaceSummary):
+        """
+        Updates the mean and variance with the field of one race.
+        Args:
+            summary (RaceSummary): The summary of the race.
+        """
+        value = getattr(summary, self.field)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def merge(self, other: "Welford"):
+        """
+        Combines the moments of another Welford of the same field.
+        Args:
+            other (Welford): The aggregator to merge in.
+        """
+        # Chan et al. pairwise update
+        count = self.count + other.count
+        if not other.count:
+            return
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count = count
+
+    def empty(self) -> "Welford":
+        """
+        Returns a new Welford of the same field with no races.
+        Returns:
+            Welford: The empty aggregator.
+        """
+        return Welford(self.field)
+
+    @property
+    def variance(self) -> float:
+        """
+        Returns the sample variance.
+        Returns:
+            float: The variance, 0 for fewer than two races.
+        """
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        """
+        Returns the sample standard deviation.
+        Returns:
+            float: The standard deviation.
+        """
+        return math.sqrt(self.variance)
+
+
+class Histogram(Aggregator):
+    """
+    Counts a field in fixed-width bins, plus underflow and overflow.
+    Attributes:
+        field (str): The summary field counted.
+        low (float): The lower edge of the first bin.
+        width (float): The width of every bin.
+        counts (list): Races per bin.
+        underflow (int): Races below low.
+        overflow (int): Races at or above the upper edge of the last bin.
+    """
+
+    def __init__(
+        self, field: str = "steps", low: float = 0, high: float = 100, bins: int = 50
+    ):
+        """
+        Initializes an empty Histogram.
+        Args:
+            field (str): The summary field counted.
+            low (float): The lower edge of the first bin.
+            high (float): The upper edge of the last bin.
+            bins (int): The number of bins.
+        """
+        self.field = field
+        self.low = low
+        self.high = high
+        self.width = (high - low) / bins
+        self.counts = [0] * bins
+        self.underflow = 0
+        self.overflow = 0
+
+    def add(self, summary: RaceSummary):
+        """
+        Counts the field of one race in its bin.
+        Args:
+            summary (RaceSummary): The summary of the race.
+        """
+        value = getattr(summary, self.field)
+        if value < self.low:
+            self.underflow += 1
+            return
+        index = int((value - self.low) // self.width)
+        if index >= len(self.counts):
+            self.overflow += 1
+        else:
+            self.counts[index] += 1
+
+    def merge(self, other: "Histogram"):
+        """
+        Adds the counts of another Histogram with the same bins.
+        Args:
+            other (Histogram): The histogram to merge in.
+        Raises:
+            ValueError: If the bins differ.
+        """
+        shape = (self.low, self.high, len(self.counts))
+        if (other.low, other.high, len(other.counts)) != shape:
+            raise ValueError("Histograms with different bins cannot be merged")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+
+    def empty(self) -> "Histogram":
+        """
+        Returns a new Histogram with the same bins and no races.
+        Returns:
+            Histogram: The empty histogram.
+        """
+        return Histogram(self.field, self.low, self.high, len(self.counts))
+
+    def edges(self) -> List[float]:
+        """
+        Returns the edges of the bins.
+        Returns:
+            list: The bins + 1 edges, from low to high.
+        """
+        return [self.low + n * self.width for n in range(len(self.counts) + 1)]
+
+
+class QuantileSketch(Aggregator):
+    """
+    Streaming quantiles of a field with a bounded relative error.
+
+    Values are counted in logarithmic buckets, bucket k holding the values
+    in (gamma^(k-1), gamma^k] with gamma = (1 + alpha) / (1 - alpha), so any
+    quantile is returned within a relative error alpha. The number of
+    buckets only grows with the logarithm of the range of the values, and
+    is capped by collapsing the lowest ones. Sketches with the same alpha
+    merge by adding their buckets.
+    Attributes:
+        field (str): The summary field measured.
+        alpha (float): The relative accuracy.
+        count (int): Races counted.
+    """
+
+    def __init__(
+        self, field: str = "steps", alpha: float = 0.01, max_buckets: int = 2048
+    ):
+        """
+        Initializes an empty QuantileSketch.
+        Args:
+            field (str): The summary field measured.
+            alpha (float): The relative accuracy, between 0 and 1.
+            max_buckets (int): The most buckets kept.
+        """
+        self.field = field
+        self.alpha = alpha
+        self.max_buckets = max_buckets
+        self._gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: Dict[int, int] = {}
+        self._zeros = 0
+        self.count = 0
+
+    def add(self, summary: RaceSummary):
+        """
+        Counts the field of one race in its bucket.
+        Args:
+            summary (RaceSummary): The summary of the race.
+        """
+        value = getattr(summary, self.field)
+        self.count += 1
+        if value <= 0:
+            self._zeros += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self._buckets[key] = self._buckets.get(key, 0) + 1
+        if len(self._buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        """
+        Folds the lowest buckets into one to keep within max_buckets.
+        """
+        keys = sorted(self._buckets)
+        excess = len(keys) - self.max_buckets
+        target = keys[excess]
+        for key in keys[:excess]:
+            self._buckets[target] += self._buckets.pop(key)
+
+    def merge(self, other: "QuantileSketch"):
+        """
+        Adds the buckets of another sketch with the same accuracy.
+        Args:
+            other (QuantileSketch): The sketch to merge in.
+        Raises:
+            ValueError: If the accuracy differs.
+        """
+        if other.alpha != self.alpha:
+            raise ValueError("Sketches with different accuracy cannot be merged")
+        for key, count in other._buckets.items():
+            self._buckets[key] = self._buckets.get(key, 0) + count
+        self._zeros += other._zeros
+        self.count += other.count
+        if len(self._buckets) > self.max_buckets:
+            self._collapse()
+
+    def empty(self) -> "QuantileSketch":
+        """
+        Returns a new sketch with the same settings and no races.
+        Returns:
+            QuantileSketch: The empty sketch.
+        """
+        return QuantileSketch(self.field, self.alpha, self.max_buckets)
+
+    def quantile(self, q: float) -> float:
+        """
+        Returns an estimate of a quantile.
+        Args:
+            q (float): The quantile, between 0 and 1.
+        Returns:
+            float: The estimate, NaN when nothing was counted.
+        """
+        if not self.count:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = self._zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self._buckets):
+            seen += self._buckets[key]
+            if rank < seen:
+                return 2 * self._gamma**key / (self._gamma + 1)
+        return 2 * self._gamma ** max(self._buckets) / (self._gamma + 1)
+
+
+class Pipeline(Aggregator):
+    """
+    Feeds every race to several aggregators.
+    Attributes:
+        aggregators (list): The aggregators fed.
+    """
+
+    def __init__(self, *aggregators: Aggregator):
+        """
+        Initializes a Pipeline.
+        Args:
+            *aggregators: The aggregators to feed.
+        """
+        self.aggregators = list(aggregators)
+
+    def add(self, summary: RaceSummary):
+        """
+        Feeds one race to every aggregator.
+        Args:
+            summary (RaceSummary): The summary of the race.
+        """
+        for aggregator in self.aggregators:
+            aggregator.add(summary)
+
+    def merge(self, other: "Pipeline"):
+        """
+        Merges every aggregator of another Pipeline of the same shape.
+        Args:
+            other (Pipeline): The pipeline to merge in.
+        """
+        for aggregator, part in zip(self.aggregators, other.aggregators):
+            aggregator.merge(part)
+
+    def empty(self) -> "Pipeline":
+        """
+        Returns a new Pipeline of empty copies of the aggregators.
+        Returns:
+            Pipeline: The empty pipeline.
+        """
+        return Pipeline(*(aggregator.empty() for aggregator in self.aggregators))
+
+
+def aggregate_shard(
+    players: int, length: int, races: int, seed: int, aggregator: Aggregator
+) -> Aggregator:
+    """
+    Aggregates one shard of races with its own generator.
+    Args:
+        players (int): The number of players.
+        length (int): The length of the race.
+        races (int): The number of races of the shard.
+        seed (int): The seed of the shard, see shard_seed.
+        aggregator (Aggregator): An empty aggregator to fill.
+    Returns:
+        Aggregator: The filled aggregator.
+    """
+    summaries = race_summaries(players, length, races, random.Random(seed))
+    return aggregator.consume(summaries)
+
+
+def aggregate_stream(
+    aggregator: Aggregator,
+    players: int = 4,
+    length: int = 7,
+    races: Optional[int] = None,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    shard_size: int = SHARD_SIZE,
+) -> Iterator[Aggregator]:
+    """
+    Aggregates shards of races over a pool of worker processes, for as long
+    as the caller keeps iterating.
+
+    Shards are seeded like simulate_parallel and merged in order, so the
+    result does not depend on the number of workers. Only a small window of
+    shards is in flight at a time, so memory stays flat however long it runs.
+    Args:
+        aggregator (Aggregator): The aggregator to fill; its empty copies
+            go to the shards.
+        players (int): The number of players.
+        length (int): The length of the race.
+        races (int, optional): The number of races to run; None never stops.
+        seed (int): The master seed of the job.
+        workers (int, optional): The number of worker processes. Defaults to
+            the number of CPUs; 1 runs every shard in this process.
+        shard_size (int): The number of races of each shard.
+    Yields:
+        Aggregator: The aggregator itself, after every shard merged.
+    """
+
+    def shards():
+        n = 0
+        while races is None or n * shard_size < races:
+            size = shard_size
+            if races is not None:
+                size = min(shard_size, races - n * shard_size)
+            yield players, length, size, shard_seed(seed, n), aggregator.empty()
+            n += 1
+
+    if workers == 1:
+        for shard in shards():
+            aggregator.merge(aggregate_shard(*shard))
+            yield aggregator
+        return
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers) as pool:
+        running = deque()
+        for shard in shards():
+            running.append(pool.submit(aggregate_shard, *shard))
+            if len(running) >= 2 * workers:
+                aggregator.merge(running.popleft().result())
+                yield aggregator
+        while running:
+            aggregator.merge(running.popleft().result())
+            yield aggregator
+
+
+def aggregate_parallel(
+    aggregator: Aggregator,
+    players: int = 4,
+    length: int = 7,
+    races: int = 1000,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    shard_size: int = SHARD_SIZE,
+) -> Aggregator:
+    """
+    Aggregates a fixed number of races, see aggregate_stream.
+    Args:
+        aggregator (Aggregator): The aggregator to fill.
+        players (int): The number of players.
+        length (int): The length of the race.
+        races (int): The number of races to run.
+        seed (int): The master seed of the job.
+        workers (int, optional): The number of worker processes.
+        shard_size (int): The number of races of each shard.
+    Returns:
+        Aggregator: The aggregator itself.
+    """
+    for _ in aggregate_stream(
+        aggregator, players, length, races, seed, workers, shard_size
+    ):
+        pass
+    return aggregator
@@ -0,0 +1,88 @@
+"""Unattended playback of races at a steady pace"""
+
+import time
+from typing import Callable, NamedTuple, Optional
+
+from carreras.game import Game
+
+
+class PlaybackStats(NamedTuple):
+    """
+    How a race was played back.
+    Attributes:
+        frames (int): Frames drawn.
+        steps (int): Steps played.
+        skipped (int): Steps played without a frame of their own.
+        elapsed (float): Seconds the playback took.
+    """
+
+    frames: int
+    steps: int
+    skipped: int
+    elapsed: float
+
+
+class Autoplay:
+    """
+    Plays races on a board without waiting for keys.
+
+    Steps are scheduled on a fixed timestep: step n of the playback is due
+    n / rate seconds after it starts, whatever drawing costs. Every frame
+    plays all the steps that are due, so when drawing cannot keep up the
+    intermediate frames are skipped and the race keeps its pace; between
+    steps the board idles until the next one is due. Without a rate the
+    race is played at full speed and only its final state is drawn.
+    Attributes:
+        rate (float): Steps per second, None or 0 for full speed.
+        clock (callable): The monotonic clock, in seconds.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = 4.0,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        """
+        Initializes an Autoplay.
+        Args:
+            rate (float, optional): Steps per second, None or 0 for full
+                speed.
+            clock (callable): The monotonic clock, in seconds.
+        """
+        self.rate = rate
+        self.clock = clock
+
+    def run(self, board, game: Game) -> PlaybackStats:
+        """
+        Plays a race to the end on a board.
+        Args:
+            board (Board): The board, curses or graphic; it must have
+                draw_game(game, wait) and idle(seconds).
+            game (Game): The race, which may already be in progress.
+        Returns:
+            PlaybackStats: How the race was played back.
+        """
+        start = self.clock()
+        first = game.step_count
+        if not self.rate:
+            game.run_to_completion()
+            board.draw_game(game, wait=False)
+            steps = game.step_count - first
+            return PlaybackStats(1, steps, max(steps - 1, 0), self.clock() - start)
+
+        rate = self.rate
+        frames = 1
+        board.draw_game(game, wait=False)
+        while not game.finished:
+            now = self.clock()
+            behind = first + int((now - start) * rate) - game.step_count
+            if behind > 0:
+                game.step_many(behind)
+                board.draw_game(game, wait=False)
+                frames += 1
+            else:
+                due = start + (game.step_count - first + 1) / rate
+                board.idle(due - now)
+        steps = game.step_count - first
+        # The first frame shows the race before any step was played
+        return PlaybackStats(frames, steps, steps - frames + 1, self.clock() - start)
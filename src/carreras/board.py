@@ -2,14 +2,66 @@
 
 import sys
 import curses
-from time import sleep
-from typing import Optional, Tuple
-from carreras.game import Game
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from carreras.game import CHANGE_MOVE, CHANGE_RESET, CHANGE_REVEAL, CHANGE_TOP, Game
 from carreras.card import Card
+from carreras.odds import OddsEstimator
+from carreras.replay import Replay
 from carreras.paraminput import ParamInputMixin
 from carreras.i18n import tr, get_language
 
 
+class FrameStats(NamedTuple):
+    """
+    What a frame cost in terminal output.
+
+    Attributes:
+        flushes (int): Times the virtual screen was sent to the terminal.
+        bytes (int): Bytes the process wrote meanwhile, -1 where the system
+            does not tell.
+        writes (int): write() calls the process made meanwhile, -1 where the
+            system does not tell.
+    """
+
+    flushes: int
+    bytes: int
+    writes: int
+
+
+def _io_counters() -> Optional[Tuple[int, int]]:
+    """
+    Reads the bytes written and write() calls of this process so far.
+
+    Returns:
+        tuple: The bytes and the calls, None if /proc/self/io is missing.
+    """
+    try:
+        with open("/proc/self/io", "rb") as file:
+            fields = dict(line.split(b": ") for line in file.read().splitlines())
+    except (OSError, ValueError):
+        return None
+    return int(fields[b"wchar"]), int(fields[b"syscw"])
+
+
+def fold_case(keys: dict) -> dict:
+    """
+    Builds a key table that also maps the other case of every letter, so a
+    key is found with a single lookup.
+
+    Args:
+        keys (dict): Key codes and their values.
+
+    Returns:
+        dict: The table; explicit entries win over folded ones.
+    """
+    table = dict(keys)
+    for key, value in keys.items():
+        if 65 <= key <= 90 or 97 <= key <= 122:
+            table.setdefault(key ^ 32, value)
+    return table
+
+
 class Board(ParamInputMixin):
     """
     Represents the game board.
@@ -20,12 +72,21 @@ class Board(ParamInputMixin):
         EXIT_KEYS (list): Keys to exit the game.
         LENGTH_VALUES (dict): Allowed values for the game length.
         PLAYER_VALUES (dict): Allowed values for the playes.
+        YES_NO_VALUES (dict): Allowed answers to a yes or no question.
         screen: The screen object for displaying the game.
         parent: The parent board, if any.
+        odds (OddsEstimator): Estimates the win probabilities shown under
+            the standings, or an OddsTable; None to hide them.
+        layout (tuple): The players and length the game windows were built
+            for, None until a game is drawn or after the screen is cleared.
+        frames (int): Frames flushed, see frame().
+        last_frame (FrameStats): What the last frame cost, None before one.
     """
 
     CARD_WIDTH = 6
     CARD_HEIGHT = 3
+    # Fill of a card face down
+    BACK = "░░░░"
     EXIT_KEYS = [113]
 
     LENGTH_VALUES = {52: 4, 53: 5, 54: 6, 55: 7}
@@ -46,12 +107,26 @@ class Board(ParamInputMixin):
         Card.KING: "👑",
     }
 
-    KEY_ACTIONS = {
-        113: ("Q", sys.exit),  # q
-        81: ("Q", sys.exit),  # Q
-        27: ("ESC", sys.exit),  # ESC
+    # Replay keys and the steps they move: , . < > 0 $, Enter leaves
+    REPLAY_KEYS = {
+        44: -1,
+        46: 1,
+        60: -10,
+        62: 10,
+        48: -sys.maxsize,
+        36: sys.maxsize,
+        10: 0,
+        13: 0,
     }
 
+    # Key tables map both cases of a letter, see fold_case
+    KEY_ACTIONS = fold_case(
+        {
+            113: ("Q", sys.exit),  # q
+            27: ("ESC", sys.exit),  # ESC
+        }
+    )
+
     def __init__(
         self,
         stdscr: Optional[curses.window] = None,
@@ -78,15 +153,27 @@ class Board(ParamInputMixin):
         self.screen.keypad(0)
         self.screen.leaveok(0)
         self.parent = parent
+        self.odds: Optional[OddsEstimator] = None
+        self.layout: Optional[Tuple[int, int]] = None
+        self._windows: Dict[str, "Board"] = {}
+        self._cards: Dict[Tuple[int, int], curses.window] = {}
+        self._drawn: Dict[Tuple[int, int], tuple] = {}
+        self._panels: Dict[str, list] = {}
+        self._watched: Optional[Game] = None
+        self.frames = 0
+        self.last_frame: Optional[FrameStats] = None
+        self._depth = 0
+        self._flushes = 0
+        self._delay: Optional[int] = None
 
         self.x_pos = 0
         self.y_pos = 0
 
         lang = get_language()
         if lang == "en":
-            self.YES_NO_VALUES = {121: 1, 110: 0, 89: 1, 78: 0}  # y/n/Y/N
+            self.YES_NO_VALUES = fold_case({121: 1, 110: 0})  # y/n
         else:
-            self.YES_NO_VALUES = {115: 1, 110: 0, 83: 1, 78: 0}  # s/n/S/N
+            self.YES_NO_VALUES = fold_case({115: 1, 110: 0})  # s/n
 
     def set_pos(self, y, x):
         """
@@ -97,55 +184,137 @@ class Board(ParamInputMixin):
 
     def clear(self):
         """
-        Clears the screen.
+        Clears the screen; the game windows are built again on the next draw.
         """
         self.screen.clear()
         self.set_pos(0, 0)
+        self.layout = None
+
+    @property
+    def root(self) -> "Board":
+        """
+        Returns the board of the whole screen, the one frames are kept by.
+        """
+        board = self
+        while board.parent is not None:
+            board = board.parent
+        return board
 
     def refresh(self):
         """
-        Refreshes the screen.
+        Refreshes the screen, or stages it for the end of the current frame.
         """
-        self.screen.refresh()
+        root = self.root
+        if root._depth:
+            self.screen.noutrefresh()
+        else:
+            self.screen.refresh()
+            root._flushes += 1
+
+    def flush(self):
+        """
+        Sends every staged window to the terminal at once.
+        """
+        curses.doupdate()
+        self.root._flushes += 1
+
+    @contextmanager
+    def frame(self) -> Iterator["Board"]:
+        """
+        Groups drawing into one logical frame.
+
+        Refreshes inside the frame only stage their windows in the virtual
+        screen, and the outermost frame sends them all to the terminal in
+        a single flush when it ends. Frames nest, and the cost of every
+        outermost frame is kept in last_frame.
+
+        Yields:
+            Board: The board itself.
+        """
+        root = self.root
+        root._depth += 1
+        before = None
+        if root._depth == 1:
+            root._flushes = 0
+            before = _io_counters()
+        try:
+            yield self
+        finally:
+            root._depth -= 1
+            if not root._depth:
+                root.flush()
+                after = _io_counters()
+                if before is None or after is None:
+                    written, writes = -1, -1
+                else:
+                    written, writes = after[0] - before[0], after[1] - before[1]
+                root.frames += 1
+                root.last_frame = FrameStats(root._flushes, written, writes)
 
     def quit(self):
         self.destroy()
         sys.exit()
 
-    def read_key(self, return_list: Optional[dict] = None) -> Optional[int]:
+    def read_key(
+        self, return_list: Optional[dict] = None, timeout: Optional[float] = None
+    ) -> Optional[int]:
         """
         Reads a key input from the user.
 
+        The wait blocks inside curses, which sleeps until the terminal has
+        input or the timeout runs out, so an idle board costs no CPU.
+
         Args:
             return_list (dict, optional): A dictionary of allowed keys and their
-                return values. Defaults to None.
+                return values, mapping both cases of a letter, see fold_case.
+                Defaults to None.
+            timeout (float, optional): Seconds to wait for every key; None
+                waits for as long as it takes.
 
         Returns:
-            The value corresponding to the key pressed.
+            The value corresponding to the key pressed, None without a
+            return_list or when no key came in time.
         """
+        self._set_timeout(timeout)
         while True:
             key = self.screen.getch()
-            while key == -1:
-                key = self.screen.getch()
-                sleep(0.1)
-            # Make key handling case-insensitive for letters
-            if 65 <= key <= 90:  # Uppercase A-Z
-                key_lower = key + 32
-            else:
-                key_lower = key
-            if key in Board.KEY_ACTIONS:
-                Board.KEY_ACTIONS[key][1]()
-            if key_lower in Board.KEY_ACTIONS:
-                Board.KEY_ACTIONS[key_lower][1]()
+            if key == -1:
+                if timeout is not None:
+                    return None
+                # Interrupted, e.g. by a signal; keep waiting
+                continue
+            action = Board.KEY_ACTIONS.get(key)
+            if action is not None:
+                action[1]()
             if not return_list:
-                return
+                return None
             if key in return_list:
                 return return_list[key]
-            if key_lower in return_list:
-                return return_list[key_lower]
             # Show error message for invalid key
             self.message(tr("Invalid key. Try again."), curses.A_BOLD)
 
+    def idle(self, seconds: float):
+        """
+        Waits without drawing, still answering the quit keys.
+
+        Args:
+            seconds (float): How long to wait; when it is not positive
+                the pending keys are still checked.
+        """
+        self.read_key(timeout=max(seconds, 0))
+
+    def _set_timeout(self, timeout: Optional[float]):
+        """
+        Sets how long getch waits for a key, only when it changes.
+
+        Args:
+            timeout (float, optional): Seconds to wait; None blocks.
+        """
+        delay = -1 if timeout is None else max(0, round(timeout * 1000))
+        if delay != self._delay:
+            self.screen.timeout(delay)
+            self._delay = delay
+
     def read_string(self) -> str:
         """
         Reads a string input from the user.
@@ -153,12 +322,15 @@ class Board(ParamInputMixin):
         Returns:
             The string value.
         """
+        self._set_timeout(None)
         return self.screen.getstr().decode("utf-8")
 
     def destroy(self):
         """
         Ends the curses window
         """
+        if self.odds is not None:
+            self.odds.close()
         curses.endwin()
 
     def message(self, message: str, attribs: int = 0):
@@ -197,8 +369,9 @@ class Board(ParamInputMixin):
         self.screen.addstr(self.y_pos + y, self.x_pos + x, s)
 
     def ask_player_count(self) -> int:
-        self.message(tr("Press Q to quit"))
-        self.message(tr("Press 2, 3, or 4 to select number of players:"))
+        with self.frame():
+            self.message(tr("Press Q to quit"))
+            self.message(tr("Press 2, 3, or 4 to select number of players:"))
         return self.read_key(Board.PLAYER_VALUES)
 
     def ask_player_names(self, count: int) -> list[str]:
@@ -207,17 +380,18 @@ class Board(ParamInputMixin):
         """
         players_names = []
         for i in range(count):
+            error = None
             while True:
-                self.message(tr("Enter name for player {num}:", num=i + 1))
+                with self.frame():
+                    if error:
+                        self.message(error, curses.A_BOLD)
+                    self.message(tr("Enter name for player {num}:", num=i + 1))
                 player_name = self.read_string().strip()
                 if not player_name:
-                    self.message(tr("The name cannot be empty."), curses.A_BOLD)
+                    error = tr("The name cannot be empty.")
                     continue
                 if player_name in players_names:
-                    self.message(
-                        tr("The name has already been used. Choose another."),
-                        curses.A_BOLD,
-                    )
+                    error = tr("The name has already been used. Choose another.")
                     continue
                 players_names.append(player_name)
                 break
@@ -235,14 +409,14 @@ class Board(ParamInputMixin):
             bool: The decision to restart
             bool: If will restart, if it will be with the same parameters
         """
-        self.clear()
         lang = get_language()
-        if lang == "en":
-            self.message(tr("Restart game? (Y/N)"))
-            restart = self.read_key(self.YES_NO_VALUES)
-        else:
-            self.message(tr("Restart game? (S/N)"))
-            restart = self.read_key(self.YES_NO_VALUES)
+        with self.frame():
+            self.clear()
+            if lang == "en":
+                self.message(tr("Restart game? (Y/N)"))
+            else:
+                self.message(tr("Restart game? (S/N)"))
+        restart = self.read_key(self.YES_NO_VALUES)
         if not restart:
             return False, False
         if lang == "en":
@@ -315,23 +489,40 @@ class Board(ParamInputMixin):
             self.screen.derwin(height, width, y * height + 1, x * width + 1),
             self,
         )
-        card.screen.box()
-        card.x_pos = 1
-        card.y_pos = 1
+        Board.paint_card(card.screen, value, suit)
+        card.refresh()
+        return card
+
+    @staticmethod
+    def paint_card(window: curses.window, value: int, suit: Optional[str] = None):
+        """
+        Paints a card on a window the size of a card, without refreshing it.
+
+        Args:
+            window (curses.window): The window of the card.
+            value (int or str): The value of the card or back fill character
+            suit (str, optional): The suit of the card. Defaults to None.
+        """
+        window.erase()
+        window.box()
         if suit:
             value = Board.FIGURES.get(value, value)
-            card.message(
+            window.addstr(
+                1,
+                1,
                 f'{value}{Board.SUITS[suit]["symbol"]}',
                 curses.color_pair(Board.SUITS[suit]["color"]),
             )
         else:
-            card.message(f"{value}", curses.color_pair(5))
-        card.refresh()
-        return card
+            window.addstr(1, 1, f"{value}", curses.color_pair(5))
 
-    def draw_game(self, game: Game):
+    def _build_layout(self, game: Game):
         """
-        Draws the game board.
+        Builds the windows of the game board for a number of players and a
+        length, and draws the parts that never change.
+
+        Args:
+            game (Game): The game to draw.
         """
         self.clear()
         lateral = self.draw_box(
@@ -353,27 +544,6 @@ class Board(ParamInputMixin):
             1,
             color_pair=3,
         )
-
-        rank = {
-            row: i + 1
-            for i, row in enumerate(
-                sorted(set(k["row"] for k in game.knights.values()), reverse=True)
-            )
-        }
-        status = sorted(
-            (
-                rank[k["row"]],
-                k["player"],
-                Board.SUITS[k["card"].suit]["symbol"],
-                curses.color_pair(Board.SUITS[k["card"].suit]["color"]),
-            )
-            for k in game.knights.values()
-        )
-        for player in status:
-            players.message(
-                f"{player[0]}:{player[1][:Board.CARD_WIDTH*2-6]:<{Board.CARD_WIDTH*2-6}}{player[2]}",
-                curses.color_pair(player[3]),
-            )
         menu = lateral.draw_box(
             (game.length + 1) * Board.CARD_HEIGHT - (game.players + 2),
             2 * (Board.CARD_WIDTH + 1) - 2,
@@ -381,8 +551,6 @@ class Board(ParamInputMixin):
             1,
             color_pair=4,
         )
-        menu.set_pos((game.length + 1) * Board.CARD_HEIGHT - (game.players + 4), 2)
-        menu.message(tr("Q: Exit"))
         body = self.draw_box(
             (game.length + 2) * Board.CARD_HEIGHT + 2,
             (game.players + 1) * (Board.CARD_WIDTH) + 2,
@@ -398,25 +566,273 @@ class Board(ParamInputMixin):
             Board.CARD_WIDTH + 1,
             4,
         )
-        finish.message(f'{tr("FINISH"):^{Board.CARD_WIDTH*(game.players)-2}}')
+        self._windows = {
+            "players": players,
+            "menu": menu,
+            "body": body,
+            "finish": finish,
+        }
+        self._paint_finish(game)
+        self._cards = {}
+        self._drawn = {}
+        self._panels = {}
+        self.layout = (game.players, game.length)
+
+    def _paint_finish(self, game: Game):
+        """
+        Paints the finish line, which the cards of the last row cover.
+
+        Args:
+            game (Game): The game drawn.
+        """
+        finish = self._windows["finish"]
+        finish.screen.erase()
+        finish.screen.attrset(curses.color_pair(4))
+        finish.screen.box()
+        finish.screen.attrset(curses.color_pair(0))
+        finish.screen.addstr(
+            1, 1, f'{tr("FINISH"):^{Board.CARD_WIDTH*(game.players)-2}}'
+        )
+
+    def _paint_panel(
+        self, name: str, color_pair: int, lines: List[tuple]
+    ) -> Optional[curses.window]:
+        """
+        Paints a box of the lateral panel, unless it already shows the lines.
+
+        Args:
+            name (str): The name of the box.
+            color_pair (int): The color pair of its border.
+            lines (list): The row, column, text and attributes of every line.
+
+        Returns:
+            curses.window: The window painted, None if it did not change.
+        """
+        if self._panels.get(name) == lines:
+            return None
+        self._panels[name] = lines
+        window = self._windows[name].screen
+        window.erase()
+        window.attrset(curses.color_pair(color_pair))
+        window.box()
+        window.attrset(curses.color_pair(0))
+        for y, x, text, attribs in lines:
+            window.addstr(y, x, text, attribs)
+        return window
+
+    def _card_window(self, x: int, y: int) -> curses.window:
+        """
+        Returns the persistent window of a card position of the body.
+
+        Args:
+            x (int): The column, 0 for the deck and the steps.
+            y (int): The row.
+
+        Returns:
+            curses.window: The window.
+        """
+        window = self._cards.get((x, y))
+        if window is None:
+            height = Board.CARD_HEIGHT
+            width = Board.CARD_WIDTH
+            window = self._windows["body"].screen.derwin(
+                height, width, y * height + 1, x * width + 1
+            )
+            self._cards[(x, y)] = window
+        return window
+
+    def draw_game(self, game: Game, wait: bool = True):
+        """
+        Draws the game board in one frame.
+
+        The windows are built once per number of players and length and kept
+        between frames. A frame only repaints the cards whose position or
+        face changed and the boxes whose text changed, and sends them to the
+        terminal in a single flush. The board watches the game it draws, so
+        after the first frame the cards to repaint come from the changes of
+        the game instead of a scan of it, see Game.watch.
+
+        Args:
+            game (Game): The game to draw.
+            wait (bool, optional): Wait for a key once drawn. Defaults to True.
+        """
+        with self.frame():
+            self._paint_game(game)
+        if wait:
+            self.read_key()
+
+    def _paint_game(self, game: Game):
+        """
+        Paints what changed on the game board and stages it.
+
+        Args:
+            game (Game): The game to draw.
+        """
+        changes = game.take_changes()
+        if self.layout != (game.players, game.length):
+            self._build_layout(game)
+            changes = None
+        if (
+            changes is None
+            or game is not self._watched
+            or any(change.kind == CHANGE_RESET for change in changes)
+        ):
+            cells = self._game_cells(game)
+            for cell in self._drawn:
+                cells.setdefault(cell, None)
+            game.watch()
+            self._watched = game
+        else:
+            cells = self._changed_cells(game, changes)
+        changed = []
+
+        rank = {
+            row: i + 1
+            for i, row in enumerate(sorted(set(game.rows), reverse=True))
+        }
+        status = sorted(
+            (
+                rank[k["row"]],
+                k["player"],
+                Board.SUITS[k["card"].suit]["symbol"],
+                curses.color_pair(Board.SUITS[k["card"].suit]["color"]),
+            )
+            for k in game.knights.values()
+        )
+        width = Board.CARD_WIDTH * 2 - 6
+        lines = [
+            (
+                n + 1,
+                1,
+                f"{player[0]}:{player[1][:width]:<{width}}{player[2]}",
+                curses.color_pair(player[3]),
+            )
+            for n, player in enumerate(status)
+        ]
+        changed.append(self._paint_panel("players", 3, lines))
+
+        lines = []
+        if self.odds is not None:
+            estimate = self.odds.poll(game)
+            for n, knight in enumerate(game.knights.values()):
+                suit = knight["card"].suit
+                if estimate.exact:
+                    odds = f"{estimate.wins[suit]:>4.0%}"
+                elif estimate.rollouts:
+                    margin = min(estimate.margins[suit] * 100, 99)
+                    odds = f"{estimate.wins[suit]:>4.0%}±{margin:.0f}"
+                else:
+                    odds = "  --"
+                lines.append(
+                    (
+                        n + 1,
+                        1,
+                        f'{Board.SUITS[suit]["symbol"]} {odds}',
+                        curses.color_pair(Board.SUITS[suit]["color"]),
+                    )
+                )
+        exit_row = (game.length + 1) * Board.CARD_HEIGHT - (game.players + 4)
+        lines.append((exit_row, 2, tr("Q: Exit"), 0))
+        changed.append(self._paint_panel("menu", 4, lines))
+
+        last = game.length + 1
+        cleared = [
+            cell for cell, face in cells.items() if face is None and cell in self._drawn
+        ]
+        for cell in cleared:
+            window = self._card_window(*cell)
+            window.erase()
+            changed.append(window)
+            del self._drawn[cell]
+        if any(y == last for _, y in cleared):
+            # An erased card took part of the finish line with it
+            self._paint_finish(game)
+            changed.append(self._windows["finish"].screen)
+            for cell in [cell for cell in self._drawn if cell[1] == last]:
+                cells.setdefault(cell, self._drawn.pop(cell))
+        for cell, face in cells.items():
+            if face is not None and self._drawn.get(cell) != face:
+                window = self._card_window(*cell)
+                Board.paint_card(window, *face)
+                changed.append(window)
+                self._drawn[cell] = face
+
+        for window in changed:
+            if window is not None:
+                window.noutrefresh()
+
+    @staticmethod
+    def _game_cells(game: Game) -> Dict[Tuple[int, int], tuple]:
+        """
+        Returns the face of every card position the game covers.
+
+        Args:
+            game (Game): The game drawn.
 
+        Returns:
+            dict: The value and suit of the card at every (column, row), or
+            the back fill and None for a card face down.
+        """
+        cells = {}
         if game.top_card is None:
-            body.draw_card(0, 0, "░░░░")
+            cells[(0, 0)] = (Board.BACK, None)
         else:
-            body.draw_card(0, 0, game.top_card.value, game.top_card.suit)
-        for n, step in game.steps.items():
-            if step["hidden"]:
-                body.draw_card(0, n, "░░░░")
+            cells[(0, 0)] = (game.top_card.value, game.top_card.suit)
+        for n, card in enumerate(game.step_cards, 1):
+            if game.hidden[n - 1]:
+                cells[(0, n)] = (Board.BACK, None)
             else:
-                body.draw_card(0, n, step["card"].value, step["card"].suit)
-        for n, knight in game.knights.items():
-            body.draw_card(
-                n,
-                knight["row"],
-                knight["card"].value,
-                knight["card"].suit,
-            )
-        self.read_key()
+                cells[(0, n)] = (card.value, card.suit)
+        for n, card in enumerate(game.knight_cards, 1):
+            cells[(n, game.rows[n - 1])] = (card.value, card.suit)
+        return cells
+
+    @staticmethod
+    def _changed_cells(game: Game, changes: list) -> Dict[Tuple[int, int], tuple]:
+        """
+        Returns the card positions some changes of the game touched.
+
+        Args:
+            game (Game): The game drawn.
+            changes (list): The changes since the last frame, see Change.
+
+        Returns:
+            dict: The face of every position touched, as in _game_cells,
+            None for a position left empty.
+        """
+        cells = {}
+        for kind, index, old, new in changes:
+            if kind == CHANGE_MOVE:
+                card = game.knight_cards[index]
+                cells[(index + 1, old)] = None
+                cells[(index + 1, new)] = (card.value, card.suit)
+            elif kind == CHANGE_REVEAL:
+                cells[(0, index + 1)] = (new.value, new.suit)
+            elif kind == CHANGE_TOP:
+                if new is None:
+                    cells[(0, 0)] = (Board.BACK, None)
+                else:
+                    cells[(0, 0)] = (new.value, new.suit)
+        return cells
+
+    def draw_replay(self, replay: Replay, step: int = 0):
+        """
+        Shows a replay, seeking with the keys in REPLAY_KEYS until Enter.
+
+        Args:
+            replay (Replay): The replay to show.
+            step (int, optional): The first step shown. Defaults to 0.
+        """
+        game = replay.seek(step)
+        while True:
+            with self.frame():
+                self.draw_game(game, wait=False)
+                self.set_pos((game.length + 2) * Board.CARD_HEIGHT + 2, 0)
+                self.message(f"{replay.position}/{replay.steps}  , . < > 0 $")
+            move = self.read_key(Board.REPLAY_KEYS)
+            if not move:
+                return
+            game = replay.seek(replay.position + move)
 
     def get_game_params(self) -> tuple[int, int, list[str]]:
         """Obtiene todos los parámetros del juego: jugadores, nombres y largo."""
@@ -1,38 +1,97 @@
 """Card"""
 
+from typing import Dict, Tuple
+
+
 class Card:
     """
     Represents a single card in a deck.
+
+    Cards are immutable flyweights: there is exactly one instance per suit
+    and value, built when the module is imported, so Card(suit, value)
+    never allocates and two cards are equal only if they are the same object.
     Attributes:
         suit (str): The suit of the card (e.g., 'coins', 'cups').
         value (int): The value of the card (1-12).
+        suit_index (int): The position of the suit in SUITS.
+        code (int): A compact integer code, suit_index * 12 + value - 1 (0-47).
     """
 
+    __slots__ = ("suit", "value", "suit_index", "code")
+
+    SUITS = ("coins", "cups", "swords", "clubs")
+    VALUES = 12
+
     JACK = 10
     KNIGHT = 11
     KING = 12
 
-    def __init__(self, suit: str, value: int):
+    _BY_KEY: Dict[Tuple[str, int], "Card"] = {}
+    BY_CODE: Tuple["Card", ...] = ()
+
+    def __new__(cls, suit: str, value: int) -> "Card":
         """
-        Initializes a Card object with the given suit and value.
+        Returns the card with the given suit and value.
         Args:
             suit (str): The suit of the card.
             value (int): The value of the card.
+        Returns:
+            Card: The shared instance of the card.
+        Raises:
+            ValueError: If there is no such card.
+        """
+        try:
+            return cls._BY_KEY[(suit, value)]
+        except KeyError:
+            raise ValueError(f"There is no {value} of {suit}") from None
+
+    @classmethod
+    def _build(cls, suit_index: int, value: int) -> "Card":
+        """
+        Builds the single instance of a card.
+        Args:
+            suit_index (int): The position of the suit in SUITS.
+            value (int): The value of the card.
+        Returns:
+            Card: The new card.
         """
-        self.suit = suit
-        self.value = value
+        card = object.__new__(cls)
+        object.__setattr__(card, "suit", cls.SUITS[suit_index])
+        object.__setattr__(card, "value", value)
+        object.__setattr__(card, "suit_index", suit_index)
+        object.__setattr__(card, "code", suit_index * cls.VALUES + value - 1)
+        return card
 
-    def __eq__(self, other: object) -> bool:
+    @classmethod
+    def from_code(cls, code: int) -> "Card":
         """
-        Compares this card with another card for equality.
+        Returns the card with the given integer code.
         Args:
-            other (Card): The card to compare with.
+            code (int): The code of the card (0-47).
+        Returns:
+            Card: The shared instance of the card.
+        """
+        return cls.BY_CODE[code]
+
+    def __setattr__(self, name: str, value: object):
+        raise AttributeError("Card is immutable")
+
+    def __delattr__(self, name: str):
+        raise AttributeError("Card is immutable")
+
+    def __hash__(self) -> int:
+        """
+        Returns the hash of the card, its code.
         Returns:
-            bool: True if both cards have the same suit and value, False otherwise.
+            int: The code of the card.
+        """
+        return self.code
+
+    def __reduce__(self):
         """
-        if not isinstance(other, Card):
-            return NotImplemented
-        return self.suit == other.suit and self.value == other.value
+        Pickles and copies the card as a lookup of the shared instance.
+        """
+        return Card, (self.suit, self.value)
 
     def __str__(self) -> str:
         """
@@ -58,4 +117,12 @@ class Card:
         Returns:
             bool: True if the suits match, False otherwise.
         """
-        return self.suit == suit
+        return self.suit is suit or self.suit == suit
+
+
+Card.BY_CODE = tuple(
+    Card._build(s, v)
+    for s in range(len(Card.SUITS))
+    for v in range(1, Card.VALUES + 1)
+)
+Card._BY_KEY.update(((card.suit, card.value), card) for card in Card.BY_CODE)
@@ -0,0 +1,446 @@
+"""Paired comparison of two configurations with variance reduction"""
+
+import argparse
+import math
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from typing import List, NamedTuple, Optional, Tuple
+
+from carreras.aggregate import Welford
+from carreras.card import Card
+from carreras.game import GamePool
+from carreras.simulation import SHARD_SIZE, RaceSummary, race_summary, shard_seed
+
+METHODS = ("independent", "crn", "antithetic")
+
+
+class Config(NamedTuple):
+    """
+    A configuration of the game.
+    Attributes:
+        players (int): The number of players.
+        length (int): The length of the race.
+        penalty (int): Rows a revealed step sends its suit back.
+    """
+
+    players: int
+    length: int
+    penalty: int = 1
+
+
+class Observation(NamedTuple):
+    """
+    The metric of the two configurations on the same draw.
+    Attributes:
+        a (float): The metric of the first configuration.
+        b (float): The metric of the second configuration.
+        diff (float): a - b.
+    """
+
+    a: float
+    b: float
+    diff: float
+
+
+class MirroredRandom:
+    """
+    A generator that deals the mirror image of another one's races.
+
+    It shuffles exactly like a random.Random with the same seed, but on the
+    first shuffle, the one that deals the deck, every card but the knights
+    is replaced by the card of the same value of the suit shift places
+    further among the suits in play. The knights stay put, so they leave the
+    deck the same way. Since the rules treat every suit alike, the mirrored
+    race is the same race with its suits relabeled: later shuffles keep the
+    relabeling, the race takes the same steps, and suit n wins it exactly
+    when suit n - shift wins the original. Win indicators of a suit in a
+    race and in its mirror are negatively correlated, which makes the pair
+    an antithetic draw. The pair only helps with win rates: the steps,
+    penalties and gap of the mirror are those of the original race.
+    Attributes:
+        players (int): The number of suits in play.
+        shift (int): Places every suit is moved.
+    """
+
+    def __init__(self, seed: int, players: int, shift: int = 1):
+        """
+        Initializes a MirroredRandom.
+        Args:
+            seed (int): The seed of the original race.
+            players (int): The number of suits in play.
+            shift (int): Places every suit is moved.
+        """
+        self._rng = random.Random(seed)
+        self.players = min(players, len(Card.SUITS))
+        self.shift = shift
+        self._dealt = False
+
+    def shuffle(self, cards: list):
+        """
+        Shuffles a list of cards, relabeling the first deck dealt.
+        Args:
+            cards (list): The cards to shuffle in place.
+        """
+        self._rng.shuffle(cards)
+        if not self._dealt:
+            self._dealt = True
+            players = self.players
+            shift = self.shift
+            cards[:] = [
+                card
+                if card.value == Card.KNIGHT
+                else Card.BY_CODE[
+                    (card.suit_index + shift) % players * Card.VALUES
+                    + card.value
+                    - 1
+                ]
+                for card in cards
+            ]
+
+
+def measure(summary: RaceSummary, metric: str) -> float:
+    """
+    Reads a metric of a race.
+    Args:
+        summary (RaceSummary): The race.
+        metric (str): A numeric field of RaceSummary, or a suit for the
+            indicator that the suit won.
+    Returns:
+        float: The value of the metric.
+    """
+    if metric in Card.SUITS:
+        return float(summary.winner == metric)
+    return float(getattr(summary, metric))
+
+
+def play(config: Config, rng, pool: GamePool) -> RaceSummary:
+    """
+    Plays one race of a configuration.
+    Args:
+        config (Config): The configuration.
+        rng: The generator used for every shuffle.
+        pool (GamePool): Where the game of the race is taken from.
+    Returns:
+        RaceSummary: The summary of the race.
+    """
+    game = pool.acquire(config.players, config.length, rng=rng, penalty=config.penalty)
+    summary = race_summary(game)
+    pool.release(game)
+    return summary
+
+
+def compare_shard(
+    first: Config, second: Config, metric: str, samples: int, seed: int, method: str
+) -> Tuple[Welford, Welford, Welford]:
+    """
+    Runs one shard of a comparison with its own generator.
+    Args:
+        first (Config): The first configuration.
+        second (Config): The second configuration.
+        metric (str): The metric compared, see measure.
+        samples (int): The number of samples of the shard.
+        seed (int): The seed of the shard, see shard_seed.
+        method (str): The sampling method, one of METHODS.
+    Returns:
+        Welford: The metric of every race of the first configuration.
+        Welford: The metric of every race of the second configuration.
+        Welford: The difference of every sample.
+    """
+    rng = random.Random(seed)
+    pool = GamePool()
+    races_a = Welford("a")
+    races_b = Welford("b")
+    diff = Welford("diff")
+    for _ in range(samples):
+        race = rng.getrandbits(64)
+        if method == "independent":
+            draws = [(random.Random(race), random.Random(rng.getrandbits(64)))]
+        else:
+            draws = [(random.Random(race), random.Random(race))]
+        if method == "antithetic":
+            draws.append(
+                (
+                    MirroredRandom(race, first.players),
+                    MirroredRandom(race, second.players),
+                )
+            )
+        total_a = total_b = 0.0
+        for rng_a, rng_b in draws:
+            a = measure(play(first, rng_a, pool), metric)
+            b = measure(play(second, rng_b, pool), metric)
+            races_a.add(Observation(a, b, a - b))
+            races_b.add(Observation(a, b, a - b))
+            total_a += a
+            total_b += b
+        a = total_a / len(draws)
+        b = total_b / len(draws)
+        diff.add(Observation(a, b, a - b))
+    return races_a, races_b, diff
+
+
+class Comparison:
+    """
+    The paired comparison of a metric between two configurations.
+
+    Every sample plays both configurations on the same draw, so the
+    difference of the means is estimated from the differences of the
+    samples. With common random numbers (crn) both races of a sample are
+    dealt by generators with the same seed; antithetic sampling adds the
+    mirrored race of each (see MirroredRandom) and averages the pair, which
+    only applies to the win rate of a suit; the
+    independent method deals them apart and is the baseline. The variance
+    reduction compares the variance of the estimate with that of two
+    independent simulations of the same number of races.
+    Attributes:
+        first (Config): The first configuration.
+        second (Config): The second configuration.
+        metric (str): The metric compared.
+        method (str): The sampling method.
+        races_a (Welford): The metric of every race of the first one.
+        races_b (Welford): The metric of every race of the second one.
+        diff (Welford): The difference of every sample.
+    """
+
+    def __init__(self, first: Config, second: Config, metric: str, method: str):
+        """
+        Initializes an empty Comparison.
+        Args:
+            first (Config): The first configuration.
+            second (Config): The second configuration.
+            metric (str): The metric compared, see measure.
+            method (str): The sampling method, one of METHODS.
+        """
+        self.first = first
+        self.second = second
+        self.metric = metric
+        self.method = method
+        self.races_a = Welford("a")
+        self.races_b = Welford("b")
+        self.diff = Welford("diff")
+
+    def merge(self, part: Tuple[Welford, Welford, Welford]):
+        """
+        Adds the tallies of a shard.
+        Args:
+            part (tuple): The result of compare_shard.
+        """
+        races_a, races_b, diff = part
+        self.races_a.merge(races_a)
+        self.races_b.merge(races_b)
+        self.diff.merge(diff)
+
+    @property
+    def samples(self) -> int:
+        """
+        Returns the number of samples.
+        """
+        return self.diff.count
+
+    @property
+    def difference(self) -> float:
+        """
+        Returns the estimated difference of the metric, first minus second.
+        """
+        return self.diff.mean
+
+    def margin(self, confidence: float = 0.95) -> float:
+        """
+        Returns the half-width of the confidence interval of the difference.
+        Args:
+            confidence (float): The confidence level, between 0 and 1.
+        Returns:
+            float: The half-width, infinite before two samples.
+        """
+        if self.samples < 2:
+            return math.inf
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        return z * math.sqrt(self.diff.variance / self.samples)
+
+    @property
+    def variance_reduction(self) -> float:
+        """
+        Returns how many times more races two independent simulations would
+        need for the same confidence.
+        Returns:
+            float: The ratio of the variances per race played.
+        """
+        per_sample = self.races_a.count / max(self.samples, 1)
+        paired = self.diff.variance * per_sample
+        independent = self.races_a.variance + self.races_b.variance
+        if not paired:
+            return math.inf if independent else 1.0
+        return independent / paired
+
+    def report(self, confidence: float = 0.95) -> str:
+        """
+        Builds a human readable report of the comparison.
+        Args:
+            confidence (float): The confidence level of the interval.
+        Returns:
+            str: The report, one line per entry.
+        """
+        first = "{}p/{}/{}".format(*self.first)
+        second = "{}p/{}/{}".format(*self.second)
+        return "\n".join(
+            [
+                f"Metric: {self.metric} ({self.method}, {self.samples} samples, "
+                f"{self.races_a.count} races per configuration)",
+                f"  {first:<12}{self.races_a.mean:>12.5f}",
+                f"  {second:<12}{self.races_b.mean:>12.5f}",
+                f"Difference: {self.difference:.5f} ± {self.margin(confidence):.5f}"
+                f" at {confidence:.1%} confidence",
+                f"Variance reduction: {self.variance_reduction:.2f}x",
+            ]
+        )
+
+
+def compare(
+    first: Config,
+    second: Config,
+    metric: str = "steps",
+    samples: int = 10000,
+    method: str = "crn",
+    seed: int = 0,
+    workers: Optional[int] = None,
+    shard_size: int = SHARD_SIZE,
+) -> Comparison:
+    """
+    Compares a metric between two configurations over a pool of worker
+    processes.
+
+    Shards are seeded like simulate_parallel and merged in order, so the
+    result does not depend on the number of workers.
+    Args:
+        first (Config): The first configuration.
+        second (Config): The second configuration.
+        metric (str): A numeric field of RaceSummary, or a suit for its win
+            rate.
+        samples (int): The number of samples; antithetic samples play two
+            races of each configuration.
+        method (str): The sampling method, one of METHODS; antithetic only
+            for the win rate of a suit.
+        seed (int): The master seed of the job.
+        workers (int, optional): The number of worker processes. Defaults to
+            the number of CPUs; 1 runs every shard in this process.
+        shard_size (int): The number of samples of each shard.
+    Returns:
+        Comparison: The comparison.
+    Raises:
+        ValueError: If the method or the metric is unknown, or antithetic
+            sampling is asked for a metric other than a win rate.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}, expected one of {METHODS}")
+    if metric not in Card.SUITS and metric not in RaceSummary._fields[1:]:
+        raise ValueError(f"Unknown metric {metric!r}")
+    if method == "antithetic" and metric not in Card.SUITS:
+        # The mirror has the same steps, penalties and gap: the pair would
+        # cost twice the races of crn for the same estimate
+        raise ValueError(
+            "Antithetic sampling only applies to the win rate of a suit, "
+            f"not {metric!r}"
+        )
+    shards: List[tuple] = [
+        (
+            first,
+            second,
+            metric,
+            min(shard_size, samples - start),
+            shard_seed(seed, n),
+            method,
+        )
+        for n, start in enumerate(range(0, samples, shard_size))
+    ]
+    comparison = Comparison(first, second, metric, method)
+    if workers == 1:
+        for shard in shards:
+            comparison.merge(compare_shard(*shard))
+        return comparison
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers) as pool:
+        running = deque()
+        for shard in shards:
+            running.append(pool.submit(compare_shard, *shard))
+            if len(running) >= 2 * workers:
+                comparison.merge(running.popleft().result())
+        while running:
+            comparison.merge(running.popleft().result())
+    return comparison
+
+
+def parse_config(text: str) -> Config:
+    """
+    Parses a configuration written as players:length[:penalty].
+    Args:
+        text (str): The configuration.
+    Returns:
+        Config: The configuration.
+    Raises:
+        argparse.ArgumentTypeError: If the text is not a configuration.
+    """
+    try:
+        config = Config(*(int(part) for part in text.split(":")))
+    except (TypeError, ValueError):
+        raise argparse.ArgumentTypeError(
+            f"{text!r} is not players:length[:penalty]"
+        ) from None
+    if not 1 <= config.players <= len(Card.SUITS):
+        raise argparse.ArgumentTypeError(f"A race has 1 to {len(Card.SUITS)} players")
+    return config
+
+
+def main(argv: Optional[list] = None):
+    """Entry point of the carreras-compare console script."""
+    parser = argparse.ArgumentParser(
+        description="CARRERAS - Compare two configurations"
+    )
+    parser.add_argument(
+        "first", type=parse_config, help="First configuration, players:length[:penalty]"
+    )
+    parser.add_argument("second", type=parse_config, help="Second configuration")
+    parser.add_argument(
+        "--metric",
+        default="steps",
+        help="RaceSummary field (steps, penalties, gap) or a suit for its win rate",
+    )
+    parser.add_argument(
+        "--method",
+        choices=METHODS,
+        default="crn",
+        help="Sampling method; antithetic only applies to the win rate of a suit",
+    )
+    parser.add_argument("--samples", type=int, default=100000, help="Samples to run")
+    parser.add_argument("--seed", type=int, default=None, help="Master seed")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes; defaults to one per CPU",
+    )
+    parser.add_argument(
+        "--confidence", type=float, default=0.95, help="Confidence level"
+    )
+    args = parser.parse_args(argv)
+
+    seed = args.seed if args.seed is not None else random.getrandbits(63)
+    try:
+        comparison = compare(
+            args.first,
+            args.second,
+            args.metric,
+            args.samples,
+            args.method,
+            seed,
+            args.workers,
+        )
+    except ValueError as error:
+        parser.error(str(error))
+    print(f"Seed: {seed}")
+    print(comparison.report(args.confidence))
+
+
+if __name__ == "__main__":
+    main()
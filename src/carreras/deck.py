@@ -1,36 +1,115 @@
 """Deck"""
 
-from random import shuffle
-from typing import List, Optional
+import random
+from typing import List, Optional, Union
 from .card import Card
 
+RngLike = Union[int, random.Random]
+
+
+def make_rng(rng: Optional[RngLike] = None):
+    """
+    Resolves a seed or a generator into a generator to shuffle with.
+    Args:
+        rng (int or random.Random or numpy.random.Generator, optional): A seed
+            or an existing generator. Anything with a shuffle(list) method
+            is used as is.
+    Returns:
+        The global random module for None, a new random.Random for a seed,
+        or the given generator.
+    """
+    if rng is None:
+        return random
+    if isinstance(rng, int):
+        return random.Random(rng)
+    return rng
+
 
 class Deck:
     """
     Represents a deck of cards.
+
+    Besides the list of cards, the deck keeps the position of every card in
+    the list and a bit mask of the cards it holds, indexed by Card.code, so
+    membership, targeted extraction and insertion are O(1). The cards list
+    must only be changed through the deck methods.
     Attributes:
         suits (list): A list of suits in the deck.
         cards (list): A list of Card objects in the deck.
+        mask (int): Bit n is set when the card with code n is in the deck.
+        rng: The random generator used to shuffle the deck.
     """
 
-    def __init__(self, suits: List[str], q: int, shuffled: bool = False):
+    def __init__(
+        self,
+        suits: List[str],
+        q: int,
+        shuffled: bool = False,
+        rng: Optional[RngLike] = None,
+    ):
         """
         Initializes a Deck object with the given suits and card quantity.
         Args:
             suits (list): A list of suits for the deck.
             q (int): The number of cards per suit.
             shuffled (bool): If True, shuffle the deck after creating it.
+            rng (optional): A seed or the generator used to shuffle, see
+                make_rng. Defaults to the global random module.
+        """
+        self.rng = make_rng(rng)
+        self.cards: List[Card] = []
+        self._index = [-1] * len(Card.BY_CODE)
+        self.mask = 0
+        self.reset(suits, q, shuffled)
+
+    def reset(self, suits: List[str], q: int, shuffled: bool = False):
+        """
+        Refills the deck in place with every card of some suits, in the order
+        a new deck has, reusing its storage.
+        Args:
+            suits (list): A list of suits for the deck.
+            q (int): The number of cards per suit.
+            shuffled (bool): If True, shuffle the deck after filling it.
         """
+        self.clear()
         self.suits = suits
-        self.cards = [Card(s, v) for v in range(1, q + 1) for s in suits]
+        self.cards.extend(Card(s, v) for v in range(1, q + 1) for s in suits)
+        mask = 0
+        for card in self.cards:
+            mask |= 1 << card.code
+        self.mask = mask
         if shuffled:
             self.shuffle()
+        else:
+            self._reindex()
+
+    def _reindex(self):
+        """
+        Records the position of every card after the list was reordered.
+        """
+        index = self._index
+        for pos, card in enumerate(self.cards):
+            index[card.code] = pos
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def __contains__(self, card: Card) -> bool:
+        """
+        Checks if a card is in the deck.
+        Args:
+            card (Card): The card to look for.
+        Returns:
+            bool: True if the card is in the deck, False otherwise.
+        """
+        return bool(self.mask >> card.code & 1)
 
     def shuffle(self):
         """
         Shuffles the cards in the deck.
         """
-        shuffle(self.cards)
+        self.rng.shuffle(self.cards)
+        self._reindex()
 
     def remaining(self) -> int:
         return len(self.cards)
@@ -40,6 +119,8 @@ class Deck:
     ) -> Optional[Card]:
         """
         Retrieves a card from the deck.
+
+        A specific card is taken out by moving the last card into its place.
         Args:
             suit (str, optional): The suit of the card to retrieve. Defaults to None.
             value (int, optional): The value of the card to retrieve. Defaults to None.
@@ -47,12 +128,24 @@ class Deck:
             Card: The retrieved card, or None if the card is not found.
         """
         if not suit or not value:
-            return self.cards.pop()
-        aux = Card(suit, value)
-        if aux in self.cards:
-            self.cards.remove(aux)
-            return aux
-        return None
+            card = self.cards.pop()
+            self._index[card.code] = -1
+            self.mask ^= 1 << card.code
+            return card
+        try:
+            card = Card(suit, value)
+        except ValueError:
+            return None
+        pos = self._index[card.code]
+        if pos < 0:
+            return None
+        last = self.cards.pop()
+        if last is not card:
+            self.cards[pos] = last
+            self._index[last.code] = pos
+        self._index[card.code] = -1
+        self.mask ^= 1 << card.code
+        return card
 
     def insert_card(self, card: Card):
         """
@@ -60,5 +153,74 @@ class Deck:
         Args:
             card (Card): The card to insert.
         """
-        if card not in self.cards:
+        if not self.mask >> card.code & 1:
+            self._index[card.code] = len(self.cards)
             self.cards.append(card)
+            self.mask |= 1 << card.code
+
+    def clear(self):
+        """
+        Removes every card from the deck.
+        """
+        for card in self.cards:
+            self._index[card.code] = -1
+        self.cards.clear()
+        self.mask = 0
+
+    def copy(self, rng: Optional[RngLike] = None) -> "Deck":
+        """
+        Returns an independent copy of the deck.
+        Args:
+            rng (optional): A seed or the generator of the copy, see make_rng.
+                Defaults to the generator of this deck.
+        Returns:
+            Deck: The copy.
+        """
+        deck = Deck.__new__(Deck)
+        deck.suits = self.suits
+        deck.rng = self.rng if rng is None else make_rng(rng)
+        deck.cards = self.cards[:]
+        deck._index = self._index[:]
+        deck.mask = self.mask
+        return deck
+
+    def snapshot(self) -> bytes:
+        """
+        Captures the cards of the deck, in order.
+        Returns:
+            bytes: The code of every card.
+        """
+        return bytes([card.code for card in self.cards])
+
+    def restore(self, codes: bytes):
+        """
+        Replaces the cards of the deck with the ones of a snapshot.
+        Args:
+            codes (bytes): The code of every card, as returned by snapshot().
+        """
+        self.clear()
+        self.cards.extend(map(Card.BY_CODE.__getitem__, codes))
+        index = self._index
+        mask = 0
+        for pos, code in enumerate(codes):
+            index[code] = pos
+            mask |= 1 << code
+        self.mask = mask
+
+    def refill(self, other: "Deck"):
+        """
+        Moves every card of another deck into this one and shuffles it.
+
+        When this deck is empty, the two decks just trade their storage.
+        Args:
+            other (Deck): The deck to empty, e.g. a discard pile.
+        """
+        if not self.cards:
+            self.cards, other.cards = other.cards, self.cards
+            self._index, other._index = other._index, self._index
+            self.mask, other.mask = other.mask, 0
+        else:
+            for card in other.cards:
+                self.insert_card(card)
+            other.clear()
+        self.shuffle()
@@ -1,21 +1,133 @@
 """Races Game"""
 
-from typing import List
-from carreras.deck import Deck
+import copy
+import random
+from typing import Any, Dict, List, MutableSequence, NamedTuple, Optional, Tuple
+from carreras.card import Card
+from carreras.deck import Deck, RngLike, make_rng
 from .i18n import tr
 
+# Kinds of step in a trace; the low six bits hold the code of a card
+TRACE_DRAW = 0x00  # The first card is drawn
+TRACE_ADVANCE = 0x40  # The top card is played and the next one drawn
+TRACE_REVEAL = 0x80  # The top card is played and a step revealed
+TRACE_PENALTY = 0xC0  # A revealed step is applied and the next card drawn
+TRACE_KIND = 0xC0
+TRACE_CARD = 0x3F
+# Card codes stop at 47, so the codes above are free for markers
+TRACE_RESHUFFLE = 0x30  # The discard pile is shuffled into the deck
+
+# Kinds of change a step makes to what a board shows, see Change
+CHANGE_MOVE = 0  # A knight moved from row old to row new
+CHANGE_REVEAL = 1  # The step at position index was revealed, new is its card
+CHANGE_TOP = 2  # The top card went from old to new, None for no card
+CHANGE_RESHUFFLE = 3  # The discard pile was shuffled into the deck
+CHANGE_RESET = 4  # The whole game changed, e.g. it was restored
+
+
+class RaceResult(NamedTuple):
+    """
+    Compact outcome of a race, or of the part of it that has been played.
+    Attributes:
+        winner (int): The index of the winning knight, None while running.
+        rows (tuple): The row of every knight.
+        steps (int): The number of steps played.
+        penalties (int): The number of revealed steps applied.
+    """
+
+    winner: Optional[int]
+    rows: Tuple[int, ...]
+    steps: int
+    penalties: int
+
+
+class Change(NamedTuple):
+    """
+    A change a step made to a watched game, see Game.watch.
+    Attributes:
+        kind (int): One of the CHANGE_* kinds.
+        index (int): The index of the knight moved or the position of the
+            step revealed, 0 for the other kinds.
+        old: The row or card before the change, None when it has none.
+        new: The row or card after the change, None when it has none.
+    """
+
+    kind: int
+    index: int
+    old: Any
+    new: Any
+
+
+class GameSnapshot(NamedTuple):
+    """
+    Immutable capture of the state of a Game; cards are stored as codes.
+    Attributes:
+        deck (bytes): The cards of the deck, in order.
+        discarded (bytes): The cards of the discard pile, in order.
+        rows (tuple): The row of every knight.
+        step_cards (bytes): The card of every step.
+        hidden (tuple): The hidden flag of every step.
+        pending (tuple): The pending flag of every step.
+        top_card (int): The code of the top card, -1 for none.
+        min_row (int): The minimum row among the knights.
+        max_row (int): The maximum row among the knights.
+        winner (int): The index of the winning knight, -1 for none.
+        reshuffles (int): Times the discard pile was shuffled into the deck.
+        step_count (int): The number of steps played.
+        penalties (int): The number of revealed steps applied.
+    """
+
+    deck: bytes
+    discarded: bytes
+    rows: Tuple[int, ...]
+    step_cards: bytes
+    hidden: Tuple[bool, ...]
+    pending: Tuple[bool, ...]
+    top_card: int
+    min_row: int
+    max_row: int
+    winner: int
+    reshuffles: int
+    step_count: int
+    penalties: int
+
 
 class Game:
     """
     Represents a races game.
+
+    The state is kept in flat lists: knight n runs for suit n - 1, so the
+    knight of a card is found through its suit_index, and step n is at
+    position n - 1 of the step lists. The minimum and maximum rows and the
+    winner are updated on every move instead of scanning the knights.
     Attributes:
         deck (Deck): The deck of cards used in the game.
-        board (Board): The game board.
+        discarded (Deck): The discard pile.
+        seed (int): The seed the game was created with, None when it was
+            given a generator. The same seed replays the same race.
+        rng: The random generator used for every shuffle.
         length (int): The length of the game.
-        knights (dict): The knights in the game.
-        steps (dict): The steps in the game.
+        players (int): The number of players.
+        penalty (int): Rows a revealed step sends its suit back; a knight
+            never goes behind the start.
+        suits (list): The suit of every knight.
+        knight_cards (list): The card of every knight.
+        rows (list): The row of every knight.
+        step_cards (list): The card of every step.
+        hidden (list): True for every step that is still face down.
+        pending (list): True for every revealed step whose penalty is due.
         min_row (int): The minimum row value among the knights.
+        max_row (int): The maximum row value among the knights.
+        winner (int): The index of the knight that crossed the finish line,
+            None while the race is running.
+        reshuffles (int): Times the discard pile was shuffled into the deck.
+        step_count (int): The number of steps played.
+        penalties (int): The number of revealed steps applied.
         top_card (Card): The top card in the deck.
+        recorder: Receives every step, see carreras.trace.TraceWriter.
+            None when the game is not recorded.
+        changes (list): The changes of the steps played since they were
+            last taken, see watch. None when the game is not watched.
     """
 
     def __init__(
@@ -23,43 +135,248 @@ class Game:
         players: int = 4,
         length: int = 7,
         players_names: List[str] = None,
+        rng: Optional[RngLike] = None,
+        penalty: int = 1,
     ):
         """
         Initializes a Game object.
         Args:
-            board (Board): The game board.
+            players (int): The number of players.
+            length (int): The length of the race.
+            players_names (list, optional): The names of the players.
+            rng (optional): A seed or the generator used for every shuffle,
+                see make_rng. Defaults to a new random seed.
+            penalty (int, optional): Rows a revealed step sends its suit
+                back, a rule variant. Defaults to 1.
         """
-        self.deck = Deck(
-            ["coins", "cups", "swords", "clubs"][:players],
-            12,
-            shuffled=True,
-        )
-        self.discarded = Deck([],0)
-        self.length = length
+        self.seed = None
+        self.rng = None
         self.players = players
+        self.length = length
+        self.penalty = penalty
+        self.suits = list(Card.SUITS[:players])
+        self._knight_of_suit = {suit: n for n, suit in enumerate(self.suits)}
+        self.players_names = players_names or [""] * players
+        self.deck = Deck([], 0)
+        self.discarded = Deck([], 0)
+        self.knight_cards: List[Card] = []
+        self.rows: List[int] = []
+        self.step_cards: List[Card] = []
+        self.hidden: List[bool] = []
+        self.pending: List[bool] = []
+        self._row_count: List[int] = []
+        self.changes: Optional[List[Change]] = None
+        self.reset(rng)
+
+    def reset(
+        self,
+        seed: Optional[RngLike] = None,
+        players: Optional[int] = None,
+        length: Optional[int] = None,
+        players_names: Optional[List[str]] = None,
+        penalty: Optional[int] = None,
+    ):
+        """
+        Deals a new race in place, reusing the decks and lists of the game.
+
+        A game reset with a seed plays the same race as a new game created
+        with it. Settings that are not given are kept; a recorder and the
+        watchers are detached.
+        Args:
+            seed (optional): A seed or the generator used for every shuffle,
+                see make_rng. Defaults to a new random seed.
+            players (int, optional): The number of players.
+            length (int, optional): The length of the race.
+            players_names (list, optional): The names of the players; blank
+                names when only the number of players changes.
+            penalty (int, optional): Rows a revealed step sends its suit back.
+        """
+        if seed is None:
+            seed = random.getrandbits(64)
+        if not isinstance(seed, int):
+            self.rng = make_rng(seed)
+            self.seed = None
+        elif self.seed is not None:
+            # The generator was made from a seed, so it is ours to reseed
+            self.rng.seed(seed)
+            self.seed = seed
+        else:
+            self.rng = make_rng(seed)
+            self.seed = seed
+        if players is not None and players != self.players:
+            self.players = players
+            self.suits[:] = Card.SUITS[:players]
+            self._knight_of_suit = {suit: n for n, suit in enumerate(self.suits)}
+            self.players_names = players_names or [""] * players
+        elif players_names:
+            self.players_names = players_names
+        if length is not None:
+            self.length = length
+        if penalty is not None:
+            self.penalty = penalty
 
-        if not players_names:
-            players_names = [""] * players
-        self.players_names = players_names
-        self.knights = {
-            (n + 1): {
-                "card": self.deck.get_card(suit, 11),
-                "row": 0,
-                "player": players_names[n],
+        suits = self.suits
+        length = self.length
+        deck = self.deck
+        deck.rng = self.discarded.rng = self.rng
+        self.discarded.clear()
+        deck.reset(suits, Card.VALUES, shuffled=True)
+        self.knight_cards[:] = [deck.get_card(suit, Card.KNIGHT) for suit in suits]
+        self.rows[:] = [0] * len(suits)
+        self.step_cards[:] = [deck.get_card() for _ in range(length)]
+        self.hidden[:] = [True] * length
+        self.pending[:] = [False] * length
+        self._row_count[:] = [0] * (length + 2)
+        self._row_count[0] = len(suits)
+        self.min_row = 0
+        self.max_row = 0
+        self.winner = None
+        self.reshuffles = 0
+        self.step_count = 0
+        self.penalties = 0
+        self.top_card = None
+        self.recorder = None
+        self.changes = None
+
+    @property
+    def knights(self) -> Dict[int, dict]:
+        """
+        Returns a read-only view of the knights, keyed by knight number.
+        Returns:
+            dict: The card, row and player of every knight.
+        """
+        return {
+            n + 1: {
+                "card": card,
+                "row": self.rows[n],
+                "player": self.players_names[n],
             }
-            for n, suit in enumerate(self.deck.suits)
+            for n, card in enumerate(self.knight_cards)
         }
-        self.steps = {
-            i
-            + 1: {
-                "card": self.deck.get_card(),
-                "hidden": True,
-                "pending": False,
+
+    @property
+    def steps(self) -> Dict[int, dict]:
+        """
+        Returns a read-only view of the steps, keyed by step number.
+        Returns:
+            dict: The card and hidden and pending flags of every step.
+        """
+        return {
+            n + 1: {
+                "card": card,
+                "hidden": self.hidden[n],
+                "pending": self.pending[n],
             }
-            for i in range(self.length)
+            for n, card in enumerate(self.step_cards)
         }
-        self.min_row = 0
-        self.top_card = None
+
+    @property
+    def finished(self) -> bool:
+        """
+        Returns True once a knight has crossed the finish line.
+        """
+        return self.winner is not None
+
+    def snapshot(self) -> GameSnapshot:
+        """
+        Captures the state of the game.
+        Returns:
+            GameSnapshot: The state, to be restored with restore().
+        """
+        top = self.top_card
+        return GameSnapshot(
+            self.deck.snapshot(),
+            self.discarded.snapshot(),
+            tuple(self.rows),
+            bytes([card.code for card in self.step_cards]),
+            tuple(self.hidden),
+            tuple(self.pending),
+            -1 if top is None else top.code,
+            self.min_row,
+            self.max_row,
+            -1 if self.winner is None else self.winner,
+            self.reshuffles,
+            self.step_count,
+            self.penalties,
+        )
+
+    def restore(self, snapshot: GameSnapshot):
+        """
+        Brings the game back to a captured state. The generator is kept.
+        Args:
+            snapshot (GameSnapshot): A state of a game with the same players
+                and length.
+        """
+        if len(snapshot.rows) != len(self.suits) or len(snapshot.step_cards) != self.length:
+            raise ValueError("The snapshot belongs to a different kind of game")
+        self.deck.restore(snapshot.deck)
+        self.discarded.restore(snapshot.discarded)
+        self.rows = list(snapshot.rows)
+        self.step_cards = [Card.BY_CODE[code] for code in snapshot.step_cards]
+        self.hidden = list(snapshot.hidden)
+        self.pending = list(snapshot.pending)
+        self.top_card = None if snapshot.top_card < 0 else Card.BY_CODE[snapshot.top_card]
+        self.min_row = snapshot.min_row
+        self.max_row = snapshot.max_row
+        self.winner = None if snapshot.winner < 0 else snapshot.winner
+        self.reshuffles = snapshot.reshuffles
+        self.step_count = snapshot.step_count
+        self.penalties = snapshot.penalties
+        self._row_count = [0] * max(self.length + 2, self.max_row + 1)
+        for row in self.rows:
+            self._row_count[row] += 1
+        if self.changes is not None:
+            self.changes[:] = [Change(CHANGE_RESET, 0, None, None)]
+
+    def clone(self, rng: Optional[RngLike] = None) -> "Game":
+        """
+        Returns an independent copy of the game, e.g. to branch a rollout.
+        Args:
+            rng (optional): A seed or the generator of the copy, see make_rng.
+                Defaults to a copy of this game's generator, so the clone
+                plays the same race as the original.
+        Returns:
+            Game: The copy.
+        """
+        game = Game.__new__(Game)
+        game.__dict__.update(self.__dict__)
+        game.recorder = None
+        game.changes = None
+        if rng is None:
+            game.rng = copy.copy(self.rng)
+        else:
+            game.seed = rng if isinstance(rng, int) else None
+            game.rng = make_rng(rng)
+        game.deck = self.deck.copy(game.rng)
+        game.discarded = self.discarded.copy(game.rng)
+        game.rows = self.rows[:]
+        game.step_cards = self.step_cards[:]
+        game.hidden = self.hidden[:]
+        game.pending = self.pending[:]
+        game._row_count = self._row_count[:]
+        return game
+
+    def watch(self):
+        """
+        Starts collecting the changes of every step in changes.
+
+        A board draws the whole game once and then only what the changes
+        name. Games nobody watches skip every change, so simulations do not
+        pay for them.
+        """
+        self.changes = []
+
+    def take_changes(self) -> Optional[List[Change]]:
+        """
+        Returns the changes collected since the last call and starts anew.
+        Returns:
+            list: The changes, in the order they were made; None when the
+            game is not watched.
+        """
+        changes = self.changes
+        if changes is not None:
+            self.changes = []
+        return changes
 
     def print_status(self):
         """
@@ -70,6 +387,36 @@ class Game:
         print(tr("Steps status:"))
         print(self.steps)
 
+    def _move(self, knight: int, step: int):
+        """
+        Moves a knight and updates the row bounds and the winner.
+        Args:
+            knight (int): The index of the knight.
+            step (int): The number of rows to move, negative to go back.
+        """
+        old = self.rows[knight]
+        new = old + step
+        if new < 0:
+            raise ValueError("A knight cannot move behind the start")
+        count = self._row_count
+        if new >= len(count):
+            count.extend([0] * (new + 1 - len(count)))
+        self.rows[knight] = new
+        count[old] -= 1
+        count[new] += 1
+        if step > 0:
+            while not count[self.min_row]:
+                self.min_row += 1
+            if new > self.max_row:
+                self.max_row = new
+            if new > self.length and self.winner is None:
+                self.winner = knight
+        elif step < 0:
+            if new < self.min_row:
+                self.min_row = new
+            while not count[self.max_row]:
+                self.max_row -= 1
+
     def move_knights(self, suit: str, step: int):
         """
         Moves the knights based on the suit and step value.
@@ -77,10 +424,197 @@ class Game:
             suit (str): The suit of the card.
             step (int): The step value.
         """
-        for knight in self.knights.values():
-            if knight["card"].match_suit(suit):
-                knight["row"] += step
-        self.min_row = min(knight["row"] for knight in self.knights.values())
+        knight = self._knight_of_suit.get(suit)
+        if knight is not None:
+            self._move(knight, step)
+
+    def result(self) -> RaceResult:
+        """
+        Returns the outcome of the race so far.
+        Returns:
+            RaceResult: The winner, rows, steps and penalties.
+        """
+        return RaceResult(self.winner, tuple(self.rows), self.step_count, self.penalties)
+
+    def _advance(
+        self, limit: Optional[int], trace: Optional[MutableSequence[int]] = None
+    ) -> int:
+        """
+        Plays steps until the race ends or the limit is reached.
+
+        This is the single implementation of the rules: the state is bound to
+        locals once, so the loop does no lookups beyond the flat lists.
+        Args:
+            limit (int): The maximum number of steps, None for no limit.
+            trace (optional): A byte buffer; the step numbered n is written
+                at position n - 1 as its TRACE_* kind ORed with a card code.
+        Returns:
+            int: The number of steps played.
+        """
+        recorder = self.recorder
+        changes = self.changes
+        hidden = self.hidden
+        pending = self.pending
+        step_cards = self.step_cards
+        deck = self.deck
+        discarded = self.discarded
+        move = self._move
+        rows = self.rows
+        penalty = self.penalty
+        played = 0
+        while limit is None or played < limit:
+            played += 1
+            step = self.min_row - 1
+            if step >= 0 and pending[step]:
+                pending[step] = False
+                knight = step_cards[step].suit_index
+                back = min(penalty, rows[knight])
+                move(knight, -back)
+                self.penalties += 1
+                kind = TRACE_PENALTY
+                card = None
+                if changes is not None:
+                    row = rows[knight]
+                    changes.append(Change(CHANGE_MOVE, knight, row + back, row))
+            else:
+                top = self.top_card
+                if top is not None:
+                    discarded.insert_card(top)
+                    move(top.suit_index, +1)
+                    self.top_card = None
+                    kind = TRACE_ADVANCE
+                    if changes is not None:
+                        knight = top.suit_index
+                        row = rows[knight]
+                        changes.append(Change(CHANGE_MOVE, knight, row - 1, row))
+                else:
+                    kind = TRACE_DRAW
+                step = self.min_row - 1
+                if step >= 0 and hidden[step]:
+                    hidden[step] = False
+                    pending[step] = True
+                    card = step_cards[step]
+                    if changes is not None:
+                        changes.append(Change(CHANGE_REVEAL, step, None, card))
+                        if kind == TRACE_ADVANCE:
+                            changes.append(Change(CHANGE_TOP, 0, top, None))
+                    kind = TRACE_REVEAL
+                else:
+                    card = None
+            if card is None:
+                if not deck.cards:
+                    deck.refill(discarded)
+                    self.reshuffles += 1
+                    if recorder is not None:
+                        recorder.append(TRACE_RESHUFFLE)
+                    if changes is not None:
+                        changes.append(Change(CHANGE_RESHUFFLE, 0, None, None))
+                card = self.top_card = deck.get_card()
+                if changes is not None:
+                    old = top if kind == TRACE_ADVANCE else None
+                    changes.append(Change(CHANGE_TOP, 0, old, card))
+            if trace is not None:
+                trace[self.step_count] = kind | card.code
+            if recorder is not None:
+                recorder.append(kind | card.code)
+            self.step_count += 1
+            if self.winner is not None:
+                if recorder is not None:
+                    recorder.finish(self)
+                break
+        return played
+
+    def step_many(
+        self, n: int, trace: Optional[MutableSequence[int]] = None
+    ) -> RaceResult:
+        """
+        Plays up to n steps, stopping early if the race ends.
+        Args:
+            n (int): The maximum number of steps.
+            trace (optional): A preallocated byte buffer (e.g. a bytearray)
+                that receives one TRACE_* entry per step, indexed by step
+                number; it must be longer than the steps it will hold.
+        Returns:
+            RaceResult: The outcome of the race so far.
+        """
+        if self.winner is None and n > 0:
+            self._advance(n, trace)
+        return self.result()
+
+    def run_to_completion(
+        self, trace: Optional[MutableSequence[int]] = None
+    ) -> RaceResult:
+        """
+        Plays the race until a knight crosses the finish line.
+        Args:
+            trace (optional): A preallocated byte buffer, see step_many.
+        Returns:
+            RaceResult: The outcome of the race.
+        """
+        if self.winner is None:
+            self._advance(None, trace)
+        return self.result()
+
+    def apply(self, entry: int):
+        """
+        Plays a step from its trace entry instead of from the deck order.
+
+        The entry names the card drawn or revealed, so the step does not
+        depend on how the deck is shuffled: an emptied deck is refilled from
+        the discard pile and the named card taken out of it.
+        Args:
+            entry (int): A trace entry of the next step, see _advance.
+        Raises:
+            ValueError: If the entry cannot be the next step of this game;
+                the game should then be restored from a snapshot.
+        """
+        kind = entry & TRACE_KIND
+        card = Card.BY_CODE[entry & TRACE_CARD]
+        step = self.min_row - 1
+        is_pending = step >= 0 and self.pending[step]
+        if (kind == TRACE_PENALTY) != is_pending:
+            raise ValueError("The trace entry does not follow this game")
+        changes = self.changes
+        top = None
+        if kind == TRACE_PENALTY:
+            self.pending[step] = False
+            knight = self.step_cards[step].suit_index
+            old = self.rows[knight]
+            self._move(knight, -min(self.penalty, old))
+            self.penalties += 1
+            if changes is not None:
+                changes.append(Change(CHANGE_MOVE, knight, old, self.rows[knight]))
+        else:
+            top = self.top_card
+            if top is not None:
+                self.discarded.insert_card(top)
+                self._move(top.suit_index, +1)
+                self.top_card = None
+                if changes is not None:
+                    row = self.rows[top.suit_index]
+                    changes.append(Change(CHANGE_MOVE, top.suit_index, row - 1, row))
+            step = self.min_row - 1
+            if kind == TRACE_REVEAL:
+                if step < 0 or not self.hidden[step] or self.step_cards[step] is not card:
+                    raise ValueError("The trace entry does not follow this game")
+                self.hidden[step] = False
+                self.pending[step] = True
+                if changes is not None:
+                    changes.append(Change(CHANGE_REVEAL, step, None, card))
+                    if top is not None:
+                        changes.append(Change(CHANGE_TOP, 0, top, None))
+        if kind != TRACE_REVEAL:
+            if not self.deck.cards:
+                self.deck.refill(self.discarded)
+                self.reshuffles += 1
+                if changes is not None:
+                    changes.append(Change(CHANGE_RESHUFFLE, 0, None, None))
+            if self.deck.get_card(card.suit, card.value) is None:
+                raise ValueError("The trace entry does not follow this game")
+            self.top_card = card
+            if changes is not None:
+                changes.append(Change(CHANGE_TOP, 0, top, card))
+        self.step_count += 1
 
     def step(self) -> bool:
         """
@@ -88,30 +622,71 @@ class Game:
         Returns:
             bool: True if the game has ended, False otherwise.
         """
-        if self.min_row and self.steps[self.min_row]["pending"]:
-            self.steps[self.min_row]["pending"] = False
-            card = self.steps[self.min_row]["card"]
-            self.move_knights(card.suit, -1)
+        self._advance(1)
+        return self.winner is not None
 
-            if not self.deck.remaining():
-                self.deck = self.discarded
-                self.deck.shuffle()
-                self.discarded = Deck([],0)
-            self.top_card = self.deck.get_card()
-        else:
-            if self.top_card:
-                card = self.top_card
-                self.discarded.insert_card(card)
-                self.move_knights(card.suit, +1)
-                self.top_card = None
-            if self.min_row and self.steps[self.min_row]["hidden"]:
-                self.steps[self.min_row]["hidden"] = False
-                self.steps[self.min_row]["pending"] = True
-            else:
-                if not self.deck.remaining():
-                    self.deck = self.discarded
-                    self.deck.shuffle()
-                    self.discarded = Deck([],0)
-                self.top_card = self.deck.get_card()
 
-        return any(knight["row"] > self.length for knight in self.knights.values())
+class GamePool:
+    """
+    Games kept for reuse by batch runners, so a race is dealt by resetting a
+    game instead of building its decks and lists again.
+
+    Games are kept apart by number of players and length, and a released
+    game of another configuration is reset into the one asked for when none
+    matches.
+    """
+
+    def __init__(self, players: int = 4, length: int = 7, size: int = 0):
+        """
+        Initializes a GamePool.
+        Args:
+            players (int): The number of players of the pre-warmed games.
+            length (int): The length of the pre-warmed games.
+            size (int): The number of games built up front.
+        """
+        self._free: Dict[Tuple[int, int], List[Game]] = {}
+        for _ in range(size):
+            self.release(Game(players, length, rng=0))
+
+    def __len__(self) -> int:
+        """
+        Returns the number of games ready to be acquired.
+        """
+        return sum(len(games) for games in self._free.values())
+
+    def acquire(
+        self,
+        players: int = 4,
+        length: int = 7,
+        players_names: Optional[List[str]] = None,
+        rng: Optional[RngLike] = None,
+        penalty: int = 1,
+    ) -> Game:
+        """
+        Returns a game dealt like Game(players, length, players_names, rng,
+        penalty), reusing a released one when there is any.
+        Args:
+            players (int): The number of players.
+            length (int): The length of the race.
+            players_names (list, optional): The names of the players.
+            rng (optional): A seed or the generator used for every shuffle.
+            penalty (int): Rows a revealed step sends its suit back.
+        Returns:
+            Game: The game, to be released when its race is over.
+        """
+        games = self._free.get((players, length))
+        if not games:
+            games = next((games for games in self._free.values() if games), None)
+        if not games:
+            return Game(players, length, players_names, rng, penalty)
+        game = games.pop()
+        game.reset(rng, players, length, players_names or [""] * players, penalty)
+        return game
+
+    def release(self, game: Game):
+        """
+        Returns a game to the pool; it must not be used afterwards.
+        Args:
+            game (Game): A game acquired from the pool, or any other.
+        """
+        self._free.setdefault((game.players, game.length), []).append(game)
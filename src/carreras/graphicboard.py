@@ -4,8 +4,10 @@ import pygame
 import sys
 import os
 from typing import Optional, Tuple
-from .game import Game
+from .game import CHANGE_MOVE, CHANGE_RESET, CHANGE_REVEAL, CHANGE_TOP, Game
 from .card import Card
+from .odds import OddsEstimator
+from .replay import Replay
 from .paraminput import ParamInputMixin
 from .i18n import tr, get_language
 
@@ -20,6 +22,9 @@ class GraphicBoard(ParamInputMixin):
     # Constants matching the original Board class
     CARD_WIDTH = 80
     CARD_HEIGHT = 120
+    # Top left corner of the race track: step cards above, knights below
+    TRACK_X = 300
+    TRACK_Y = 100 + CARD_HEIGHT // 2
     EXIT_KEYS = [pygame.K_q]
 
     LENGTH_VALUES = {pygame.K_4: 4, pygame.K_5: 5, pygame.K_6: 6, pygame.K_7: 7}
@@ -27,6 +32,18 @@ class GraphicBoard(ParamInputMixin):
     # YES/NO keys will be set in __init__ based on language
     YES_NO_VALUES = None
 
+    # Replay keys and the steps they move; Enter or Escape leave
+    REPLAY_KEYS = {
+        pygame.K_LEFT: -1,
+        pygame.K_RIGHT: 1,
+        pygame.K_PAGEUP: -10,
+        pygame.K_PAGEDOWN: 10,
+        pygame.K_HOME: -sys.maxsize,
+        pygame.K_END: sys.maxsize,
+        pygame.K_RETURN: 0,
+        pygame.K_ESCAPE: 0,
+    }
+
     # Colors for suits (RGB values)
     SUIT_COLORS = {
         "coins": (255, 215, 0),  # Gold
@@ -71,6 +88,10 @@ class GraphicBoard(ParamInputMixin):
 
         self.clock = pygame.time.Clock()
         self.running = True
+        # The game last drawn whole; its changes are drawn on top of it
+        self._watched: Optional[Game] = None
+        # Estimates the win probabilities shown with the standings, or an OddsTable
+        self.odds: Optional[OddsEstimator] = None
 
         self.base_img_path = os.path.join(
             os.path.dirname(os.path.abspath(__file__)), "img"
@@ -249,78 +270,6 @@ class GraphicBoard(ParamInputMixin):
         _, _, names = self.ask_game_params_screen()
         return names
 
-    def __init__(self):
-        """Initialize pygame and create the game window."""
-        pygame.init()
-        pygame.font.init()
-
-        self.width = 1200
-        self.height = 800
-        self.screen = pygame.display.set_mode((self.width, self.height))
-        pygame.display.set_caption(tr("CARRERAS - Horse Racing Game"))
-
-        # Fonts
-        self.font_large = pygame.font.Font(None, 36)
-        self.font_medium = pygame.font.Font(None, 24)
-        self.font_small = pygame.font.Font(None, 18)
-
-        # Colors
-        self.bg_color = (0, 100, 0)  # Dark green
-        self.white = (255, 255, 255)
-        self.black = (0, 0, 0)
-        self.gray = (128, 128, 128)
-
-        self.clock = pygame.time.Clock()
-        self.running = True
-
-        self.base_img_path = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)), "img"
-        )
-
-        # Cargar imágenes de cartas y dorso
-        self.card_images = self._load_card_images()
-        self.back_image = self._load_back_image()
-
-        # Set YES_NO_VALUES based on language
-        lang = get_language()
-        if lang == "en":
-            self.YES_NO_VALUES = {pygame.K_y: 1, pygame.K_n: 0}
-        else:
-            self.YES_NO_VALUES = {pygame.K_s: 1, pygame.K_n: 0}
-
-    def _load_card_images(self):
-        """Carga todas las imágenes de cartas disponibles en un diccionario."""
-        card_images = {}
-        suits = [
-            "coins",
-            "cups",
-            "swords",
-            "clubs",
-        ]
-        ranks = range(1, 13)
-        for suit in suits:
-            for rank in ranks:
-                path = os.path.join(self.base_img_path, suit, f"{rank}.jpg")
-                try:
-                    image = pygame.image.load(path)
-                    image = pygame.transform.scale(
-                        image, (self.CARD_WIDTH, self.CARD_HEIGHT)
-                    )
-                    card_images[(suit, rank)] = image
-                except Exception:
-                    pass  # Si no existe la imagen, se maneja en _draw_card
-        return card_images
-
-    def _load_back_image(self):
-        """Carga la imagen de dorso de carta (back.jpg)."""
-        try:
-            path = os.path.join(self.base_img_path, "back.jpg")
-            image = pygame.image.load(path)
-            image = pygame.transform.scale(image, (self.CARD_WIDTH, self.CARD_HEIGHT))
-            return image
-        except Exception:
-            return None
-
     def ask_player_count(self) -> int:
         """Show buttons for player count selection (2, 3, 4)."""
         options = [2, 3, 4]
@@ -437,8 +386,31 @@ class GraphicBoard(ParamInputMixin):
             self.clock.tick(60)
         return 4
 
-    def draw_game(self, game: Game):
-        """Draw the complete game state."""
+    def draw_game(self, game: Game, wait: bool = True, hint: Optional[str] = None):
+        """
+        Draw the game state, then wait for a key if asked to.
+
+        A game is drawn whole the first time and watched from then on: the
+        next frames only draw again the cards its changes name, the
+        standings, the current card and the hint, and update those areas
+        of the display instead of flipping all of it.
+        """
+        changes = game.take_changes()
+        if (
+            changes is not None
+            and game is self._watched
+            and not any(change.kind == CHANGE_RESET for change in changes)
+        ):
+            self._draw_changes(game, changes, hint)
+        else:
+            self._draw_whole_game(game, hint)
+            game.watch()
+            self._watched = game
+        if wait:
+            self._wait_for_key()
+
+    def _draw_whole_game(self, game: Game, hint: Optional[str]):
+        """Draw the complete game state and flip the display."""
         self.screen.fill(self.bg_color)
 
         # Draw title
@@ -454,16 +426,129 @@ class GraphicBoard(ParamInputMixin):
         self._draw_current_card(game)
 
         # Draw instructions
+        self._draw_hint(hint)
+
+        pygame.display.flip()
+
+    def _draw_changes(self, game: Game, changes: list, hint: Optional[str]):
+        """Draw what some changes of the watched game touched and update it."""
+        cards = {}
+        for kind, index, old, new in changes:
+            if kind == CHANGE_MOVE:
+                cards[self._knight_pos(index + 1, old)] = None
+                cards[self._knight_pos(index + 1, new)] = game.knight_cards[index]
+            elif kind == CHANGE_REVEAL:
+                cards[self._step_pos(index + 1)] = new
+        rects = []
+        for x, y in cards:
+            rect = pygame.Rect(x, y, self.CARD_WIDTH, self.CARD_HEIGHT)
+            self.screen.fill(self.bg_color, rect)
+            rects.append(rect)
+        if cards:
+            # A card cleared next to the finish line takes an edge of it;
+            # the cards drawn next cover it, as in a whole frame
+            rects.append(self._draw_finish_line(game))
+        for (x, y), card in cards.items():
+            if card is not None:
+                self._draw_card(x, y, card.value, card.suit)
+        rects.append(
+            self._redraw_area(
+                pygame.Rect(
+                    0, 65, self.TRACK_X + self.CARD_WIDTH, 30 * game.players + 10
+                ),
+                self._draw_player_status,
+                game,
+            )
+        )
+        if any(change.kind == CHANGE_TOP for change in changes):
+            rects.append(
+                self._redraw_area(
+                    pygame.Rect(0, 265, self.TRACK_X - 90, self.CARD_HEIGHT + 40),
+                    self._draw_current_card,
+                    game,
+                )
+            )
+        rects.append(
+            self._redraw_area(
+                pygame.Rect(0, self.height - 35, self.width, 35),
+                self._draw_hint,
+                hint,
+            )
+        )
+        pygame.display.update(rects)
+
+    def _redraw_area(self, rect: pygame.Rect, draw, *args) -> pygame.Rect:
+        """Clear an area and draw it again, clipped to it."""
+        self.screen.set_clip(rect)
+        self.screen.fill(self.bg_color, rect)
+        draw(*args)
+        self.screen.set_clip(None)
+        return rect
+
+    def _draw_hint(self, hint: Optional[str]):
+        """Draw the instructions at the bottom of the window."""
         self._draw_text(
-            tr("Press Q to quit, any other key to continue"),
+            hint or tr("Press Q to quit, any other key to continue"),
             self.font_small,
             self.gray,
             50,
             self.height - 30,
         )
 
-        pygame.display.flip()
-        self._wait_for_key()
+    def _knight_pos(self, knight_num: int, row: int) -> Tuple[int, int]:
+        """Return the corner of the card of a knight at a row."""
+        return (
+            self.TRACK_X + row * self.CARD_WIDTH,
+            self.TRACK_Y + knight_num * self.CARD_HEIGHT,
+        )
+
+    def _step_pos(self, step_num: int) -> Tuple[int, int]:
+        """Return the corner of the card of a step."""
+        return (
+            self.TRACK_X + step_num * self.CARD_WIDTH,
+            self.TRACK_Y - self.CARD_HEIGHT + 10,
+        )
+
+    def _draw_finish_line(self, game: Game) -> pygame.Rect:
+        """Draw the finish line and return the area it covers."""
+        finish_x = self.TRACK_X + (game.length + 1) * self.CARD_WIDTH
+        return pygame.draw.line(
+            self.screen,
+            self.white,
+            (finish_x, self.TRACK_Y),
+            (finish_x, self.TRACK_Y + game.players * self.CARD_HEIGHT),
+            3,
+        )
+
+    def draw_replay(self, replay: Replay, step: int = 0):
+        """Show a replay, seeking with the REPLAY_KEYS until Enter or Escape."""
+        game = replay.seek(step)
+        while self.running:
+            self.draw_game(
+                game,
+                wait=False,
+                hint=f"{replay.position}/{replay.steps}  ← → PgUp PgDn Home End",
+            )
+            move = self._wait_for_replay_key()
+            if not move:
+                return
+            game = replay.seek(replay.position + move)
+
+    def _wait_for_replay_key(self) -> int:
+        """Wait for a replay key and return the steps it moves, 0 to leave."""
+        while self.running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (
+                    event.type == pygame.KEYDOWN and event.key == pygame.K_q
+                ):
+                    self.destroy()
+                    sys.exit()
+                if event.type == pygame.KEYDOWN and event.key in self.REPLAY_KEYS:
+                    return self.REPLAY_KEYS[event.key]
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    return 1 if event.button == 1 else -1
+            self.clock.tick(60)
+        return 0
 
     def _draw_player_status(self, game: Game):
         """Draw player rankings and status."""
@@ -485,19 +570,24 @@ class GraphicBoard(ParamInputMixin):
             )
             for k in game.knights.values()
         )
+        estimate = self.odds.poll(game) if self.odds is not None else None
 
         for i, (ranking, player, suit) in enumerate(status):
             color = self.SUIT_COLORS[suit]
             # Mostrar el nombre traducido del palo junto al jugador
             suit_name = tr(suit)
             text = f"{ranking}: {player} ({suit_name})"
+            if estimate is not None and estimate.exact:
+                text += f"  {estimate.wins[suit]:.1%}"
+            elif estimate is not None and estimate.rollouts:
+                text += f"  {estimate.wins[suit]:.1%} ±{estimate.margins[suit]:.1%}"
             self._draw_text(text, self.font_medium, color, 50, y_start + i * 30)
 
     def _draw_race_track(self, game: Game):
         """Draw the race track with knights and steps."""
         # Reducir el espacio vertical entre cartas de paso y filas de jugadores
-        track_start_x = 300
-        track_start_y = 100 + self.CARD_HEIGHT // 2  # Menos espacio arriba
+        track_start_x = self.TRACK_X
+        track_start_y = self.TRACK_Y  # Menos espacio arriba
 
         # Encabezado: nombre de cada jugador sobre su fila
         for knight_num, knight in game.knights.items():
@@ -513,21 +603,14 @@ class GraphicBoard(ParamInputMixin):
 
         # Draw finish line
         finish_x = track_start_x + (game.length + 1) * self.CARD_WIDTH
-        pygame.draw.line(
-            self.screen,
-            self.white,
-            (finish_x, track_start_y),
-            (finish_x, track_start_y + game.players * self.CARD_HEIGHT),
-            3,
-        )
+        self._draw_finish_line(game)
         self._draw_text(
             tr("FINISH"), self.font_medium, self.white, finish_x + 10, track_start_y
         )
 
         # Draw step cards (ahora más cerca de la pista)
         for step_num, step in game.steps.items():
-            x = track_start_x + step_num * self.CARD_WIDTH
-            y = track_start_y - self.CARD_HEIGHT + 10  # Menos separación
+            x, y = self._step_pos(step_num)  # Menos separación
             self._draw_card(
                 x,
                 y,
@@ -537,8 +620,7 @@ class GraphicBoard(ParamInputMixin):
 
         # Draw knights
         for knight_num, knight in game.knights.items():
-            x = track_start_x + knight["row"] * self.CARD_WIDTH
-            y = track_start_y + knight_num * self.CARD_HEIGHT
+            x, y = self._knight_pos(knight_num, knight["row"])
             self._draw_card(x, y, knight["card"].value, knight["card"].suit)
 
     def _draw_current_card(self, game: Game):
@@ -605,6 +687,21 @@ class GraphicBoard(ParamInputMixin):
                     return
             self.clock.tick(60)
 
+    def idle(self, seconds: float):
+        """Wait without drawing, handling quit events."""
+        deadline = pygame.time.get_ticks() + int(seconds * 1000)
+        while self.running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (
+                    event.type == pygame.KEYDOWN and event.key == pygame.K_q
+                ):
+                    self.destroy()
+                    sys.exit()
+            left = deadline - pygame.time.get_ticks()
+            if left <= 0:
+                return
+            pygame.time.wait(min(left, 50))
+
     def ask_restart(self) -> Tuple[bool, bool]:
         """Ask if user wants to restart the game."""
         restart = self._ask_yes_no(tr("Restart game"))
@@ -645,6 +742,8 @@ class GraphicBoard(ParamInputMixin):
 
     def destroy(self):
         """Clean up pygame resources."""
+        if self.odds is not None:
+            self.odds.close()
         pygame.quit()
 
     def get_game_params(self) -> tuple[int, int, list[str]]:
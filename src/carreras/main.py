@@ -1,7 +1,10 @@
 """Main"""
 
 import argparse
+import os
+from typing import Optional
 
+from carreras.autoplay import Autoplay
 from carreras.board import Board
 
 # Intenta importar pygame, si falla, usa curses
@@ -14,6 +17,8 @@ except ImportError:
     HAS_PYGAME = False
 
 from carreras.game import Game
+from carreras.odds import ExactOdds, OddsEstimator
+from carreras.oddstable import DEFAULT_PATH, OddsTable
 
 
 def get_game_parameters(board: Board) -> tuple[int, int, list[str]]:
@@ -31,15 +36,24 @@ def iniciar_juego(
     players: int,
     length: int,
     players_names: list[str],
+    game: Optional[Game] = None,
 ) -> Game:
-    """Inicia un nuevo juego."""
-    game = Game(players, length, players_names)
+    """Inicia un nuevo juego, reutilizando el anterior si lo hay."""
+    if game is None:
+        game = Game(players, length, players_names)
+    else:
+        game.reset(None, players, length, players_names)
     board.draw_game(game)
     return game
 
 
-def run_game_loop(board: Board, game: Game) -> None:
-    """Ejecuta el bucle principal del juego."""
+def run_game_loop(
+    board: Board, game: Game, autoplay: Optional[Autoplay] = None
+) -> None:
+    """Ejecuta el bucle principal del juego, solo si hay autoplay."""
+    if autoplay is not None:
+        autoplay.run(board, game)
+        return
     game_ended = False
     while not game_ended:
         game_ended = game.step()
@@ -72,7 +86,44 @@ def main():
         default="es",
         help="Idioma del juego: es (Español, por defecto) o en (English)",
     )
+    parser.add_argument(
+        "--no-odds",
+        dest="odds",
+        action="store_false",
+        help="No mostrar las probabilidades de victoria durante la carrera",
+    )
+    parser.add_argument(
+        "--exact-odds",
+        dest="exact_odds",
+        action="store_true",
+        help="Calcular las probabilidades exactas en este proceso en vez de "
+        "estimarlas con simulaciones en varios procesos",
+    )
+    parser.add_argument(
+        "--autoplay",
+        action="store_true",
+        help="Modo espectador: las carreras avanzan solas y se repiten",
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=4.0,
+        help="Pasos por segundo en modo espectador (por defecto 4)",
+    )
+    parser.add_argument(
+        "--max-speed",
+        action="store_true",
+        help="En modo espectador, dibujar solo el final de cada carrera",
+    )
+    parser.add_argument(
+        "--pause",
+        type=float,
+        default=3.0,
+        help="Segundos entre carreras en modo espectador (por defecto 3)",
+    )
     args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
 
     from carreras.i18n import set_language
 
@@ -88,17 +139,37 @@ def main():
             board = Board()
     else:
         board = Board()
+    if args.odds:
+        # Exactas y sin procesos solo si se piden; si no, simulaciones
+        board.odds = ExactOdds() if args.exact_odds else OddsEstimator()
+        if os.path.exists(DEFAULT_PATH):
+            # Tabla precalculada (carreras-oddstable); estima lo que no tenga
+            board.odds = OddsTable(DEFAULT_PATH, fallback=board.odds)
+
+    autoplay = None
+    if args.autoplay:
+        autoplay = Autoplay(None if args.max_speed else args.speed)
 
     restart = True
     players, length, players_names = board.get_game_params()
     # Guardar los parámetros originales para reinicio rápido
     orig_players, orig_length, orig_names = players, length, players_names
 
+    game = None
     while restart:
         if players is None:
             break  # Salir del bucle si hubo un error al obtener los parámetros
 
-        game = iniciar_juego(board, players, length, players_names)
+        if autoplay is not None:
+            # Carreras seguidas con los mismos parámetros; Q o ESC para salir
+            if game is None:
+                game = Game(players, length, players_names)
+            else:
+                game.reset(None, players, length, players_names)
+            run_game_loop(board, game, autoplay)
+            board.idle(args.pause)
+            continue
+        game = iniciar_juego(board, players, length, players_names, game)
         run_game_loop(board, game)
         restart, new_players, new_length, new_names = handle_restart(board)
         if restart:
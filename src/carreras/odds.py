@@ -0,0 +1,323 @@
+"""Live odds estimated by Monte Carlo rollouts"""
+
+import math
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from carreras.game import Game, GameSnapshot
+from carreras.solver import get_solver, visible_state
+
+# Two-sided 95% normal quantile
+Z_95 = 1.959964
+
+
+class Estimate(NamedTuple):
+    """
+    Estimated odds of a race.
+    Attributes:
+        wins (dict): The estimated probability that each suit wins.
+        margins (dict): The half-width of the confidence interval of every
+            probability.
+        rollouts (int): The number of rollouts behind the estimate, 0 while
+            there are none yet.
+        exact (bool): True when the odds are exact rather than estimated.
+    """
+
+    wins: Dict[str, float]
+    margins: Dict[str, float]
+    rollouts: int
+    exact: bool = False
+
+
+def determinize(game: Game, rng: random.Random):
+    """
+    Deals again the cards that cannot be seen from the table.
+
+    Until the first reshuffle the deck and the hidden steps are one shuffled
+    pile; after it the deck is the shuffled discard pile and the hidden steps
+    are shuffled on their own.
+    Args:
+        game (Game): The game to deal again.
+        rng (random.Random): The generator used to shuffle.
+    """
+    hidden = [n for n, is_hidden in enumerate(game.hidden) if is_hidden]
+    steps = [game.step_cards[n] for n in hidden]
+    deck = list(game.deck.cards)
+    if game.reshuffles:
+        rng.shuffle(deck)
+        rng.shuffle(steps)
+    else:
+        pool = deck + steps
+        rng.shuffle(pool)
+        deck, steps = pool[: len(deck)], pool[len(deck) :]
+    game.deck.restore(bytes(card.code for card in deck))
+    for n, card in zip(hidden, steps):
+        game.step_cards[n] = card
+
+
+def run_rollouts(
+    players: int, length: int, snapshot: GameSnapshot, rollouts: int, seed: int
+) -> List[int]:
+    """
+    Plays a race to the end many times from a position.
+    Args:
+        players (int): The number of players.
+        length (int): The length of the race.
+        snapshot (GameSnapshot): The position.
+        rollouts (int): The number of races to play.
+        seed (int): The seed of the rollouts.
+    Returns:
+        list: The races won by every knight.
+    """
+    rng = random.Random(seed)
+    game = Game(players, length, rng=rng)
+    wins = [0] * len(game.suits)
+    for _ in range(rollouts):
+        game.restore(snapshot)
+        determinize(game, rng)
+        wins[game.run_to_completion().winner] += 1
+    return wins
+
+
+def state_key(game: Game) -> Tuple[tuple, List[int]]:
+    """
+    Builds the canonical key of a position, shared by every permutation of
+    the suits.
+    Args:
+        game (Game): A game in progress.
+    Returns:
+        tuple: The key.
+        list: The knight index of every canonical position.
+    """
+    shared, suits = visible_state(game)
+    top = game.top_card.suit_index if game.top_card is not None else -1
+    step = game.min_row - 1
+    pending = (
+        game.step_cards[step].suit_index if step >= 0 and game.pending[step] else -1
+    )
+    marked = [
+        suit + (n == top, n == pending) for n, suit in enumerate(suits)
+    ]
+    order = sorted(range(len(marked)), key=marked.__getitem__)
+    key = (game.length, shared, tuple(marked[n] for n in order))
+    return key, order
+
+
+class ExactOdds:
+    """
+    Exact odds of a race in progress, solved on demand in the caller.
+
+    The shared solver of every configuration keeps the states it solved, see
+    carreras.solver.get_solver, so a race only pays for the states it has
+    not reached before and no process is started.
+    """
+
+    def poll(self, game: Game, budget: Optional[float] = None) -> Estimate:
+        """
+        Returns the odds of a race as an Estimate, like OddsEstimator.poll.
+        Args:
+            game (Game): The race.
+            budget (float, optional): Ignored; the odds are solved at once.
+        Returns:
+            Estimate: The exact odds.
+        """
+        odds = get_solver(len(game.suits), game.length).odds(game)
+        return Estimate(odds.wins, dict.fromkeys(odds.wins, 0.0), 0, True)
+
+    def close(self):
+        """
+        Nothing to release; kept for the interface of OddsEstimator.
+        """
+
+
+class OddsEstimator:
+    """
+    Anytime estimator of the odds of a race in progress.
+
+    Rollouts replay the race from the current position with the unseen cards
+    dealt again, so they only use what can be seen from the table. Batches of
+    rollouts run in a pool of worker processes while the caller goes on;
+    every poll merges the finished batches, keeps the pool busy on the
+    current position and waits for more results only within its time budget.
+    Tallies are kept per canonical position, so a position seen before, or
+    one that only differs by a permutation of the suits, starts from what was
+    already computed.
+    Attributes:
+        budget (float): Seconds a poll may wait for results.
+        workers (int): Worker processes; 0 runs the rollouts in the caller
+            within the budget.
+        batch (int): Rollouts per job.
+        target (int): Rollouts after which a position is not refined.
+        cache (dict): Win tallies and rollouts of every canonical position.
+    """
+
+    def __init__(
+        self,
+        budget: float = 0.05,
+        workers: Optional[int] = None,
+        batch: int = 200,
+        target: int = 20000,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initializes an OddsEstimator; the pool is started on first use.
+        Args:
+            budget (float): Seconds a poll may wait for results.
+            workers (int, optional): Worker processes. Defaults to the number
+                of CPUs; 0 runs the rollouts in the caller.
+            batch (int): Rollouts per job.
+            target (int): Rollouts after which a position is not refined.
+            seed (int, optional): The seed of the rollouts.
+        """
+        self.budget = budget
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.batch = batch
+        self.target = target
+        self.cache: Dict[tuple, list] = {}
+        self._rng = random.Random(seed)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._jobs: Dict[Future, Tuple[tuple, List[int]]] = {}
+
+    def _tally(self, key: tuple, players: int) -> List:
+        """
+        Returns the tallies of a position, creating them if needed.
+        Args:
+            key (tuple): The canonical key of the position.
+            players (int): The number of knights.
+        Returns:
+            list: The wins of every canonical position and the rollouts.
+        """
+        tally = self.cache.get(key)
+        if tally is None:
+            tally = self.cache[key] = [[0] * players, 0]
+        return tally
+
+    def _merge(self, key: tuple, order: List[int], wins: List[int]):
+        """
+        Adds the wins of a batch to the tallies of its position.
+        Args:
+            key (tuple): The canonical key of the position.
+            order (list): The knight index of every canonical position.
+            wins (list): The races won by every knight.
+        """
+        tally = self._tally(key, len(wins))
+        for pos, knight in enumerate(order):
+            tally[0][pos] += wins[knight]
+        tally[1] += sum(wins)
+
+    def _collect(self):
+        """
+        Merges every finished job.
+        """
+        for future in [future for future in self._jobs if future.done()]:
+            key, order = self._jobs.pop(future)
+            if not future.cancelled():
+                self._merge(key, order, future.result())
+
+    def _submit(self, game: Game, key: tuple, order: List[int]):
+        """
+        Keeps two jobs per worker queued for a position, dropping the queued
+        jobs of other positions.
+        Args:
+            game (Game): The position.
+            key (tuple): Its canonical key.
+            order (list): The knight index of every canonical position.
+        """
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers)
+        queued = 0
+        for future, (job_key, _) in list(self._jobs.items()):
+            if job_key == key:
+                queued += 1
+            elif future.cancel():
+                del self._jobs[future]
+        tally = self._tally(key, len(game.suits))
+        planned = tally[1] + queued * self.batch
+        snapshot = game.snapshot()
+        while queued < 2 * self.workers and planned < self.target:
+            future = self._pool.submit(
+                run_rollouts,
+                game.players,
+                game.length,
+                snapshot,
+                self.batch,
+                self._rng.getrandbits(64),
+            )
+            self._jobs[future] = (key, order)
+            queued += 1
+            planned += self.batch
+
+    def poll(self, game: Game, budget: Optional[float] = None) -> Estimate:
+        """
+        Refines the odds of a position until the budget runs out and
+        returns the best estimate so far.
+        Args:
+            game (Game): The position.
+            budget (float, optional): Seconds to wait for results. Defaults
+                to the estimator's budget.
+        Returns:
+            Estimate: The estimated odds.
+        """
+        if game.finished:
+            wins = {suit: float(n == game.winner) for n, suit in enumerate(game.suits)}
+            return Estimate(wins, dict.fromkeys(game.suits, 0.0), 0, True)
+        deadline = time.perf_counter() + (self.budget if budget is None else budget)
+        key, order = state_key(game)
+        tally = self._tally(key, len(game.suits))
+        if not self.workers:
+            snapshot = game.snapshot()
+            while tally[1] < self.target and time.perf_counter() < deadline:
+                wins = run_rollouts(
+                    game.players,
+                    game.length,
+                    snapshot,
+                    self.batch,
+                    self._rng.getrandbits(64),
+                )
+                self._merge(key, order, wins)
+            return self._estimate(game, key, order)
+
+        self._collect()
+        while tally[1] < self.target:
+            self._submit(game, key, order)
+            remaining = deadline - time.perf_counter()
+            running = [future for future, job in self._jobs.items() if job[0] == key]
+            if remaining <= 0 or not running:
+                break
+            wait(running, timeout=remaining, return_when=FIRST_COMPLETED)
+            self._collect()
+        return self._estimate(game, key, order)
+
+    def _estimate(self, game: Game, key: tuple, order: List[int]) -> Estimate:
+        """
+        Builds the estimate of a position from its tallies.
+        Args:
+            game (Game): The position.
+            key (tuple): Its canonical key.
+            order (list): The knight index of every canonical position.
+        Returns:
+            Estimate: The estimated odds.
+        """
+        counts, rollouts = self.cache[key]
+        wins = [0.0] * len(game.suits)
+        margins = [1.0] * len(game.suits)
+        if rollouts:
+            for pos, knight in enumerate(order):
+                prob = counts[pos] / rollouts
+                wins[knight] = prob
+                margins[knight] = Z_95 * math.sqrt(prob * (1 - prob) / rollouts)
+        return Estimate(
+            dict(zip(game.suits, wins)), dict(zip(game.suits, margins)), rollouts
+        )
+
+    def close(self):
+        """
+        Stops the worker pool, dropping the queued jobs.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self._jobs.clear()
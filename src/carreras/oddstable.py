@@ -0,0 +1,289 @@
+"""Precomputed odds tables stored as memory-mapped files"""
+
+import argparse
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from carreras.card import Card
+from carreras.game import Game
+from carreras.odds import Estimate
+from carreras.solver import SUIT_CARDS, Odds, OddsSolver, State
+
+# Version 2 stores the odds as doubles
+MAGIC = b"CROT\x02"
+HEADER = struct.Struct("<5sI")
+# players, length, slot bits, offset of the slots
+DIRECTORY = struct.Struct("<BBHQ")
+KEY = struct.Struct("<Q")
+
+STANDARD = tuple((players, length) for players in (2, 3, 4) for length in (4, 5, 6, 7))
+DEFAULT_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "carreras",
+    "odds.tbl",
+)
+
+# Radixes of the suit state fields; rows fit races up to length 14
+ROW_RADIX = 16
+COUNT_RADIX = SUIT_CARDS + 1
+_MULTIPLIER = 0x9E3779B97F4A7C15
+_MASK = (1 << 64) - 1
+
+
+def encode(state: State) -> int:
+    """
+    Packs a canonical solver state into a non-zero 63-bit key.
+    Args:
+        state (tuple): The shared flag and the sorted suit states.
+    Returns:
+        int: The key.
+    """
+    shared, suits = state
+    key = 0
+    for row, unseen, deck, disc in suits:
+        key = key * ROW_RADIX + row
+        key = ((key * COUNT_RADIX + unseen) * COUNT_RADIX + deck) * COUNT_RADIX + disc
+    return key * 2 + shared + 1
+
+
+def _slot(key: int, bits: int) -> int:
+    """
+    Returns the home slot of a key, by Fibonacci hashing.
+    Args:
+        key (int): The key.
+        bits (int): The number of bits of the slot index.
+    Returns:
+        int: The slot.
+    """
+    return ((key * _MULTIPLIER) & _MASK) >> (64 - bits)
+
+
+class TableSection:
+    """
+    The solved states of one configuration, an open addressing hash table
+    with linear probing inside the mapped file.
+
+    It stands in for the memo of an OddsSolver: get reads a slot from the
+    map, and states missing from the table are kept in memory once solved.
+    Attributes:
+        players (int): The number of knights.
+        length (int): The length of the race.
+    """
+
+    def __init__(
+        self, data: mmap.mmap, players: int, length: int, bits: int, offset: int
+    ):
+        """
+        Initializes a TableSection over a mapped file.
+        Args:
+            data (mmap): The mapped file.
+            players (int): The number of knights.
+            length (int): The length of the race.
+            bits (int): The number of bits of the slot index.
+            offset (int): Where the slots start in the file.
+        """
+        self.players = players
+        self.length = length
+        self._data = data
+        self._bits = bits
+        self._offset = offset
+        self._record = struct.Struct(f"<Q{players + 1}d")
+        self._extra: Dict[State, Tuple[Tuple[float, ...], float]] = {}
+
+    def get(self, state: State, default=None):
+        """
+        Looks up a solved state.
+        Args:
+            state (tuple): A canonical state.
+            default: The value returned for a state that is not stored.
+        Returns:
+            tuple: The probability that each suit wins, and the expected
+                remaining steps.
+        """
+        key = encode(state)
+        size = self._record.size
+        mask = (1 << self._bits) - 1
+        slot = _slot(key, self._bits)
+        while True:
+            record = self._record.unpack_from(self._data, self._offset + slot * size)
+            if record[0] == key:
+                return record[1:-1], record[-1]
+            if not record[0]:
+                return self._extra.get(state, default)
+            slot = (slot + 1) & mask
+
+    def __setitem__(self, state: State, solved: Tuple[Tuple[float, ...], float]):
+        self._extra[state] = solved
+
+
+def _pack(
+    players: int, memo: Dict[State, Tuple[Tuple[float, ...], float]]
+) -> Tuple[int, bytes]:
+    """
+    Lays out the solved states of a configuration as a hash table.
+    Args:
+        players (int): The number of knights.
+        memo (dict): The solved states.
+    Returns:
+        int: The number of bits of the slot index.
+        bytes: The slots.
+    """
+    bits = max(1, (2 * len(memo) - 1).bit_length())
+    record = struct.Struct(f"<Q{players + 1}d")
+    slots = bytearray(record.size << bits)
+    mask = (1 << bits) - 1
+    for state, (wins, steps) in memo.items():
+        key = encode(state)
+        slot = _slot(key, bits)
+        while KEY.unpack_from(slots, slot * record.size)[0]:
+            slot = (slot + 1) & mask
+        record.pack_into(slots, slot * record.size, key, *wins, steps)
+    return bits, bytes(slots)
+
+
+def build_table(path: str, configs: Iterable[Tuple[int, int]] = STANDARD) -> int:
+    """
+    Solves every state of some configurations and writes them to a table.
+    Args:
+        path (str): The table file; its directory is created if needed.
+        configs: (players, length) of every configuration.
+    Returns:
+        int: The number of states written.
+    """
+    sections = []
+    for players, length in configs:
+        solver = OddsSolver(players, length)
+        solver.initial_odds()
+        packed = _pack(solver.players, solver.memo)
+        sections.append((solver.players, length, len(solver.memo), packed))
+    offset = HEADER.size + DIRECTORY.size * len(sections)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, len(sections)))
+        for players, length, _, (bits, slots) in sections:
+            file.write(DIRECTORY.pack(players, length, bits, offset))
+            offset += len(slots)
+        for _, _, _, (_, slots) in sections:
+            file.write(slots)
+    return sum(states for _, _, states, _ in sections)
+
+
+class OddsTable:
+    """
+    Exact odds read from a precomputed table.
+
+    Nothing is read until the first lookup: the file is then mapped and its
+    directory parsed, and every lookup costs a hash and the read of a slot,
+    which the system pages in from the file on demand. Configurations that
+    are not in the table go to the fallback, if any.
+    Attributes:
+        path (str): The table file.
+        fallback: Polled for configurations the table does not hold, e.g.
+            an OddsEstimator.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, fallback=None):
+        """
+        Initializes an OddsTable; the file is opened on first use.
+        Args:
+            path (str): The table file.
+            fallback (optional): Polled for configurations the table does not
+                hold.
+        """
+        self.path = path
+        self.fallback = fallback
+        self._data: Optional[mmap.mmap] = None
+        self._solvers: Dict[Tuple[int, int], OddsSolver] = {}
+
+    def _open(self):
+        """
+        Maps the file and builds a solver over every section.
+        Raises:
+            ValueError: If the file is not an odds table.
+        """
+        with open(self.path, "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            data.close()
+            raise ValueError(f"{self.path} is not an odds table")
+        for n in range(count):
+            players, length, bits, offset = DIRECTORY.unpack_from(
+                data, HEADER.size + n * DIRECTORY.size
+            )
+            section = TableSection(data, players, length, bits, offset)
+            self._solvers[(players, length)] = OddsSolver(players, length, section)
+        self._data = data
+
+    def solver(self, players: int, length: int) -> Optional[OddsSolver]:
+        """
+        Returns the solver reading a configuration from the table.
+        Args:
+            players (int): The number of players.
+            length (int): The length of the race.
+        Returns:
+            OddsSolver: The solver, None if the table does not hold it.
+        """
+        if self._data is None:
+            self._open()
+        return self._solvers.get((min(players, len(Card.SUITS)), length))
+
+    def odds(self, game: Game) -> Optional[Odds]:
+        """
+        Returns the exact odds of a race in progress.
+        Args:
+            game (Game): The race.
+        Returns:
+            Odds: The odds, None if the table does not hold the configuration.
+        """
+        solver = self.solver(len(game.suits), game.length)
+        if solver is None:
+            return None
+        return solver.odds(game)
+
+    def poll(self, game: Game, budget: Optional[float] = None) -> Estimate:
+        """
+        Returns the odds of a race as an Estimate, like OddsEstimator.poll.
+        Args:
+            game (Game): The race.
+            budget (float, optional): Passed on to the fallback.
+        Returns:
+            Estimate: The exact odds, or the fallback's estimate.
+        """
+        odds = self.odds(game)
+        if odds is not None:
+            return Estimate(odds.wins, dict.fromkeys(odds.wins, 0.0), 0, True)
+        if self.fallback is not None:
+            return self.fallback.poll(game, budget)
+        zeros: List[float] = [0.0] * len(game.suits)
+        return Estimate(dict(zip(game.suits, zeros)), dict(zip(game.suits, zeros)), 0)
+
+    def close(self):
+        """
+        Unmaps the file and closes the fallback.
+        """
+        self._solvers.clear()
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+        if self.fallback is not None:
+            self.fallback.close()
+
+
+def main(argv: Optional[list] = None):
+    """Entry point of the carreras-oddstable console script."""
+    parser = argparse.ArgumentParser(
+        description="CARRERAS - Build the precomputed odds table"
+    )
+    parser.add_argument(
+        "path", nargs="?", default=DEFAULT_PATH, help="Table file to write"
+    )
+    args = parser.parse_args(argv)
+    states = build_table(args.path)
+    print(f"{states} states written to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Seekable race replays"""
+
+from typing import List
+
+from carreras.game import Game, GameSnapshot
+
+KEYFRAME_INTERVAL = 16
+
+
+class Replay:
+    """
+    A recorded race that can be shown at any step.
+
+    The replay keeps the trace entry of every step and a snapshot of the
+    game every `interval` steps, indexed by step // interval. Seeking
+    restores the keyframe at or before the target and applies the few trace
+    entries left, so any step is reached with at most interval - 1 deltas
+    whatever the length of the race; moving forward from the current step
+    only applies the entries in between.
+    Attributes:
+        interval (int): Steps between keyframes.
+        keyframes (list): The snapshot of the game at every interval steps.
+        trace (bytearray): The trace entry of every step.
+        game (Game): The game shown, at the current step.
+    """
+
+    def __init__(self, game: Game, interval: int = KEYFRAME_INTERVAL):
+        """
+        Records the rest of a race. The game itself is not played.
+        Args:
+            game (Game): The game to record, at the step the replay starts.
+            interval (int): Steps between keyframes.
+        """
+        if interval < 1:
+            raise ValueError("The keyframe interval must be positive")
+        self.interval = interval
+        self.keyframes: List[GameSnapshot] = []
+        recording = game.clone()
+        trace = bytearray(recording.step_count)
+        while True:
+            self.keyframes.append(recording.snapshot())
+            trace.extend(bytes(interval))
+            recording.step_many(interval, trace)
+            if recording.finished:
+                break
+        self.trace = trace[game.step_count : recording.step_count]
+        self.game = game.clone()
+        self._position = 0
+
+    @property
+    def steps(self) -> int:
+        """
+        Returns the number of recorded steps.
+        Returns:
+            int: The steps from the start of the replay to the end of the race.
+        """
+        return len(self.trace)
+
+    @property
+    def position(self) -> int:
+        """
+        Returns the step shown, counted from the start of the replay.
+        Returns:
+            int: The current step, 0 before the first recorded step.
+        """
+        return self._position
+
+    def seek(self, step: int) -> Game:
+        """
+        Moves the replay to a step, clamped to the recorded ones.
+        Args:
+            step (int): The step to show, 0 to steps.
+        Returns:
+            Game: The game at that step.
+        """
+        step = max(0, min(step, self.steps))
+        keyframe = min(step // self.interval, len(self.keyframes) - 1)
+        current = self._position
+        if not keyframe * self.interval <= current <= step:
+            self.game.restore(self.keyframes[keyframe])
+            current = keyframe * self.interval
+        apply = self.game.apply
+        for entry in self.trace[current:step]:
+            apply(entry)
+        self._position = step
+        return self.game
+
+    def forward(self, steps: int = 1) -> Game:
+        """
+        Moves the replay forward.
+        Args:
+            steps (int): The number of steps.
+        Returns:
+            Game: The game at the new step.
+        """
+        return self.seek(self._position + steps)
+
+    def backward(self, steps: int = 1) -> Game:
+        """
+        Moves the replay backward.
+        Args:
+            steps (int): The number of steps.
+        Returns:
+            Game: The game at the new step.
+        """
+        return self.seek(self._position - steps)
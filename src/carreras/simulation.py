@@ -0,0 +1,579 @@
+"""Headless batch simulation of races"""
+
+import argparse
+import hashlib
+import math
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple
+
+from carreras.card import Card
+from carreras.deck import RngLike, make_rng
+from carreras.game import Game
+
+
+class RaceSummary(NamedTuple):
+    """
+    The few numbers kept of a finished race.
+    Attributes:
+        winner (str): The suit of the winning knight.
+        steps (int): The number of steps the race took.
+        penalties (int): The number of revealed steps applied.
+        gap (int): Rows between the winner and the runner-up.
+    """
+
+    winner: str
+    steps: int
+    penalties: int
+    gap: int
+
+
+class SimulationResult:
+    """
+    Aggregated outcome of a batch of races.
+    Attributes:
+        players (int): The number of players of every race.
+        length (int): The length of every race.
+        races (int): The number of races simulated.
+        wins (Counter): Races won per suit.
+        lengths (Counter): Races per race length, measured in steps.
+        elapsed (float): Wall-clock seconds spent simulating.
+        confidence (float): The confidence of the intervals shown in the
+            report, None to show none.
+    """
+
+    def __init__(self, players: int, length: int):
+        """
+        Initializes an empty SimulationResult.
+        Args:
+            players (int): The number of players.
+            length (int): The length of the race.
+        """
+        self.players = players
+        self.length = length
+        self.races = 0
+        self.wins = Counter()
+        self.lengths = Counter()
+        self.elapsed = 0.0
+        self.confidence: Optional[float] = None
+
+    def add(self, winner: str, steps: int):
+        """
+        Tallies one finished race.
+        Args:
+            winner (str): The suit of the winning knight.
+            steps (int): The number of steps the race took.
+        """
+        self.races += 1
+        self.wins[winner] += 1
+        self.lengths[steps] += 1
+
+    def merge(self, other: "SimulationResult"):
+        """
+        Adds the tallies of another result into this one.
+        Args:
+            other (SimulationResult): A result for the same players and length.
+        """
+        self.races += other.races
+        self.wins.update(other.wins)
+        self.lengths.update(other.lengths)
+        self.elapsed += other.elapsed
+
+    def to_dict(self) -> dict:
+        """
+        Returns the result as plain data, e.g. to store it as JSON.
+        Returns:
+            dict: The players, length, races, tallies and elapsed time.
+        """
+        return {
+            "players": self.players,
+            "length": self.length,
+            "races": self.races,
+            "wins": dict(self.wins),
+            "lengths": {str(steps): n for steps, n in self.lengths.items()},
+            "elapsed": self.elapsed,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SimulationResult":
+        """
+        Builds a result from the data of to_dict.
+        Args:
+            data (dict): The data.
+        Returns:
+            SimulationResult: The result.
+        """
+        result = cls(data["players"], data["length"])
+        result.races = data["races"]
+        result.wins.update(data["wins"])
+        result.lengths.update({int(steps): n for steps, n in data["lengths"].items()})
+        result.elapsed = data["elapsed"]
+        return result
+
+    @property
+    def races_per_second(self) -> float:
+        """
+        Returns the simulation throughput.
+        Returns:
+            float: Races simulated per wall-clock second.
+        """
+        if not self.elapsed:
+            return 0.0
+        return self.races / self.elapsed
+
+    def mean_length(self) -> float:
+        """
+        Returns the average race length.
+        Returns:
+            float: The mean number of steps per race.
+        """
+        if not self.races:
+            return 0.0
+        return sum(steps * n for steps, n in self.lengths.items()) / self.races
+
+    def margins(self, confidence: float = 0.95) -> Dict[str, float]:
+        """
+        Returns the half-width of the confidence interval of the win rate of
+        every suit.
+
+        Intervals are Agresti-Coull's, which unlike the plain normal
+        approximation do not collapse to zero for a suit that has not won
+        yet.
+        Args:
+            confidence (float): The confidence level, between 0 and 1.
+        Returns:
+            dict: The half-width for every suit in the race, 1 before any race.
+        """
+        suits = Card.SUITS[: self.players]
+        if not self.races:
+            return dict.fromkeys(suits, 1.0)
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        races = self.races + z * z
+        margins = {}
+        for suit in suits:
+            rate = (self.wins[suit] + z * z / 2) / races
+            margins[suit] = z * math.sqrt(rate * (1 - rate) / races)
+        return margins
+
+    def report(self) -> str:
+        """
+        Builds a human readable report of the result.
+        Returns:
+            str: The report, one line per entry.
+        """
+        lines = [
+            f"Races: {self.races} ({self.players} players, length {self.length})",
+            f"Elapsed: {self.elapsed:.3f}s ({self.races_per_second:,.0f} races/s)",
+            "Wins per suit:",
+        ]
+        margins = self.margins(self.confidence) if self.confidence else {}
+        for suit, wins in sorted(self.wins.items()):
+            line = f"  {suit:<8}{wins:>12} ({wins / self.races:.4%}"
+            if suit in margins:
+                line += f" ± {margins[suit]:.4%}"
+            lines.append(line + ")")
+        if margins:
+            lines.append(f"Intervals at {self.confidence:.1%} confidence")
+        lines.append(f"Race length (mean {self.mean_length():.2f} steps):")
+        for steps, races in sorted(self.lengths.items()):
+            lines.append(f"  {steps:>4}{races:>12}")
+        return "\n".join(lines)
+
+
+def run_race(game: Game) -> Tuple[str, int]:
+    """
+    Runs a game until a knight crosses the finish line.
+    Args:
+        game (Game): A freshly created game.
+    Returns:
+        str: The suit of the winning knight.
+        int: The number of steps the race took.
+    """
+    result = game.run_to_completion()
+    return game.suits[result.winner], result.steps
+
+
+def race_summary(game: Game) -> RaceSummary:
+    """
+    Runs a game until a knight crosses the finish line and summarizes it.
+    Args:
+        game (Game): A freshly dealt game.
+    Returns:
+        RaceSummary: The summary of the race.
+    """
+    winner, rows, steps, penalties = game.run_to_completion()
+    runner_up = max((row for n, row in enumerate(rows) if n != winner), default=0)
+    return RaceSummary(game.suits[winner], steps, penalties, rows[winner] - runner_up)
+
+
+def race_summaries(
+    players: int = 4,
+    length: int = 7,
+    races: Optional[int] = None,
+    rng: Optional[RngLike] = None,
+    penalty: int = 1,
+) -> Iterator[RaceSummary]:
+    """
+    Runs races one by one and yields a summary of each, so a consumer can
+    aggregate any number of them without keeping them. A single game is
+    reset for every race.
+    Args:
+        players (int): The number of players.
+        length (int): The length of the race.
+        races (int, optional): The number of races; None never stops.
+        rng (optional): A seed or the generator used for every shuffle, see
+            make_rng. A seed starts one generator for all the races.
+        penalty (int): Rows a revealed step sends its suit back.
+    Yields:
+        RaceSummary: The summary of every race.
+    """
+    if rng is not None:
+        # A seed given to every reset would deal the same race again
+        rng = make_rng(rng)
+    game = Game(players, length, rng=rng, penalty=penalty)
+    count = 0
+    while races is None or count < races:
+        if count:
+            game.reset(rng)
+        yield race_summary(game)
+        count += 1
+
+
+def simulate(
+    players: int = 4,
+    length: int = 7,
+    races: int = 1000,
+    result: Optional[SimulationResult] = None,
+    rng: Optional[RngLike] = None,
+    penalty: int = 1,
+) -> SimulationResult:
+    """
+    Runs a batch of races without any board.
+    Args:
+        players (int): The number of players.
+        length (int): The length of the race.
+        races (int): The number of races to run.
+        result (SimulationResult, optional): A result to accumulate into.
+        rng (optional): A seed or the generator used for every shuffle, see
+            make_rng.
+        penalty (int): Rows a revealed step sends its suit back.
+    Returns:
+        SimulationResult: The tallies of the batch.
+    """
+    if result is None:
+        result = SimulationResult(players, length)
+    start = time.perf_counter()
+    for summary in race_summaries(players, length, races, rng, penalty):
+        result.add(summary.winner, summary.steps)
+    result.elapsed += time.perf_counter() - start
+    return result
+
+
+def simulate_vectorized(
+    players: int = 4,
+    length: int = 7,
+    races: int = 1000,
+    result: Optional[SimulationResult] = None,
+    batch: int = 100000,
+    rng=None,
+) -> SimulationResult:
+    """
+    Runs a batch of races with the NumPy vectorized engine.
+    Args:
+        players (int): The number of players.
+        length (int): The length of the race.
+        races (int): The number of races to run.
+        result (SimulationResult, optional): A result to accumulate into.
+        batch (int): The number of races stepped at once.
+        rng (optional): A numpy Generator or a seed for a new one.
+    Returns:
+        SimulationResult: The tallies of the batch.
+    """
+    import numpy as np
+    from carreras.vectorized import VectorizedRaces
+
+    if result is None:
+        result = SimulationResult(players, length)
+    rng = np.random.default_rng(rng)
+    start = time.perf_counter()
+    done = 0
+    while done < races:
+        size = min(batch, races - done)
+        engine = VectorizedRaces(size, players, length, rng).run()
+        for suit, wins in enumerate(np.bincount(engine.winner)):
+            if wins:
+                result.wins[Card.SUITS[suit]] += int(wins)
+        for steps, count in enumerate(np.bincount(engine.steps)):
+            if count:
+                result.lengths[steps] += int(count)
+        result.races += size
+        done += size
+    result.elapsed += time.perf_counter() - start
+    return result
+
+
+ENGINES = {"python": simulate, "numpy": simulate_vectorized}
+SHARD_SIZE = 10000
+# Bump whenever a change to the rules or to how races draw from their
+# generator makes the same seed give different results
+ENGINE_VERSION = 1
+
+
+def shard_seed(seed: int, index: int) -> int:
+    """
+    Derives the seed of one shard from the master seed of a job.
+
+    Hashing keeps the streams of neighbouring shards (and of neighbouring
+    master seeds) unrelated to each other.
+    Args:
+        seed (int): The master seed of the job.
+        index (int): The position of the shard in the job.
+    Returns:
+        int: A 64-bit seed for the shard.
+    """
+    digest = hashlib.blake2b(f"{seed}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def run_shard(
+    players: int,
+    length: int,
+    races: int,
+    seed: int,
+    engine: str = "python",
+    penalty: int = 1,
+) -> SimulationResult:
+    """
+    Runs one shard of a job with its own generator.
+    Args:
+        players (int): The number of players.
+        length (int): The length of the race.
+        races (int): The number of races of the shard.
+        seed (int): The seed of the shard, see shard_seed.
+        engine (str): The name of the engine, a key of ENGINES.
+        penalty (int): Rows a revealed step sends its suit back; the numpy
+            engine only plays the standard rule, 1.
+    Returns:
+        SimulationResult: The tallies of the shard.
+    """
+    if engine == "numpy":
+        if penalty != 1:
+            raise ValueError("The numpy engine only plays a penalty of 1")
+        return simulate_vectorized(players, length, races, rng=seed)
+    return simulate(players, length, races, rng=random.Random(seed), penalty=penalty)
+
+
+def simulate_parallel(
+    players: int = 4,
+    length: int = 7,
+    races: int = 1000,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    engine: str = "python",
+    shard_size: int = SHARD_SIZE,
+) -> SimulationResult:
+    """
+    Runs a job split in shards over a pool of worker processes.
+
+    The job is always cut in the same shards, each one seeded from the master
+    seed and its position, and the partial tallies are merged in shard order,
+    so the result does not depend on the number of workers.
+    Args:
+        players (int): The number of players.
+        length (int): The length of the race.
+        races (int): The number of races to run.
+        seed (int): The master seed of the job.
+        workers (int, optional): The number of worker processes. Defaults to
+            the number of CPUs; 1 runs every shard in this process.
+        engine (str): The name of the engine, a key of ENGINES.
+        shard_size (int): The number of races of each shard.
+    Returns:
+        SimulationResult: The tallies of the job.
+    """
+    shards = [
+        (players, length, min(shard_size, races - start), shard_seed(seed, n), engine)
+        for n, start in enumerate(range(0, races, shard_size))
+    ]
+    result = SimulationResult(players, length)
+    start = time.perf_counter()
+    if workers == 1:
+        for shard in shards:
+            result.merge(run_shard(*shard))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            for part in pool.map(run_shard, *zip(*shards)):
+                result.merge(part)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def races_needed(result: SimulationResult, margin: float, confidence: float) -> int:
+    """
+    Projects the races a result needs for every win rate to be known within
+    a margin, from the rates measured so far.
+    Args:
+        result (SimulationResult): The races run so far.
+        margin (float): The target half-width of every interval.
+        confidence (float): The confidence level, between 0 and 1.
+    Returns:
+        int: The projected number of races, at least those already run.
+    """
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    worst = max(
+        (result.wins[suit] + 1) * (result.races - result.wins[suit] + 1)
+        for suit in Card.SUITS[: result.players]
+    ) / (result.races + 2) ** 2
+    return max(result.races, math.ceil(z * z * worst / (margin * margin)))
+
+
+def simulate_until(
+    players: int = 4,
+    length: int = 7,
+    margin: float = 0.001,
+    confidence: float = 0.99,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    engine: str = "python",
+    shard_size: int = SHARD_SIZE,
+    max_races: Optional[int] = None,
+    growth: int = 2,
+) -> SimulationResult:
+    """
+    Runs races in growing rounds until every suit's win rate is known within
+    a margin at some confidence.
+
+    Every round runs the next shards of the job, seeded like
+    simulate_parallel, so stopping after some races gives the same tallies
+    as a fixed job of that size. After each round the rates measured so far
+    project the races still needed; the next round runs them, capped at
+    growth times the races already run so an early, noisy projection cannot
+    overshoot by much, and always at least one shard.
+    Args:
+        players (int): The number of players.
+        length (int): The length of the race.
+        margin (float): The target half-width of every interval.
+        confidence (float): The confidence level, between 0 and 1.
+        seed (int): The master seed of the job.
+        workers (int, optional): The number of worker processes. Defaults to
+            the number of CPUs; 1 runs every shard in this process.
+        engine (str): The name of the engine, a key of ENGINES.
+        shard_size (int): The number of races of each shard.
+        max_races (int, optional): Stop after this many races, rounded up to
+            whole shards, even if the target is not met; None runs until it
+            is.
+        growth (int): The most a round multiplies the races run.
+    Returns:
+        SimulationResult: The tallies of the job, reporting its intervals.
+    """
+    result = SimulationResult(players, length)
+    result.confidence = confidence
+    shards = 0
+    start = time.perf_counter()
+    pool = ProcessPoolExecutor(workers) if workers != 1 else None
+    try:
+        while max(result.margins(confidence).values()) > margin:
+            if max_races is not None and result.races >= max_races:
+                break
+            target = shard_size
+            if result.races:
+                target = races_needed(result, margin, confidence)
+                target = min(max(target, result.races + 1), growth * result.races)
+            if max_races is not None:
+                target = min(target, max_races)
+            end = max(shards + 1, -(-target // shard_size))
+            round_shards = [
+                (players, length, shard_size, shard_seed(seed, n), engine)
+                for n in range(shards, end)
+            ]
+            if pool is None:
+                parts = (run_shard(*shard) for shard in round_shards)
+            else:
+                parts = pool.map(run_shard, *zip(*round_shards))
+            for part in parts:
+                result.merge(part)
+            shards = end
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def main(argv: Optional[list] = None):
+    """Entry point of the carreras-sim console script."""
+    parser = argparse.ArgumentParser(
+        description="CARRERAS - Headless race simulation"
+    )
+    parser.add_argument(
+        "--players", type=int, default=4, help="Number of players (2-4)"
+    )
+    parser.add_argument("--length", type=int, default=7, help="Race length")
+    parser.add_argument(
+        "--races", type=int, default=100000, help="Number of races to run"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=sorted(ENGINES),
+        default="python",
+        help="Simulation engine; numpy steps many races at once",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes; defaults to one per CPU",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Master seed of the job"
+    )
+    parser.add_argument(
+        "--margin",
+        type=float,
+        default=None,
+        help="Run until every win rate is known within this margin, "
+        "ignoring --races",
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=0.99,
+        help="Confidence level of --margin",
+    )
+    parser.add_argument(
+        "--max-races",
+        type=int,
+        default=None,
+        help="Most races run with --margin",
+    )
+    args = parser.parse_args(argv)
+
+    seed = args.seed if args.seed is not None else random.getrandbits(63)
+    if args.margin is not None:
+        result = simulate_until(
+            args.players,
+            args.length,
+            args.margin,
+            args.confidence,
+            seed=seed,
+            workers=args.workers,
+            engine=args.engine,
+            max_races=args.max_races,
+        )
+    else:
+        result = simulate_parallel(
+            args.players,
+            args.length,
+            args.races,
+            seed=seed,
+            workers=args.workers,
+            engine=args.engine,
+        )
+    print(f"Seed: {seed}")
+    print(result.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""Exact win probabilities of a race"""
+
+import sys
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Tuple
+
+from carreras.card import Card
+from carreras.game import Game
+
+# Cards of each suit left once its knight is taken out of the deck
+SUIT_CARDS = Card.VALUES - 1
+
+# Per-suit state: (row, unseen, deck, discarded)
+SuitState = Tuple[int, int, int, int]
+State = Tuple[bool, Tuple[SuitState, ...]]
+
+
+class Odds(NamedTuple):
+    """
+    Exact odds of a race.
+    Attributes:
+        wins (dict): The probability that each suit wins.
+        steps (float): The expected number of steps until the race ends.
+    """
+
+    wins: Dict[str, float]
+    steps: float
+
+
+def canonical(shared: bool, suits: List[SuitState]) -> Tuple[State, List[int]]:
+    """
+    Sorts the suits of a state, since suits only differ by their counts.
+    Args:
+        shared (bool): True until the discard pile is first reshuffled.
+        suits (list): The state of every suit, in knight order.
+    Returns:
+        tuple: The canonical state.
+        list: The knight index of every canonical position.
+    """
+    order = sorted(range(len(suits)), key=suits.__getitem__)
+    return (shared, tuple(suits[i] for i in order)), order
+
+
+def visible_state(game: Game) -> Tuple[bool, List[SuitState]]:
+    """
+    Describes a game by what can be seen from the table.
+    Args:
+        game (Game): A game in progress.
+    Returns:
+        bool: True until the discard pile is first reshuffled.
+        list: The state of every suit, in knight order, as the game stands:
+            a pending penalty and the top card are not applied.
+    """
+    shared = not game.reshuffles
+    deck = [0] * len(game.suits)
+    for card in game.deck.cards:
+        deck[card.suit_index] += 1
+    unseen = [0] * len(game.suits)
+    for card, hidden in zip(game.step_cards, game.hidden):
+        if hidden:
+            unseen[card.suit_index] += 1
+    disc = [0] * len(game.suits)
+    for card in game.discarded.cards:
+        disc[card.suit_index] += 1
+    suits = [
+        (
+            row,
+            unseen[n] + deck[n] if shared else unseen[n],
+            0 if shared else deck[n],
+            disc[n],
+        )
+        for n, row in enumerate(game.rows)
+    ]
+    return shared, suits
+
+
+class OddsSolver:
+    """
+    Computes exact odds by dynamic programming over the states of a race.
+
+    The solver works with what can be seen from the table: the row of every
+    knight, how many cards of each suit have been discarded, and how many
+    are still unseen. Until the first reshuffle the deck and the hidden
+    steps are one shuffled pile, so a draw and a reveal both pick uniformly
+    among the unseen cards. After it the deck is the shuffled discard pile,
+    its composition is known, and only the hidden steps stay unseen.
+    Revealed steps always form a prefix, so their number follows from the
+    card counts. A state is taken just before drawing the card that is
+    played next; the penalty of a revealed step is folded into the step
+    that reveals it. Suits are interchangeable, so states are sorted and
+    solved once for every permutation of the suits.
+    Attributes:
+        players (int): The number of knights.
+        length (int): The length of the race.
+        memo (dict): Solved canonical states.
+    """
+
+    def __init__(self, players: int = 4, length: int = 7, memo=None):
+        """
+        Initializes an OddsSolver.
+        Args:
+            players (int): The number of players.
+            length (int): The length of the race.
+            memo (optional): Solved states to start from; anything with get
+                and item assignment, e.g. a section of an OddsTable.
+        """
+        self.players = min(players, len(Card.SUITS))
+        self.length = length
+        self.memo: Dict[State, Tuple[Tuple[float, ...], float]] = (
+            {} if memo is None else memo
+        )
+
+    def _revealed(self, suits: Tuple[SuitState, ...]) -> int:
+        """
+        Counts the revealed steps of a state.
+        Args:
+            suits (tuple): The state of every suit.
+        Returns:
+            int: The number of revealed steps.
+        """
+        return sum(SUIT_CARDS - unseen - deck - disc for _, unseen, deck, disc in suits)
+
+    def value(self, shared: bool, suits: List[SuitState]) -> Tuple[List[float], float]:
+        """
+        Solves a state in which the next card is about to be drawn.
+        Args:
+            shared (bool): True until the discard pile is first reshuffled.
+            suits (list): The state of every suit, in knight order.
+        Returns:
+            list: The probability that each knight wins.
+            float: The expected number of remaining steps.
+        """
+        state, order = canonical(shared, suits)
+        solved = self.memo.get(state)
+        if solved is None:
+            solved = self._solve(*state)
+            self.memo[state] = solved
+        probs, steps = solved
+        wins = [0.0] * len(suits)
+        for pos, knight in enumerate(order):
+            wins[knight] = probs[pos]
+        return wins, steps
+
+    def _solve(
+        self, shared: bool, suits: Tuple[SuitState, ...]
+    ) -> Tuple[Tuple[float, ...], float]:
+        """
+        Solves a canonical state by averaging over the next card drawn.
+        Args:
+            shared (bool): True until the discard pile is first reshuffled.
+            suits (tuple): The canonical state of every suit.
+        Returns:
+            tuple: The probability that each suit wins.
+            float: The expected number of remaining steps.
+        """
+        hidden = self.length - self._revealed(suits)
+        if shared:
+            # Any unseen card is equally likely to be the next one drawn
+            pool = sum(unseen for _, unseen, _, _ in suits)
+            deck = pool - hidden
+        else:
+            pool = deck = sum(cards for _, _, cards, _ in suits)
+        if not deck:
+            # The discard pile becomes the deck; the rest unseen are the steps
+            reshuffled = [(row, unseen, disc, 0) for row, unseen, _, disc in suits]
+            wins, steps = self.value(False, reshuffled)
+            return tuple(wins), steps
+
+        wins = [0.0] * len(suits)
+        steps = 0.0
+        for n, (row, unseen, cards, disc) in enumerate(suits):
+            count = unseen if shared else cards
+            if not count:
+                continue
+            prob = count / pool
+            drawn = list(suits)
+            if shared:
+                drawn[n] = (row, unseen - 1, cards, disc)
+            else:
+                drawn[n] = (row, unseen, cards - 1, disc)
+            sub_wins, sub_steps = self.play(shared, drawn, n)
+            for knight, win in enumerate(sub_wins):
+                wins[knight] += prob * win
+            steps += prob * sub_steps
+        return tuple(wins), steps
+
+    def play(
+        self, shared: bool, suits: List[SuitState], knight: int
+    ) -> Tuple[List[float], float]:
+        """
+        Solves the step that plays a card already drawn.
+        Args:
+            shared (bool): True until the discard pile is first reshuffled.
+            suits (list): The state of every suit without the drawn card.
+            knight (int): The knight of the suit of the drawn card.
+        Returns:
+            list: The probability that each knight wins.
+            float: The expected number of remaining steps.
+        """
+        row, unseen, cards, disc = suits[knight]
+        if row + 1 > self.length:
+            wins = [0.0] * len(suits)
+            wins[knight] = 1.0
+            return wins, 1.0
+        suits = list(suits)
+        suits[knight] = (row + 1, unseen, cards, disc + 1)
+        revealed = self._revealed(suits)
+        if min(s[0] for s in suits) <= revealed:
+            wins, steps = self.value(shared, suits)
+            return wins, steps + 1
+
+        # The next hidden step is revealed, and its suit goes back next step
+        hidden = sum(s[1] for s in suits)
+        wins = [0.0] * len(suits)
+        steps = 0.0
+        for n, (row, unseen, cards, disc) in enumerate(suits):
+            if not unseen:
+                continue
+            prob = unseen / hidden
+            penalized = list(suits)
+            penalized[n] = (row - 1, unseen - 1, cards, disc)
+            sub_wins, sub_steps = self.value(shared, penalized)
+            for other, win in enumerate(sub_wins):
+                wins[other] += prob * win
+            steps += prob * sub_steps
+        return wins, steps + 2
+
+    def initial_odds(self) -> Odds:
+        """
+        Solves a race that has not started.
+        Returns:
+            Odds: The odds of every suit and the expected race length.
+        """
+        suits = [(0, SUIT_CARDS, 0, 0)] * self.players
+        wins, steps = self._run(self.value, True, suits)
+        return Odds(dict(zip(Card.SUITS, wins)), steps + 1)
+
+    def odds(self, game: Game) -> Odds:
+        """
+        Solves a race in progress from what can be seen on the table.
+        Args:
+            game (Game): A game with the same players and length.
+        Returns:
+            Odds: The odds of every suit and the expected remaining steps.
+        """
+        if game.finished:
+            wins = [0.0] * len(game.suits)
+            wins[game.winner] = 1.0
+            return Odds(dict(zip(game.suits, wins)), 0.0)
+        shared, suits = visible_state(game)
+        step = game.min_row - 1
+        if step >= 0 and game.pending[step]:
+            knight = game.step_cards[step].suit_index
+            row, unseen_n, cards, disc_n = suits[knight]
+            suits[knight] = (row - 1, unseen_n, cards, disc_n)
+            wins, steps = self._run(self.value, shared, suits)
+            steps += 1
+        elif game.top_card is not None:
+            wins, steps = self._run(self.play, shared, suits, game.top_card.suit_index)
+        else:
+            wins, steps = self._run(self.value, shared, suits)
+            steps += 1
+        return Odds(dict(zip(game.suits, wins)), steps)
+
+    @staticmethod
+    def _run(solve, *args):
+        """
+        Runs a solver method with room for its recursion.
+        Args:
+            solve: The method to run.
+            *args: The arguments of the method.
+        Returns:
+            The result of the method.
+        """
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limit, 20000))
+        try:
+            return solve(*args)
+        finally:
+            sys.setrecursionlimit(limit)
+
+
+@lru_cache(maxsize=None)
+def get_solver(players: int = 4, length: int = 7) -> OddsSolver:
+    """
+    Returns the shared solver of a configuration, so solved states are kept.
+    Args:
+        players (int): The number of players.
+        length (int): The length of the race.
+    Returns:
+        OddsSolver: The solver.
+    """
+    return OddsSolver(players, length)
+
+
+def race_odds(players: int = 4, length: int = 7) -> Odds:
+    """
+    Returns the exact odds of a race that has not started.
+    Args:
+        players (int): The number of players.
+        length (int): The length of the race.
+    Returns:
+        Odds: The odds of every suit and the expected race length.
+    """
+    return get_solver(players, length).initial_odds()
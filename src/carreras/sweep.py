@@ -0,0 +1,346 @@
+"""Parameter sweeps over game configurations with an on-disk cache"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from carreras.card import Card
+from carreras.simulation import (
+    ENGINE_VERSION,
+    SHARD_SIZE,
+    SimulationResult,
+    run_shard,
+    shard_seed,
+)
+
+DEFAULT_CACHE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "carreras",
+    "sweep",
+)
+
+
+class Cell(NamedTuple):
+    """
+    One configuration of a sweep.
+    Attributes:
+        players (int): The number of players.
+        length (int): The length of the race.
+        penalty (int): Rows a revealed step sends its suit back.
+    """
+
+    players: int
+    length: int
+    penalty: int
+
+
+class SweepCache:
+    """
+    Stores the shards simulated for every cell, one JSON file per cell.
+
+    A cell is keyed by its configuration, the master seed, the shard size and
+    the engine version, and keeps the tallies of each of its shards in
+    order. Shard n of a cell always plays the same races, so a run that asks
+    for more races than are stored only simulates the shards after the
+    stored ones, and a run that asks for fewer reuses a prefix of them.
+    Attributes:
+        path (str): The cache directory.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE):
+        """
+        Initializes a SweepCache.
+        Args:
+            path (str): The cache directory, created on first write.
+        """
+        self.path = path
+
+    @staticmethod
+    def key(cell: Cell, seed: int, shard_size: int) -> dict:
+        """
+        Returns the key of a cell.
+        Args:
+            cell (Cell): The configuration.
+            seed (int): The master seed.
+            shard_size (int): The races of every shard.
+        Returns:
+            dict: The key.
+        """
+        return {
+            "players": cell.players,
+            "length": cell.length,
+            "penalty": cell.penalty,
+            "seed": seed,
+            "shard_size": shard_size,
+            "engine_version": ENGINE_VERSION,
+        }
+
+    def _file(self, key: dict) -> str:
+        """
+        Returns the file of a key.
+        Args:
+            key (dict): The key of a cell.
+        Returns:
+            str: The path of its file.
+        """
+        text = json.dumps(key, sort_keys=True)
+        name = hashlib.blake2b(text.encode(), digest_size=12).hexdigest()
+        return os.path.join(self.path, f"{name}.json")
+
+    def load(self, key: dict) -> List[SimulationResult]:
+        """
+        Reads the shards stored for a cell.
+        Args:
+            key (dict): The key of the cell.
+        Returns:
+            list: The tallies of every stored shard, in order.
+        """
+        try:
+            with open(self._file(key), encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return []
+        if data.get("key") != key:
+            return []
+        return [SimulationResult.from_dict(shard) for shard in data["shards"]]
+
+    def save(self, key: dict, shards: List[SimulationResult]):
+        """
+        Stores the shards of a cell, replacing the file atomically.
+        Args:
+            key (dict): The key of the cell.
+            shards (list): The tallies of every shard, in order.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        path = self._file(key)
+        with open(path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump({"key": key, "shards": [s.to_dict() for s in shards]}, file)
+        os.replace(path + ".tmp", path)
+
+
+class Sweep:
+    """
+    Simulates every cell of a grid of players, lengths and penalty rules.
+
+    Every cell plays the same shards of seeds, so cells are compared on the
+    same deals. The last shard of a cell only plays the races left, and a
+    cached shard is only reused when it holds as many races as its place
+    asks for, so a partial shard is played again by a longer sweep. Missing
+    shards of all the cells are fanned out together over a pool of worker
+    processes, and every cell is stored in the cache as soon as it is
+    complete.
+    Attributes:
+        cells (list): The configurations of the grid.
+        shards (int): Shards per cell.
+        races (int): Races per cell.
+        seed (int): The master seed.
+        shard_size (int): The races of every shard.
+        cache (SweepCache): Where the shards are stored, None for no cache.
+    """
+
+    def __init__(
+        self,
+        players: Sequence[int] = (2, 3, 4),
+        lengths: Sequence[int] = (4, 5, 6, 7),
+        penalties: Sequence[int] = (1,),
+        races: int = 10000,
+        seed: int = 0,
+        shard_size: int = SHARD_SIZE,
+        cache: Optional[SweepCache] = None,
+    ):
+        """
+        Initializes a Sweep.
+        Args:
+            players (list): Players of the grid, 1 to 4.
+            lengths (list): Race lengths of the grid.
+            penalties (list): Penalty rules of the grid.
+            races (int): Races per cell.
+            seed (int): The master seed.
+            shard_size (int): The races of every shard.
+            cache (SweepCache, optional): Where the shards are stored.
+        Raises:
+            ValueError: If a cell has more players than suits.
+        """
+        if max(players) > len(Card.SUITS):
+            raise ValueError(f"A race has at most {len(Card.SUITS)} players")
+        self.cells = [
+            Cell(p, length, penalty)
+            for p in players
+            for length in lengths
+            for penalty in penalties
+        ]
+        self.shard_size = shard_size
+        self.shards = -(-races // shard_size)
+        self.races = races
+        self.seed = seed
+        self.cache = cache
+
+    def _key(self, cell: Cell) -> dict:
+        """
+        Returns the cache key of a cell of this sweep.
+        Args:
+            cell (Cell): The configuration.
+        Returns:
+            dict: The key, see SweepCache.key.
+        """
+        return SweepCache.key(cell, self.seed, self.shard_size)
+
+    def _size(self, n: int) -> int:
+        """
+        Returns the races of a shard of every cell.
+        Args:
+            n (int): The position of the shard.
+        Returns:
+            int: The races, fewer than shard_size for a last partial shard.
+        """
+        return min(self.shard_size, self.races - n * self.shard_size)
+
+    def _missing(self, stored: Dict[Cell, list]) -> Iterator[Tuple[Cell, int]]:
+        """
+        Lists the shards still to simulate.
+        Args:
+            stored (dict): The shards already available for every cell.
+        Yields:
+            Cell: The cell of the shard.
+            int: The position of the shard.
+        """
+        for cell in self.cells:
+            for n in range(len(stored[cell]), self.shards):
+                yield cell, n
+
+    def run(self, workers: Optional[int] = None) -> Dict[Cell, SimulationResult]:
+        """
+        Runs the sweep, simulating only what the cache does not hold.
+        Args:
+            workers (int, optional): Worker processes. Defaults to the number
+                of CPUs; 1 runs every shard in this process.
+        Returns:
+            dict: The merged result of every cell.
+        """
+        stored: Dict[Cell, list] = {}
+        for cell in self.cells:
+            shards = self.cache.load(self._key(cell)) if self.cache else []
+            reused = []
+            for n, part in enumerate(shards[: self.shards]):
+                if part.races != self._size(n):
+                    break
+                reused.append(part)
+            stored[cell] = reused
+        missing = list(self._missing(stored))
+
+        def jobs():
+            for cell, n in missing:
+                seed = shard_seed(self.seed, n)
+                size = self._size(n)
+                yield cell.players, cell.length, size, seed, "python", cell.penalty
+
+        def count(cell: Cell, part: SimulationResult):
+            stored[cell].append(part)
+            if len(stored[cell]) == self.shards and self.cache is not None:
+                self.cache.save(self._key(cell), stored[cell])
+
+        if workers == 1:
+            for (cell, _), job in zip(missing, jobs()):
+                count(cell, run_shard(*job))
+        elif missing:
+            workers = workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(workers) as pool:
+                running = deque()
+                for (cell, _), job in zip(missing, jobs()):
+                    running.append((cell, pool.submit(run_shard, *job)))
+                    if len(running) >= 2 * workers:
+                        cell, future = running.popleft()
+                        count(cell, future.result())
+                while running:
+                    cell, future = running.popleft()
+                    count(cell, future.result())
+
+        results = {}
+        for cell in self.cells:
+            result = SimulationResult(cell.players, cell.length)
+            for part in stored[cell]:
+                result.merge(part)
+            results[cell] = result
+        return results
+
+
+FIELDS = ("players", "length", "penalty", "races", "mean_steps") + Card.SUITS
+
+
+def table(results: Dict[Cell, SimulationResult]) -> Iterator[tuple]:
+    """
+    Builds the table of a sweep.
+    Args:
+        results (dict): The result of every cell.
+    Yields:
+        tuple: The values of FIELDS for every cell.
+    """
+    for cell, result in results.items():
+        playing = Card.SUITS[: cell.players]
+        rates = tuple(
+            round(result.wins[suit] / result.races, 6) if suit in playing else ""
+            for suit in Card.SUITS
+        )
+        yield (*cell, result.races, round(result.mean_length(), 4), *rates)
+
+
+def main(argv: Optional[list] = None):
+    """Entry point of the carreras-sweep console script."""
+    parser = argparse.ArgumentParser(description="CARRERAS - Parameter sweep")
+    parser.add_argument(
+        "--players", type=int, nargs="+", default=[2, 3, 4], help="Players (1-4)"
+    )
+    parser.add_argument(
+        "--lengths", type=int, nargs="+", default=[4, 5, 6, 7], help="Race lengths"
+    )
+    parser.add_argument(
+        "--penalties",
+        type=int,
+        nargs="+",
+        default=[1],
+        help="Rows a revealed step sends its suit back",
+    )
+    parser.add_argument("--races", type=int, default=100000, help="Races per cell")
+    parser.add_argument("--seed", type=int, default=0, help="Master seed")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes; defaults to one per CPU",
+    )
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="Cache directory")
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Simulate every cell again"
+    )
+    parser.add_argument("--output", default=None, help="CSV file for the table")
+    args = parser.parse_args(argv)
+
+    try:
+        sweep = Sweep(
+            args.players,
+            args.lengths,
+            args.penalties,
+            args.races,
+            args.seed,
+            cache=None if args.no_cache else SweepCache(args.cache),
+        )
+    except ValueError as error:
+        parser.error(str(error))
+    rows = list(table(sweep.run(args.workers)))
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(FIELDS)
+            writer.writerows(rows)
+    print(",".join(FIELDS))
+    for row in rows:
+        print(",".join(str(value) for value in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+"""Tournaments of many races with aggregated standings"""
+
+import argparse
+import csv
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from carreras.card import Card
+from carreras.game import Game, GamePool
+from carreras.simulation import shard_seed
+
+
+class RaceSpec(NamedTuple):
+    """
+    One scheduled race of a tournament.
+    Attributes:
+        index (int): The position of the race in the tournament.
+        length (int): The length of the race.
+        seed (int): The seed of the race.
+        seats (tuple): The name of the player of every knight.
+    """
+
+    index: int
+    length: int
+    seed: int
+    seats: Tuple[str, ...]
+
+
+class RaceOutcome(NamedTuple):
+    """
+    The compact result of a race, all a tournament keeps of it.
+    Attributes:
+        index (int): The position of the race in the tournament.
+        seats (tuple): The name of the player of every knight.
+        winner (int): The index of the winning knight.
+        rows (tuple): The final row of every knight.
+        steps (int): The number of steps the race took.
+    """
+
+    index: int
+    seats: Tuple[str, ...]
+    winner: int
+    rows: Tuple[int, ...]
+    steps: int
+
+
+# The games of the races played by this process, reused batch after batch
+GAMES = GamePool()
+
+
+def play_race(spec: RaceSpec, pool: GamePool = GAMES) -> RaceOutcome:
+    """
+    Plays a scheduled race without any board.
+    Args:
+        spec (RaceSpec): The race.
+        pool (GamePool): Where the game of the race is taken from.
+    Returns:
+        RaceOutcome: Its result.
+    """
+    game = pool.acquire(len(spec.seats), spec.length, list(spec.seats), spec.seed)
+    result = game.run_to_completion()
+    pool.release(game)
+    return RaceOutcome(spec.index, spec.seats, result.winner, result.rows, result.steps)
+
+
+def play_races(specs: List[RaceSpec]) -> List[RaceOutcome]:
+    """
+    Plays a batch of scheduled races, the unit of work of a worker process.
+    Args:
+        specs (list): The races.
+    Returns:
+        list: Their results, in the same order.
+    """
+    return [play_race(spec) for spec in specs]
+
+
+class Standing:
+    """
+    The running record of one player.
+    Attributes:
+        name (str): The name of the player.
+        races (int): Races played.
+        wins (int): Races won.
+        points (int): Knights finished behind, summed over every race.
+    """
+
+    __slots__ = ("name", "races", "wins", "points")
+
+    def __init__(self, name: str):
+        """
+        Initializes an empty Standing.
+        Args:
+            name (str): The name of the player.
+        """
+        self.name = name
+        self.races = 0
+        self.wins = 0
+        self.points = 0
+
+
+class Standings:
+    """
+    Tournament standings, updated one race at a time.
+    Attributes:
+        entries (dict): The Standing of every player, by name.
+        races (int): Races counted.
+    """
+
+    FIELDS = ("rank", "player", "races", "wins", "points", "win_rate")
+
+    def __init__(self, players: Sequence[str] = ()):
+        """
+        Initializes the standings.
+        Args:
+            players (list, optional): Players listed before their first race.
+        """
+        self.entries: Dict[str, Standing] = {
+            name: Standing(name) for name in players
+        }
+        self.races = 0
+
+    def update(self, outcome: RaceOutcome):
+        """
+        Counts a race.
+        Args:
+            outcome (RaceOutcome): The result of the race.
+        """
+        self.races += 1
+        for knight, name in enumerate(outcome.seats):
+            entry = self.entries.get(name)
+            if entry is None:
+                entry = self.entries[name] = Standing(name)
+            row = outcome.rows[knight]
+            entry.races += 1
+            entry.wins += knight == outcome.winner
+            entry.points += sum(other < row for other in outcome.rows)
+
+    def ranking(self) -> List[Standing]:
+        """
+        Sorts the players by points, then wins, then name.
+        Returns:
+            list: The Standing of every player, best first.
+        """
+        return sorted(
+            self.entries.values(), key=lambda e: (-e.points, -e.wins, e.name)
+        )
+
+    def rows(self) -> Iterator[tuple]:
+        """
+        Builds the table of the standings.
+        Yields:
+            tuple: The values of FIELDS for every player, best first.
+        """
+        for rank, entry in enumerate(self.ranking(), 1):
+            rate = entry.wins / entry.races if entry.races else 0.0
+            yield (
+                rank,
+                entry.name,
+                entry.races,
+                entry.wins,
+                entry.points,
+                round(rate, 4),
+            )
+
+    def report(self) -> str:
+        """
+        Builds a human readable table of the standings.
+        Returns:
+            str: The table, one line per player.
+        """
+        lines = [f"Races: {self.races}"]
+        for rank, name, races, wins, points, rate in self.rows():
+            lines.append(
+                f"{rank:>3}. {name:<16}{races:>8}{wins:>8}{points:>10} ({rate:.2%})"
+            )
+        return "\n".join(lines)
+
+    def write(self, path: str):
+        """
+        Writes the table of the standings as CSV.
+        Args:
+            path (str): The file to write.
+        """
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(self.FIELDS)
+            writer.writerows(self.rows())
+
+
+class Tournament:
+    """
+    A series of races for every combination of table size and race length.
+
+    Races are scheduled lazily: race n of a series seats the players starting
+    from player n, so the suits are spread evenly among players, and its seed
+    is derived from the tournament seed and its position. Running a
+    tournament only keeps the outcome of the races in flight; standings are
+    updated in schedule order as they come in, so the result does not
+    depend on the number of workers.
+    Attributes:
+        entrants (list): The names of the players.
+        players (list): Knights per race, one series for each.
+        lengths (list): Race lengths, one series for each.
+        races (int): Races per series.
+        seed (int): The seed of the tournament.
+    """
+
+    def __init__(
+        self,
+        entrants: Sequence[str],
+        players: Sequence[int] = (4,),
+        lengths: Sequence[int] = (7,),
+        races: int = 1,
+        seed: int = 0,
+    ):
+        """
+        Initializes a Tournament.
+        Args:
+            entrants (list): The names of the players.
+            players (list): Knights per race, one series for each.
+            lengths (list): Race lengths, one series for each.
+            races (int): Races per series.
+            seed (int): The seed of the tournament.
+        Raises:
+            ValueError: If a race has more knights than entrants or suits.
+        """
+        if len(set(entrants)) != len(entrants):
+            raise ValueError("Entrant names must be unique")
+        if max(players) > len(entrants):
+            raise ValueError("A race cannot have more knights than entrants")
+        if max(players) > len(Card.SUITS):
+            raise ValueError(f"A race has at most {len(Card.SUITS)} knights")
+        self.entrants = list(entrants)
+        self.players = list(players)
+        self.lengths = list(lengths)
+        self.races = races
+        self.seed = seed
+
+    def __len__(self) -> int:
+        """
+        Returns the number of races of the tournament.
+        """
+        return len(self.players) * len(self.lengths) * self.races
+
+    def schedule(self) -> Iterator[RaceSpec]:
+        """
+        Lists the races of the tournament, one series after another.
+        Yields:
+            RaceSpec: Every race, in order.
+        """
+        index = 0
+        count = len(self.entrants)
+        for players in self.players:
+            for length in self.lengths:
+                for n in range(self.races):
+                    seats = tuple(
+                        self.entrants[(n + k) % count] for k in range(players)
+                    )
+                    yield RaceSpec(index, length, shard_seed(self.seed, index), seats)
+                    index += 1
+
+    def run(
+        self,
+        workers: Optional[int] = None,
+        batch: int = 250,
+        on_result: Optional[Callable[[RaceOutcome, Standings], None]] = None,
+    ) -> Standings:
+        """
+        Plays the tournament without any board.
+        Args:
+            workers (int, optional): Worker processes. Defaults to the number
+                of CPUs; 1 plays every race in this process.
+            batch (int): Races sent to a worker at once.
+            on_result (callable, optional): Called with every outcome and the
+                updated standings.
+        Returns:
+            Standings: The final standings.
+        """
+        standings = Standings(self.entrants)
+        specs = self.schedule()
+        batches = iter(lambda: list(islice(specs, batch)), [])
+
+        def count(outcomes: List[RaceOutcome]):
+            for outcome in outcomes:
+                standings.update(outcome)
+                if on_result is not None:
+                    on_result(outcome, standings)
+
+        if workers == 1:
+            for specs_batch in batches:
+                count(play_races(specs_batch))
+            return standings
+        workers = workers or os.cpu_count() or 1
+        # A bounded window of batches keeps memory flat however long it runs
+        window = 2 * workers
+        with ProcessPoolExecutor(workers) as pool:
+            running = deque()
+            for specs_batch in batches:
+                running.append(pool.submit(play_races, specs_batch))
+                if len(running) >= window:
+                    count(running.popleft().result())
+            while running:
+                count(running.popleft().result())
+        return standings
+
+    def show(self, board) -> Standings:
+        """
+        Plays the tournament one race after another on a board.
+        Args:
+            board (Board): The board, curses or graphic.
+        Returns:
+            Standings: The final standings.
+        """
+        standings = Standings(self.entrants)
+        for spec in self.schedule():
+            game = Game(len(spec.seats), spec.length, list(spec.seats), rng=spec.seed)
+            board.draw_game(game)
+            ended = False
+            while not ended:
+                ended = game.step()
+                board.draw_game(game)
+            result = game.result()
+            standings.update(
+                RaceOutcome(
+                    spec.index, spec.seats, result.winner, result.rows, result.steps
+                )
+            )
+        return standings
+
+
+def main(argv: Optional[list] = None):
+    """Entry point of the carreras-tournament console script."""
+    parser = argparse.ArgumentParser(description="CARRERAS - Tournament")
+    parser.add_argument("entrants", nargs="+", help="Names of the players")
+    parser.add_argument(
+        "--players", type=int, nargs="+", default=[4], help="Knights per race (2-4)"
+    )
+    parser.add_argument(
+        "--lengths", type=int, nargs="+", default=[7], help="Race lengths"
+    )
+    parser.add_argument(
+        "--races", type=int, default=100, help="Races per players and length"
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Tournament seed")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes; defaults to one per CPU",
+    )
+    parser.add_argument(
+        "--output", default="standings.csv", help="File for the final table"
+    )
+    parser.add_argument(
+        "--show", action="store_true", help="Show every race on the curses board"
+    )
+    args = parser.parse_args(argv)
+
+    seed = args.seed if args.seed is not None else random.getrandbits(63)
+    try:
+        tournament = Tournament(
+            args.entrants, args.players, args.lengths, args.races, seed
+        )
+    except ValueError as error:
+        parser.error(str(error))
+    if args.show:
+        from carreras.board import Board
+
+        board = Board()
+        try:
+            standings = tournament.show(board)
+        finally:
+            board.destroy()
+    else:
+        standings = tournament.run(args.workers)
+    standings.write(args.output)
+    print(f"Seed: {seed}")
+    print(standings.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""Compact binary race traces"""
+
+import mmap
+import os
+from typing import BinaryIO, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+
+from carreras.card import Card
+from carreras.game import (
+    TRACE_ADVANCE,
+    TRACE_CARD,
+    TRACE_DRAW,
+    TRACE_KIND,
+    TRACE_PENALTY,
+    TRACE_RESHUFFLE,
+    TRACE_REVEAL,
+    Game,
+)
+
+MAGIC = b"CRTR\x01"
+
+# Markers, in the codes a card never takes
+TRACE_START = 0x38  # ORed with players - 1, followed by the length
+TRACE_END = 0x3C  # Followed by the winning knight
+
+STEP_KINDS = (TRACE_DRAW, TRACE_ADVANCE, TRACE_REVEAL, TRACE_PENALTY)
+
+
+class TraceEvent(NamedTuple):
+    """
+    One record of a trace.
+    Attributes:
+        kind (int): One of the TRACE_* kinds, or a marker.
+        value (int): The card code of a step, the players of a race start,
+            the winning knight of a race end, 0 for a reshuffle.
+        extra (int): The length of the race for a race start, 0 otherwise.
+    """
+
+    kind: int
+    value: int
+    extra: int = 0
+
+    @property
+    def card(self) -> Optional[Card]:
+        """
+        Returns the card of a step event.
+        Returns:
+            Card: The card drawn or revealed, None for a marker.
+        """
+        if self.kind in STEP_KINDS:
+            return Card.BY_CODE[self.value]
+        return None
+
+
+class TraceWriter:
+    """
+    Buffered, append-only writer of race traces.
+
+    Every event takes one byte, except the race start and end markers that
+    take two: a step is its TRACE_* kind ORed with the code of the card it
+    drew or revealed, and the knight moves follow from those cards. Games
+    are recorded by attaching the writer, which then receives every step
+    straight from Game.step; append is the bytearray's own method, so
+    recording adds no Python call per step. The buffer is written out
+    between races once it is full, and on flush or close.
+    Attributes:
+        path (str): The trace file.
+        buffer_size (int): Bytes kept in memory before writing them out.
+        races (int): The number of races recorded.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], buffer_size: int = 1 << 16):
+        """
+        Opens a trace file for appending, writing its header if it is new.
+        Args:
+            path (str): The trace file.
+            buffer_size (int): Bytes kept in memory before writing them out.
+        """
+        self.path = os.fspath(path)
+        self.buffer_size = buffer_size
+        self.races = 0
+        self._file: Optional[BinaryIO] = open(self.path, "ab")
+        self._buffer = bytearray()
+        if not self._file.tell():
+            self._buffer += MAGIC
+        self.append = self._buffer.append
+
+    def attach(self, game: Game):
+        """
+        Starts recording a game; it is detached when its race ends.
+        Args:
+            game (Game): A game with at most 4 players and length 255.
+        """
+        self._buffer.append(TRACE_START | (len(game.suits) - 1))
+        self._buffer.append(game.length)
+        game.recorder = self
+
+    def finish(self, game: Game):
+        """
+        Ends the record of a game, called by the game when its race ends.
+        Args:
+            game (Game): The finished game.
+        """
+        self._buffer.append(TRACE_END)
+        self._buffer.append(game.winner)
+        game.recorder = None
+        self.races += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def record(self, game: Game) -> Game:
+        """
+        Plays a whole race while recording it.
+        Args:
+            game (Game): A game that has not started.
+        Returns:
+            Game: The finished game.
+        """
+        self.attach(game)
+        game.run_to_completion()
+        return game
+
+    def flush(self):
+        """
+        Writes the buffered events out to the file.
+        """
+        if self._buffer:
+            self._file.write(self._buffer)
+            del self._buffer[:]
+        self._file.flush()
+
+    def close(self):
+        """
+        Flushes and closes the file.
+        """
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "TraceWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TraceReader:
+    """
+    Reads a trace file through a memory map, so files of any size are
+    iterated without being loaded.
+    Attributes:
+        path (str): The trace file.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        """
+        Maps a trace file.
+        Args:
+            path (str): The trace file.
+        Raises:
+            ValueError: If the file is not a trace.
+        """
+        self.path = os.fspath(path)
+        with open(self.path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[: len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{self.path} is not a race trace")
+
+    def events(self) -> Iterator[TraceEvent]:
+        """
+        Iterates over every event of the file.
+        Yields:
+            TraceEvent: The events, in the order they were written.
+        """
+        data = self._map
+        size = len(data)
+        pos = len(MAGIC)
+        while pos < size:
+            byte = data[pos]
+            pos += 1
+            kind = byte & TRACE_KIND
+            if kind or byte < TRACE_RESHUFFLE:
+                yield TraceEvent(kind, byte & TRACE_CARD)
+            elif byte == TRACE_RESHUFFLE:
+                yield TraceEvent(TRACE_RESHUFFLE, 0)
+            elif byte & TRACE_END == TRACE_END:
+                yield TraceEvent(TRACE_END, data[pos])
+                pos += 1
+            else:
+                yield TraceEvent(TRACE_START, (byte & 0x03) + 1, data[pos])
+                pos += 1
+
+    __iter__ = events
+
+    def races(self) -> Iterator[Tuple[int, int, int, bytes]]:
+        """
+        Iterates over the races of the file.
+        Yields:
+            int: The number of players.
+            int: The length of the race.
+            int: The winning knight.
+            bytes: The step and reshuffle events of the race.
+        """
+        data = self._map
+        size = len(data)
+        pos = len(MAGIC)
+        while pos < size:
+            start = data[pos]
+            players, length = (start & 0x03) + 1, data[pos + 1]
+            end = data.find(bytes([TRACE_END]), pos + 2)
+            if end < 0:
+                raise ValueError(f"{self.path} ends in an unfinished race")
+            yield players, length, data[end + 1], data[pos + 2 : end]
+            pos = end + 2
+
+    def close(self):
+        """
+        Unmaps the file.
+        """
+        self._map.close()
+
+    def __enter__(self) -> "TraceReader":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def moves(events: Iterable[TraceEvent]) -> Iterator[Tuple[int, int]]:
+    """
+    Derives the knight moves of a stream of events.
+
+    A step that plays the top card moves its suit forward, and a penalty
+    moves back the suit of the step revealed just before it.
+    Args:
+        events: The events of one or more races.
+    Yields:
+        int: The index of the knight.
+        int: The rows it moves, 1 or -1.
+    """
+    top = revealed = None
+    for event in events:
+        kind = event.kind
+        if kind == TRACE_START:
+            top = revealed = None
+        elif kind in STEP_KINDS:
+            if kind == TRACE_ADVANCE or kind == TRACE_REVEAL:
+                yield top, 1
+            elif kind == TRACE_PENALTY:
+                yield revealed, -1
+            if kind == TRACE_REVEAL:
+                revealed = event.value // Card.VALUES
+            else:
+                top = event.value // Card.VALUES
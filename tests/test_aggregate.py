@@ -0,0 +1,86 @@
+"""Tests for the streaming aggregators."""
+
+import random
+import statistics
+
+import pytest
+
+from carreras.aggregate import (
+    Aggregator,
+    Histogram,
+    Pipeline,
+    QuantileSketch,
+    Welford,
+    WinCounter,
+    aggregate_parallel,
+    aggregate_stream,
+)
+from carreras.simulation import race_summaries
+
+
+def summaries(races, seed):
+    return list(race_summaries(3, 5, races, random.Random(seed)))
+
+
+def test_aggregate_matches_batch_statistics():
+    """Test the aggregators agree with statistics computed on lists."""
+    races = summaries(2000, 1)
+    steps = [race.steps for race in races]
+    pipeline = Pipeline(
+        WinCounter(),
+        Welford("steps"),
+        Histogram("steps", 0, 60, 30),
+        QuantileSketch("steps", alpha=0.01),
+    )
+    wins, welford, histogram, sketch = pipeline.consume(iter(races)).aggregators
+    assert wins.races == 2000 and sum(wins.wins.values()) == 2000
+    assert welford.mean == pytest.approx(statistics.mean(steps))
+    assert welford.variance == pytest.approx(statistics.variance(steps))
+    assert sum(histogram.counts) + histogram.overflow + histogram.underflow == 2000
+    median = statistics.quantiles(steps, n=100, method="inclusive")[49]
+    assert sketch.quantile(0.5) == pytest.approx(median, rel=0.03)
+    assert all(race.gap >= 1 for race in races)
+
+
+def test_aggregate_merge_equals_whole():
+    """Test merging shards gives the aggregate of all their races."""
+    first, second = summaries(500, 2), summaries(700, 3)
+    whole = Pipeline(
+        Welford("penalties"), QuantileSketch("steps"), Histogram("gap", 0, 10, 10)
+    )
+    whole.consume(first + second)
+    merged = whole.empty().consume(first)
+    merged.merge(whole.empty().consume(second))
+    assert merged.aggregators[0].mean == pytest.approx(whole.aggregators[0].mean)
+    assert merged.aggregators[0].variance == pytest.approx(
+        whole.aggregators[0].variance
+    )
+    assert merged.aggregators[1].quantile(0.9) == whole.aggregators[1].quantile(0.9)
+    assert merged.aggregators[2].counts == whole.aggregators[2].counts
+    with pytest.raises(ValueError):
+        Histogram(bins=3).merge(Histogram(bins=4))
+
+
+def test_aggregate_parallel_and_open_ended():
+    """Test sharded runs do not depend on workers and can run open ended."""
+    inline = aggregate_parallel(WinCounter(), 2, 4, 250, 7, workers=1, shard_size=60)
+    pooled = aggregate_parallel(WinCounter(), 2, 4, 250, 7, workers=2, shard_size=60)
+    assert inline.wins == pooled.wins and inline.races == 250
+    stream = aggregate_stream(Welford(), 2, 4, seed=7, workers=1, shard_size=50)
+    for shards, aggregate in enumerate(stream, 1):
+        if shards == 3:
+            break
+    assert aggregate.count == 150
+
+
+def test_aggregator_is_abstract():
+    """Test an aggregator must implement add, merge and empty."""
+    with pytest.raises(TypeError):
+        Aggregator()
+
+    class Partial(Aggregator):
+        def add(self, summary):
+            pass
+
+    with pytest.raises(TypeError):
+        Partial()
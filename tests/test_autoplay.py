@@ -0,0 +1,70 @@
+"""Tests for the unattended playback of races."""
+
+from unittest.mock import Mock
+
+from carreras.autoplay import Autoplay
+from carreras.game import Game
+
+
+class FakeClock:
+    """A clock that only moves when the board draws or idles."""
+
+    def __init__(self, draw_cost: float):
+        self.now = 0.0
+        self.draw_cost = draw_cost
+
+    def __call__(self) -> float:
+        return self.now
+
+    def board(self) -> Mock:
+        board = Mock()
+
+        def draw_game(game, wait=True):
+            self.now += self.draw_cost
+
+        def idle(seconds):
+            assert seconds > 0
+            self.now += seconds
+
+        board.draw_game = Mock(side_effect=draw_game)
+        board.idle = Mock(side_effect=idle)
+        return board
+
+
+def test_autoplay_paces_steps():
+    """Test a fast board draws every step at the requested rate."""
+    clock = FakeClock(draw_cost=0.01)
+    board = clock.board()
+    game = Game(3, 5, rng=4)
+    stats = Autoplay(10, clock).run(board, game)
+    assert game.finished
+    assert stats.steps == game.step_count
+    assert stats.frames == stats.steps + 1 and stats.skipped == 0
+    assert stats.steps / 10 <= stats.elapsed < stats.steps / 10 + 0.1
+    assert all(not c.kwargs["wait"] for c in board.draw_game.call_args_list)
+
+
+def test_autoplay_skips_frames():
+    """Test a slow board skips frames while the race keeps its pace."""
+    clock = FakeClock(draw_cost=0.35)
+    board = clock.board()
+    game = Game(3, 5, rng=4)
+    stats = Autoplay(10, clock).run(board, game)
+    assert game.finished
+    assert stats.skipped > 0
+    assert stats.frames + stats.skipped == stats.steps + 1
+    assert stats.elapsed < stats.steps / 10 + 0.8
+    expected = Game(3, 5, rng=4).run_to_completion()
+    assert game.result() == expected
+
+
+def test_autoplay_max_speed():
+    """Test full speed draws only the final state."""
+    clock = FakeClock(draw_cost=0.5)
+    board = clock.board()
+    game = Game(4, 7, rng=9)
+    stats = Autoplay(None, clock).run(board, game)
+    assert game.finished
+    board.draw_game.assert_called_once_with(game, wait=False)
+    board.idle.assert_not_called()
+    assert stats.frames == 1 and stats.skipped == stats.steps - 1
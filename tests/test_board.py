@@ -1,8 +1,11 @@
 """Tests for the Board class (curses interface)."""
 
-from carreras.board import Board
+from carreras.board import Board, fold_case
+from carreras.game import Game
+from carreras.odds import OddsEstimator
+from carreras.replay import Replay
 import pytest
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 
 @pytest.fixture
@@ -52,5 +55,155 @@ def test_board_get_game_length(mock_screen):
     # Simulate unique names for each player
     mock_screen.getstr = Mock(side_effect=[b"A", b"B", b"C", b"D"])
     board = Board(mock_screen)
-    players, length, players_names = board.get_game_params()
+    with patch("carreras.board.curses.doupdate"):
+        players, length, players_names = board.get_game_params()
     assert players == 4 and length == 4 and players_names == ["A", "B", "C", "D"]
+
+
+def test_board_draw_replay(mock_screen):
+    """Test de repetición navegable en Board."""
+    keys = [ord("."), ord(">"), ord("$"), ord(","), ord("0"), 10]
+    mock_screen.getch = Mock(side_effect=keys)
+    mock_screen.derwin = Mock(return_value=Mock(getmaxyx=Mock(return_value=(20, 20))))
+    board = Board(mock_screen)
+    replay = Replay(Game(2, 4, rng=3))
+    with patch("carreras.board.curses.color_pair", return_value=0), patch(
+        "carreras.board.curses.doupdate"
+    ):
+        board.draw_replay(replay)
+    assert replay.position == 0
+    messages = [c.args[2] for c in mock_screen.addstr.call_args_list]
+    assert f"{replay.steps}/{replay.steps}  , . < > 0 $" in messages
+    assert f"{replay.steps - 1}/{replay.steps}  , . < > 0 $" in messages
+
+
+def test_board_draw_game_odds(mock_screen):
+    """Test de probabilidades de victoria junto a la clasificación."""
+    window = Mock(getmaxyx=Mock(return_value=(20, 20)))
+    window.derwin = Mock(return_value=window)
+    mock_screen.derwin = Mock(return_value=window)
+    board = Board(mock_screen)
+    board.odds = OddsEstimator(budget=10, workers=0, batch=50, target=100)
+    with patch("carreras.board.curses.color_pair", return_value=0), patch(
+        "carreras.board.curses.doupdate"
+    ):
+        board.draw_game(Game(2, 4, rng=1), wait=False)
+    messages = [c.args[2] for c in window.addstr.call_args_list]
+    assert sum("%±" in message for message in messages) == 2
+
+
+def test_board_draw_game_retained(mock_screen):
+    """Test de ventanas persistentes: solo se repintan las cartas que cambian."""
+    windows = []
+
+    def derwin(*args):
+        window = Mock(getmaxyx=Mock(return_value=(20, 20)))
+        window.derwin = Mock(side_effect=derwin)
+        windows.append(window)
+        return window
+
+    mock_screen.derwin = Mock(side_effect=derwin)
+    board = Board(mock_screen)
+    game = Game(2, 4, rng=1)
+    with patch("carreras.board.curses.color_pair", return_value=0), patch(
+        "carreras.board.curses.doupdate"
+    ) as doupdate:
+        board.draw_game(game, wait=False)
+        built = len(windows)
+        # Top card, 4 steps and 2 knights
+        assert built == 6 + 7
+        for window in windows:
+            window.reset_mock()
+        board.draw_game(game, wait=False)
+        assert len(windows) == built
+        assert not any(window.noutrefresh.called for window in windows)
+        game.step()
+        board.draw_game(game, wait=False)
+        repainted = [window for window in windows if window.noutrefresh.called]
+        assert 1 <= len(repainted) <= 5
+        assert doupdate.call_count == 3
+    mock_screen.refresh.assert_not_called()
+
+
+def test_board_frame(mock_screen):
+    """Test de cuadros: una sola descarga a la terminal por cuadro."""
+    board = Board(mock_screen)
+    box = Board(Mock(), board)
+    with patch("carreras.board.curses.doupdate") as doupdate:
+        with board.frame():
+            board.message("uno")
+            with box.frame():
+                box.message("dos")
+            board.message("tres")
+            doupdate.assert_not_called()
+    doupdate.assert_called_once()
+    mock_screen.refresh.assert_not_called()
+    assert mock_screen.noutrefresh.call_count == 2
+    box.screen.noutrefresh.assert_called_once()
+    assert board.frames == 1 and board.last_frame.flushes == 1
+    assert board.last_frame.bytes >= -1 and board.last_frame.writes >= -1
+    board.message("fuera")
+    mock_screen.refresh.assert_called_once()
+
+
+def test_board_ask_player_names_frames(mock_screen):
+    """Test de nombres: el error y la nueva pregunta salen en un cuadro."""
+    mock_screen.getstr = Mock(side_effect=[b"", b"A", b"A", b"B"])
+    board = Board(mock_screen)
+    with patch("carreras.board.curses.doupdate") as doupdate:
+        assert board.ask_player_names(2) == ["A", "B"]
+    assert doupdate.call_count == 4
+    mock_screen.refresh.assert_not_called()
+
+
+def test_fold_case():
+    """Test de tablas de teclas con mayúsculas y minúsculas."""
+    table = fold_case({121: 1, 78: 0, 50: 2})
+    assert table == {121: 1, 89: 1, 78: 0, 110: 0, 50: 2}
+    assert fold_case({121: 1, 89: 5})[89] == 5
+
+
+def test_board_read_key(mock_screen):
+    """Test de lectura de teclas bloqueante y con tiempo límite."""
+    mock_screen.getch = Mock(side_effect=[ord("N"), -1])
+    board = Board(mock_screen)
+    assert board.read_key(board.YES_NO_VALUES) == 0
+    mock_screen.timeout.assert_called_once_with(-1)
+    assert board.read_key(board.YES_NO_VALUES, timeout=0.25) is None
+    mock_screen.timeout.assert_called_with(250)
+    board.read_string()
+    assert mock_screen.timeout.call_count == 3
+
+
+def test_board_idle(mock_screen):
+    """Test de espera sin dibujar que sigue atendiendo las teclas."""
+    mock_screen.getch = Mock(return_value=-1)
+    board = Board(mock_screen)
+    board.idle(0.5)
+    mock_screen.timeout.assert_called_with(500)
+    board.idle(-0.1)
+    mock_screen.timeout.assert_called_with(0)
+    assert mock_screen.getch.call_count == 2
+
+
+def test_board_draw_game_changes(mock_screen):
+    """Test de cambios: tras el primer cuadro solo se aplican los cambios."""
+    window = Mock(getmaxyx=Mock(return_value=(20, 20)))
+    window.derwin = Mock(return_value=window)
+    mock_screen.derwin = Mock(return_value=window)
+    board = Board(mock_screen)
+    game = Game(2, 7, rng=0)
+    cells = Board._game_cells
+    with patch("carreras.board.curses.color_pair", return_value=0), patch(
+        "carreras.board.curses.doupdate"
+    ), patch.object(Board, "_game_cells", wraps=cells) as scan:
+        board.draw_game(game, wait=False)
+        assert game.changes == []
+        while not game.finished:
+            game.step_many(3)
+            board.draw_game(game, wait=False)
+            assert board._drawn == cells(game)
+        assert scan.call_count == 1 and game.reshuffles == 1
+        game.reset(1)
+        board.draw_game(game, wait=False)
+        assert scan.call_count == 2 and board._drawn == cells(game)
@@ -1,5 +1,10 @@
 """Tests for the Card class."""
 
+import copy
+import pickle
+
+import pytest
+
 from carreras.card import Card
 
 def test_card_initialization():
@@ -32,3 +37,29 @@ def test_card_match_suit():
     assert card.match_suit("coins")
     assert not card.match_suit("cups")
 
+def test_card_interned():
+    """Test every Card(suit, value) returns the same shared instance."""
+    assert Card("cups", 3) is Card("cups", 3)
+    assert len(Card.BY_CODE) == 48
+    assert len(set(Card.BY_CODE)) == 48
+
+def test_card_code():
+    """Test the integer code of a card and the lookup by code."""
+    card = Card("swords", 7)
+    assert card.code == 2 * 12 + 6
+    assert hash(card) == card.code
+    assert Card.from_code(card.code) is card
+
+def test_card_immutable():
+    """Test cards cannot be modified."""
+    card = Card("coins", 1)
+    with pytest.raises(AttributeError):
+        card.value = 2
+    with pytest.raises(ValueError):
+        Card("coins", 13)
+
+def test_card_pickle_keeps_identity():
+    """Test copies and pickles resolve to the shared instance."""
+    card = Card("clubs", 12)
+    assert pickle.loads(pickle.dumps(card)) is card
+    assert copy.deepcopy(card) is card
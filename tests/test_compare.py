@@ -0,0 +1,66 @@
+"""Tests for the paired comparison of configurations."""
+
+import random
+
+import pytest
+
+from carreras.compare import Config, MirroredRandom, compare, main
+from carreras.game import Game
+
+
+def test_mirrored_random_relabels_suits():
+    """Test a mirrored race is the same race with its suits rotated."""
+    for players in (2, 3, 4):
+        for seed in range(50):
+            race = Game(players, 6, rng=random.Random(seed)).run_to_completion()
+            mirror = Game(players, 6, rng=MirroredRandom(seed, players))
+            mirrored = mirror.run_to_completion()
+            assert mirrored.steps == race.steps
+            assert mirrored.winner == (race.winner + 1) % players
+            assert mirrored.rows == race.rows[-1:] + race.rows[:-1]
+
+
+def test_compare_crn_reduces_variance():
+    """Test common random numbers beat independent sampling on the same budget."""
+    first, second = Config(4, 7), Config(4, 6)
+    crn = compare(first, second, "steps", 600, "crn", seed=2, workers=1)
+    independent = compare(first, second, "steps", 600, "independent", seed=2, workers=1)
+    assert crn.samples == independent.samples == 600
+    assert crn.variance_reduction > 1.5
+    assert crn.margin() < independent.margin()
+    assert abs(crn.difference - independent.difference) < 3 * independent.margin()
+
+
+def test_compare_antithetic_wins():
+    """Test antithetic pairs play two races per sample and cut win variance."""
+    comparison = compare(
+        Config(3, 5), Config(3, 5, 2), "coins", 400, "antithetic", seed=1, workers=1
+    )
+    assert comparison.races_a.count == 800
+    assert comparison.variance_reduction > 1.5
+
+
+def test_compare_workers():
+    """Test a comparison does not depend on the number of workers."""
+    args = (Config(2, 4), Config(2, 5), "steps", 90, "crn", 4)
+    inline = compare(*args, workers=1, shard_size=30)
+    pooled = compare(*args, workers=2, shard_size=30)
+    assert inline.difference == pooled.difference
+    assert inline.diff.variance == pytest.approx(pooled.diff.variance)
+
+
+def test_compare_invalid():
+    """Test unknown methods and metrics are rejected."""
+    with pytest.raises(ValueError):
+        compare(Config(2, 4), Config(2, 5), method="bogus")
+    with pytest.raises(ValueError):
+        compare(Config(2, 4), Config(2, 5), metric="winner")
+    with pytest.raises(ValueError):
+        compare(Config(2, 4), Config(2, 5), metric="steps", method="antithetic")
+
+
+def test_main_report(capsys):
+    """Test the console script prints the comparison."""
+    main(["2:4", "2:5:2", "--samples", "50", "--workers", "1", "--seed", "1"])
+    out = capsys.readouterr().out
+    assert "Variance reduction" in out and "Difference" in out
@@ -39,3 +39,57 @@ def test_insert_card():
     deck.insert_card(card)
     assert card in deck.cards
 
+
+def test_deck_seeded_shuffle():
+    """Test decks shuffled with the same seed have the same order."""
+    first = Deck(["coins", "cups"], 12, shuffled=True, rng=3)
+    second = Deck(["coins", "cups"], 12, shuffled=True, rng=3)
+    assert first.cards == second.cards
+
+def test_deck_membership():
+    """Test membership follows extraction and insertion."""
+    deck = Deck(["coins", "cups"], 12, shuffled=True, rng=1)
+    card = Card("cups", 5)
+    assert card in deck
+    assert deck.get_card("cups", 5) is card
+    assert card not in deck
+    assert card not in deck.cards
+    assert deck.get_card("cups", 5) is None
+    deck.insert_card(card)
+    deck.insert_card(card)
+    assert card in deck
+    assert len(deck) == 24
+
+def test_deck_get_card_keeps_index():
+    """Test taking out cards in any order keeps the deck consistent."""
+    deck = Deck(["coins", "cups", "swords"], 12, shuffled=True, rng=2)
+    for value in (11, 1, 12, 6):
+        for suit in ("swords", "coins", "cups"):
+            card = deck.get_card(suit, value)
+            assert card == Card(suit, value)
+    assert len(deck) == 24
+    assert all(deck.get_card(c.suit, c.value) is c for c in list(deck.cards))
+    assert deck.mask == 0
+
+def test_deck_refill():
+    """Test refilling moves every card of the other deck."""
+    deck = Deck([], 0, rng=4)
+    discarded = Deck(["coins"], 12)
+    deck.refill(discarded)
+    assert len(deck) == 12 and len(discarded) == 0
+    assert Card("coins", 3) in deck and Card("coins", 3) not in discarded
+    discarded.insert_card(deck.get_card("coins", 3))
+    deck.refill(discarded)
+    assert len(deck) == 12 and discarded.mask == 0
+
+def test_deck_reset():
+    """Test a reset deck matches a new one and keeps its storage."""
+    deck = Deck(["coins", "cups"], 12, shuffled=True, rng=1)
+    cards = deck.cards
+    deck.get_card()
+    deck.reset(["coins", "cups", "swords"], 12, shuffled=True)
+    assert deck.cards is cards
+    fresh = Deck(["coins", "cups", "swords"], 12)
+    assert set(deck.cards) == set(fresh.cards)
+    assert all(card in deck for card in fresh.cards)
+    assert deck.get_card("swords", 3) is Card("swords", 3)
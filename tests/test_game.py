@@ -1,7 +1,22 @@
 """Tests for the Game class."""
 
-from carreras.game import Game
+import random
+
+from carreras.game import (
+    CHANGE_MOVE,
+    CHANGE_RESET,
+    CHANGE_RESHUFFLE,
+    CHANGE_REVEAL,
+    CHANGE_TOP,
+    TRACE_CARD,
+    TRACE_KIND,
+    TRACE_PENALTY,
+    TRACE_REVEAL,
+    Game,
+    GamePool,
+)
 from carreras.deck import Deck
+from carreras.replay import Replay
 
 def test_game_initialization():
     """Test Game initialization and attributes."""
@@ -26,3 +41,190 @@ def test_game_step():
     ended = game.step()
     assert isinstance(ended, bool)
 
+
+def test_game_seed_replay():
+    """Test a game replays exactly from its seed."""
+    game = Game(4, 7)
+    replay = Game(4, 7, rng=game.seed)
+    while not game.step():
+        assert not replay.step()
+        assert game.top_card == replay.top_card
+    assert replay.step()
+    assert game.knights == replay.knights
+
+
+def test_game_generator():
+    """Test a game accepts its own generator instead of a seed."""
+    game = Game(2, 4, rng=random.Random(5))
+    other = Game(2, 4, rng=random.Random(5))
+    assert game.seed is None
+    assert game.deck.cards == other.deck.cards
+
+def test_game_row_bounds():
+    """Test min_row, max_row and winner follow the knight moves."""
+    game = Game(3, 4)
+    game.move_knights("coins", 1)
+    game.move_knights("cups", 1)
+    assert (game.min_row, game.max_row) == (0, 1)
+    game.move_knights("swords", 1)
+    assert (game.min_row, game.max_row) == (1, 1)
+    game.move_knights("cups", -1)
+    assert (game.min_row, game.max_row) == (0, 1)
+    for _ in range(4):
+        game.move_knights("swords", 1)
+    assert game.max_row == 5 and game.winner == 2 and game.finished
+
+
+def test_game_views():
+    """Test the knights and steps views follow the game state."""
+    game = Game(2, 4, ["A", "B"], rng=1)
+    while not game.step():
+        pass
+    knights = game.knights
+    assert [k["row"] for k in knights.values()] == game.rows
+    assert knights[game.winner + 1]["row"] == 5
+    assert knights[1]["player"] == "A"
+    assert [s["hidden"] for s in game.steps.values()] == game.hidden
+
+
+def test_game_snapshot_restore():
+    """Test restoring a snapshot brings back the same race."""
+    game = Game(3, 5, rng=11)
+    for _ in range(8):
+        game.step()
+    snapshot = game.snapshot()
+    later = []
+    while not game.step():
+        later.append(game.top_card)
+    game.restore(snapshot)
+    assert game.snapshot() == snapshot
+    replay = []
+    while not game.step():
+        replay.append(game.top_card)
+    assert replay == later
+
+
+def test_game_clone():
+    """Test a clone plays the same race without touching the original."""
+    game = Game(4, 7, rng=3)
+    for _ in range(5):
+        game.step()
+    before = game.snapshot()
+    clone = game.clone()
+    while not clone.step():
+        pass
+    assert game.snapshot() == before
+    while not game.step():
+        pass
+    assert game.snapshot() == clone.snapshot()
+    assert game.clone(rng=1).rng is not game.rng
+
+
+def test_game_run_to_completion():
+    """Test the fast path plays the same race as stepping, and its trace."""
+    game = Game(4, 7, rng=21)
+    stepped = game.clone()
+    tops = []
+    while not stepped.step():
+        tops.append(stepped.top_card)
+    tops.append(stepped.top_card)
+    trace = bytearray(200)
+    result = game.run_to_completion(trace)
+    assert result == stepped.result()
+    assert result.winner == stepped.winner and result.rows == tuple(stepped.rows)
+    assert result.steps == len(tops)
+    kinds = [entry & TRACE_KIND for entry in trace[: result.steps]]
+    assert kinds.count(TRACE_PENALTY) == result.penalties
+    assert kinds.count(TRACE_REVEAL) - result.penalties in (0, 1)
+    for entry, top in zip(trace, tops):
+        if entry & TRACE_KIND != TRACE_REVEAL:
+            assert entry & TRACE_CARD == top.code
+
+
+def test_game_step_many():
+    """Test step_many stops at the limit and at the end of the race."""
+    game = Game(3, 5, rng=4)
+    result = game.step_many(6)
+    assert result.steps == 6 and result.winner is None
+    result = game.step_many(10000)
+    assert result.winner is not None
+    assert game.step_many(5).steps == result.steps
+
+
+def test_game_penalty():
+    """Test the penalty rule variant sends a suit back, never behind the start."""
+    game = Game(4, 7, rng=21, penalty=3)
+    before = None
+    while not game.finished:
+        before = list(game.rows)
+        step = game.min_row - 1
+        pending = step >= 0 and game.pending[step]
+        knight = game.step_cards[step].suit_index if pending else None
+        game.step()
+        if pending:
+            assert game.rows[knight] == max(0, before[knight] - 3)
+    assert game.clone().penalty == 3
+
+
+def test_game_reset():
+    """Test a reset game plays the same race as a new game with the seed."""
+    game = Game(4, 7, rng=3)
+    game.run_to_completion()
+    rows = game.rows
+    game.reset(8)
+    assert game.rows is rows and game.winner is None and game.step_count == 0
+    assert game.run_to_completion() == Game(4, 7, rng=8).run_to_completion()
+    game.reset(9, players=2, length=4, players_names=["A", "B"])
+    assert game.suits == ["coins", "cups"] and game.players_names == ["A", "B"]
+    assert game.run_to_completion() == Game(2, 4, rng=9).run_to_completion()
+
+
+def test_game_pool():
+    """Test a pool hands back released games, reset like new ones."""
+    pool = GamePool(3, 5, size=2)
+    assert len(pool) == 2
+    game = pool.acquire(3, 5, rng=4)
+    assert len(pool) == 1
+    assert game.run_to_completion() == Game(3, 5, rng=4).run_to_completion()
+    pool.release(game)
+    other = pool.acquire(2, 6, rng=5)
+    assert other.length == 6 and len(other.suits) == 2
+    assert other.run_to_completion() == Game(2, 6, rng=5).run_to_completion()
+
+
+def test_game_changes():
+    """Test the changes of a watched game rebuild what a board shows."""
+    game = Game(2, 7, rng=0)
+    replay = Replay(game, interval=100)
+    assert game.take_changes() is None
+    game.step_many(3)
+    replay.seek(3)
+    game.watch()
+    replay.game.watch()
+    rows, top, shown = list(game.rows), game.top_card, list(game.hidden)
+    reshuffles = game.reshuffles
+    while not game.finished:
+        game.step_many(2)
+        changes = game.take_changes()
+        assert replay.seek(replay.position + 2).take_changes() == changes
+        for kind, index, old, new in changes:
+            if kind == CHANGE_MOVE:
+                assert rows[index] == old
+                rows[index] = new
+            elif kind == CHANGE_REVEAL:
+                assert shown[index] and new is game.step_cards[index]
+                shown[index] = False
+            elif kind == CHANGE_TOP:
+                assert top is old
+                top = new
+            elif kind == CHANGE_RESHUFFLE:
+                reshuffles += 1
+        assert rows == game.rows and top is game.top_card
+        assert shown == game.hidden and reshuffles == game.reshuffles
+    assert reshuffles == 1
+
+    replay.seek(0)
+    assert [change.kind for change in replay.game.take_changes()] == [CHANGE_RESET]
+    assert game.clone().changes is None
+    game.reset(1)
+    assert game.changes is None
@@ -0,0 +1,57 @@
+"""Tests for the live odds estimator."""
+
+import random
+
+from carreras.game import Game
+from carreras.odds import ExactOdds, OddsEstimator, determinize, state_key
+from carreras.solver import get_solver
+
+
+def test_odds_determinize_keeps_the_table():
+    """Test dealing the unseen cards again keeps what can be seen."""
+    game = Game(4, 7, rng=6)
+    game.step_many(12)
+    before = state_key(game)
+    cards = sorted(game.deck.cards + game.step_cards, key=hash)
+    determinize(game, random.Random(1))
+    assert state_key(game) == before
+    assert sorted(game.deck.cards + game.step_cards, key=hash) == cards
+
+
+def test_odds_inline_estimate_matches_solver():
+    """Test rollouts agree with the exact odds within their interval."""
+    game = Game(3, 5, rng=2)
+    game.step_many(9)
+    estimator = OddsEstimator(workers=0, batch=500, target=4000, seed=1)
+    estimate = estimator.poll(game, budget=60)
+    assert estimate.rollouts == 4000
+    exact = get_solver(3, 5).odds(game)
+    for suit, prob in exact.wins.items():
+        assert abs(estimate.wins[suit] - prob) <= 1.5 * estimate.margins[suit] + 1e-9
+    # A revisited position is served from the cache
+    assert estimator.poll(game, budget=0).rollouts == 4000
+
+
+def test_odds_pool_and_finished_game():
+    """Test the worker pool refines a position and a finished race is exact."""
+    game = Game(2, 4, rng=3)
+    estimator = OddsEstimator(budget=5, workers=1, batch=100, target=300, seed=2)
+    try:
+        first = estimator.poll(game)
+        assert 0 < first.rollouts <= 300
+        assert abs(sum(first.wins.values()) - 1) < 1e-9
+    finally:
+        estimator.close()
+    game.run_to_completion()
+    final = estimator.poll(game)
+    assert final.wins[game.suits[game.winner]] == 1.0
+
+
+def test_exact_odds_match_solver():
+    """Test exact odds are the solver's, with no margin."""
+    game = Game(3, 5, rng=2)
+    game.step_many(9)
+    estimate = ExactOdds().poll(game)
+    assert estimate.exact and estimate.rollouts == 0
+    assert estimate.wins == get_solver(3, 5).odds(game).wins
+    assert set(estimate.margins.values()) == {0.0}
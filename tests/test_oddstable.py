@@ -0,0 +1,46 @@
+"""Tests for the precomputed odds tables."""
+
+import pytest
+
+from carreras.game import Game
+from carreras.odds import OddsEstimator
+from carreras.oddstable import OddsTable, build_table, encode
+from carreras.solver import OddsSolver
+
+
+def test_oddstable_matches_solver(tmp_path):
+    """Test table lookups give the solver's odds along a race."""
+    path = tmp_path / "odds.tbl"
+    assert build_table(path, [(2, 4), (3, 5)]) > 0
+    table = OddsTable(path)
+    assert table._data is None
+    solver = OddsSolver(3, 5)
+    game = Game(3, 5, rng=4)
+    while not game.step():
+        estimate = table.poll(game)
+        assert estimate.exact
+        # Stored as doubles, the odds are the solver's to the last bit
+        assert estimate.wins == solver.odds(game).wins
+    assert table.solver(4, 7) is None
+    table.close()
+
+
+def test_oddstable_fallback(tmp_path):
+    """Test configurations missing from the table go to the fallback."""
+    path = tmp_path / "odds.tbl"
+    build_table(path, [(2, 4)])
+    table = OddsTable(path, fallback=OddsEstimator(workers=0, batch=10, target=10))
+    estimate = table.poll(Game(2, 5, rng=1), budget=10)
+    assert not estimate.exact and estimate.rollouts == 10
+    table.close()
+
+
+def test_oddstable_keys_and_bad_file(tmp_path):
+    """Test states get distinct keys and other files are rejected."""
+    assert encode((True, ((0, 11, 0, 0), (1, 10, 0, 1)))) != encode(
+        (False, ((0, 11, 0, 0), (1, 10, 0, 1)))
+    )
+    path = tmp_path / "other"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        OddsTable(path).solver(2, 4)
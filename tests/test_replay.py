@@ -0,0 +1,38 @@
+"""Tests for the seekable replays."""
+
+from carreras.game import Game
+from carreras.replay import Replay
+
+
+def test_replay_seek_matches_stepping():
+    """Test every step of a replay shows the state the race had."""
+    game = Game(4, 7, rng=8)
+    replay = Replay(game, interval=5)
+    snapshots = [game.snapshot()]
+    while not game.step():
+        snapshots.append(game.snapshot())
+    assert replay.steps == len(snapshots)
+    for step in (len(snapshots) - 1, 3, 12, 11, 0, 7, 20):
+        assert replay.seek(step).snapshot()[2:] == snapshots[step][2:]
+    assert replay.forward(2).step_count == 22
+    assert replay.backward(30).step_count == 0
+    assert replay.seek(10000).finished
+
+
+def test_replay_reshuffles():
+    """Test seeking works across reshuffles of the discard pile."""
+    game = Game(2, 10, rng=0)
+    replay = Replay(game, interval=8)
+    game.run_to_completion()
+    assert game.reshuffles
+    end = replay.seek(replay.steps)
+    assert end.result() == game.result()
+    assert end.reshuffles == game.reshuffles
+    assert replay.seek(replay.steps - 1).winner is None
+
+
+def test_replay_ends_on_keyframe():
+    """Test the last step is reached when the race ends on a keyframe."""
+    game = Game(3, 5, rng=9)
+    replay = Replay(game, interval=1)
+    assert replay.seek(replay.steps).result() == game.run_to_completion()
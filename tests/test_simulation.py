@@ -0,0 +1,99 @@
+"""Tests for the headless simulation."""
+
+import random
+
+from carreras.game import Game
+from carreras.simulation import (
+    SimulationResult,
+    main,
+    run_race,
+    shard_seed,
+    simulate,
+    simulate_parallel,
+    simulate_until,
+)
+
+
+def test_run_race():
+    """Test a race runs to the end and reports its winner."""
+    game = Game(3, 4)
+    winner, steps = run_race(game)
+    assert winner in ["coins", "cups", "swords"]
+    assert steps > 4
+
+
+def test_simulate_tallies():
+    """Test simulate counts every race once."""
+    result = simulate(2, 4, 50)
+    assert result.races == 50
+    assert sum(result.wins.values()) == 50
+    assert sum(result.lengths.values()) == 50
+    assert set(result.wins) <= {"coins", "cups"}
+    assert result.races_per_second > 0
+
+
+def test_simulate_int_seed():
+    """Test an int seed deals different races, the same ones every time."""
+    result = simulate(4, 7, 50, rng=5)
+    assert len(result.lengths) > 1 and len(result.wins) > 1
+    assert simulate(4, 7, 50, rng=5).lengths == result.lengths
+    assert simulate(4, 7, 50, rng=random.Random(5)).lengths == result.lengths
+
+
+def test_result_merge():
+    """Test merging two results adds their tallies."""
+    first = simulate(2, 4, 10)
+    second = simulate(2, 4, 15)
+    total = SimulationResult(2, 4)
+    total.merge(first)
+    total.merge(second)
+    assert total.races == 25
+    assert total.wins == first.wins + second.wins
+
+
+def test_main_report(capsys):
+    """Test the console script prints a report."""
+    main(["--players", "2", "--length", "4", "--races", "20", "--workers", "1"])
+    out = capsys.readouterr().out
+    assert "Races: 20" in out
+    assert "races/s" in out
+
+
+def test_shard_seed():
+    """Test shard seeds are stable and differ between shards."""
+    assert shard_seed(1, 0) == shard_seed(1, 0)
+    assert shard_seed(1, 0) != shard_seed(1, 1)
+    assert shard_seed(1, 0) != shard_seed(2, 0)
+
+
+def test_simulate_parallel_workers():
+    """Test a job gives the same tallies with any number of workers."""
+    inline = simulate_parallel(3, 4, 120, seed=9, workers=1, shard_size=25)
+    pooled = simulate_parallel(3, 4, 120, seed=9, workers=2, shard_size=25)
+    assert inline.races == pooled.races == 120
+    assert inline.wins == pooled.wins
+    assert inline.lengths == pooled.lengths
+
+
+def test_simulate_until_margin():
+    """Test an adaptive job stops once every interval is within the margin."""
+    result = simulate_until(
+        2, 4, margin=0.03, confidence=0.95, seed=5, workers=1, shard_size=100
+    )
+    margins = result.margins(0.95)
+    assert max(margins.values()) <= 0.03
+    assert result.races % 100 == 0
+    assert result.races < 4000
+    # The same shards as a fixed job of that size
+    fixed = simulate_parallel(2, 4, result.races, seed=5, workers=1, shard_size=100)
+    assert fixed.wins == result.wins
+    assert "±" in result.report()
+
+
+def test_simulate_until_max_races():
+    """Test an adaptive job stops at its cap when the target is not met."""
+    result = simulate_until(
+        3, 4, margin=0.0001, workers=1, shard_size=50, max_races=200
+    )
+    assert result.races == 200
+    assert max(result.margins(0.99).values()) > 0.0001
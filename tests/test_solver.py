@@ -0,0 +1,65 @@
+"""Tests for the exact odds solver."""
+
+import pytest
+
+from carreras.game import Game
+from carreras.solver import OddsSolver, race_odds
+
+
+def test_race_odds_symmetric():
+    """Test a race that has not started is fair for every suit."""
+    odds = race_odds(3, 5)
+    assert odds.wins == pytest.approx({"coins": 1 / 3, "cups": 1 / 3, "swords": 1 / 3})
+    assert 5 < odds.steps < 50
+
+
+def test_fresh_game_matches_initial_odds():
+    """Test the odds of a new game are the odds of the configuration."""
+    solver = OddsSolver(2, 4)
+    odds = solver.odds(Game(2, 4, rng=1))
+    assert odds.wins == pytest.approx(solver.initial_odds().wins)
+    assert odds.steps == pytest.approx(solver.initial_odds().steps)
+
+
+def test_finished_game_odds():
+    """Test a finished game is won by its winner."""
+    game = Game(2, 4, rng=2)
+    while not game.step():
+        pass
+    odds = OddsSolver(2, 4).odds(game)
+    assert odds.wins[game.suits[game.winner]] == 1.0
+    assert odds.steps == 0.0
+
+
+@pytest.mark.parametrize("players,length,at", [(2, 4, 6), (3, 5, 9), (2, 10, 24)])
+def test_conditional_odds_calibrated(players, length, at):
+    """Test mid-race odds match the outcomes of the races they predict."""
+    solver = OddsSolver(players, length)
+    races = 3000
+    # Weighting by the lead of coins over cups catches odds that ignore the state
+    error = bound = 0.0
+    predicted_steps = observed_steps = 0.0
+    reshuffled = 0
+    for seed in range(races):
+        game = Game(players, length, rng=seed)
+        steps = 0
+        ended = False
+        while steps < at and not ended:
+            ended = game.step()
+            steps += 1
+        odds = solver.odds(game)
+        assert sum(odds.wins.values()) == pytest.approx(1.0)
+        predicted = odds.wins["coins"]
+        lead = game.rows[0] - game.rows[1]
+        predicted_steps += steps + odds.steps
+        reshuffled += bool(game.reshuffles)
+        while not ended:
+            ended = game.step()
+            steps += 1
+        error += ((game.winner == 0) - predicted) * lead
+        bound += lead * lead / 4
+        observed_steps += steps
+    if length == 10:
+        assert reshuffled
+    assert abs(error) < 4 * bound ** 0.5
+    assert abs(predicted_steps - observed_steps) / races < 0.5
@@ -0,0 +1,71 @@
+"""Tests for the parameter sweep."""
+
+import pytest
+
+from carreras.simulation import run_shard, shard_seed
+from carreras.sweep import Cell, Sweep, SweepCache, table
+
+
+def test_sweep_matches_shards():
+    """Test every cell merges the seeded shards of its configuration."""
+    sweep = Sweep((2, 3), (4,), (1, 2), races=250, seed=3, shard_size=100)
+    assert sweep.races == 250 and sweep.shards == 3 and len(sweep.cells) == 4
+    results = sweep.run(workers=1)
+    expected = run_shard(3, 4, 100, shard_seed(3, 0), penalty=2)
+    expected.merge(run_shard(3, 4, 100, shard_seed(3, 1), penalty=2))
+    expected.merge(run_shard(3, 4, 50, shard_seed(3, 2), penalty=2))
+    result = results[Cell(3, 4, 2)]
+    assert result.races == 250
+    assert result.wins == expected.wins and result.lengths == expected.lengths
+    rows = list(table(results))
+    assert len(rows) == 4 and rows[0][:4] == (2, 4, 1, 250)
+    assert rows[0][-2:] == ("", "")
+
+
+def test_sweep_cache_reuse(tmp_path):
+    """Test a sweep reuses cached shards and only runs the missing ones."""
+    cache = SweepCache(str(tmp_path))
+    small = Sweep((2,), (4, 5), races=200, seed=9, shard_size=100, cache=cache)
+    small.run(workers=1)
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+    big = Sweep((2,), (4, 5), races=400, seed=9, shard_size=100, cache=cache)
+    fresh = Sweep((2,), (4, 5), races=400, seed=9, shard_size=100)
+    stored = {cell: cache.load(big._key(cell)) for cell in big.cells}
+    assert len(list(big._missing(stored))) == 4
+    extended = big.run(workers=1)
+    reference = fresh.run(workers=1)
+    for cell in big.cells:
+        assert extended[cell].wins == reference[cell].wins
+        assert extended[cell].lengths == reference[cell].lengths
+    assert len(cache.load(big._key(big.cells[0]))) == 4
+
+    # Fewer races reuse a prefix, a different seed starts from scratch
+    fewer = Sweep((2,), (4,), races=100, seed=9, shard_size=100, cache=cache)
+    stored = {cell: cache.load(fewer._key(cell))[:1] for cell in fewer.cells}
+    assert not list(fewer._missing(stored))
+    other = Sweep((2,), (4,), races=100, seed=10, shard_size=100, cache=cache)
+    assert cache.load(other._key(other.cells[0])) == []
+
+
+def test_sweep_partial_shard(tmp_path):
+    """Test a sweep plays the races asked for, not whole shards."""
+    cache = SweepCache(str(tmp_path))
+    small = Sweep((2,), (4,), races=30, seed=5, cache=cache)
+    assert small.run(workers=1)[Cell(2, 4, 1)].races == 30
+    # The partial shard is played again in full by a longer sweep
+    longer = Sweep((2,), (4,), races=70, seed=5, shard_size=50, cache=cache)
+    assert longer.run(workers=1)[Cell(2, 4, 1)].races == 70
+    again = Sweep((2,), (4,), races=15000, seed=5, cache=cache)
+    result = again.run(workers=1)[Cell(2, 4, 1)]
+    assert result.races == 15000
+    assert [part.races for part in cache.load(again._key(again.cells[0]))] == [
+        10000,
+        5000,
+    ]
+
+
+def test_sweep_invalid():
+    """Test a sweep rejects more players than suits."""
+    with pytest.raises(ValueError):
+        Sweep((5,), (4,))
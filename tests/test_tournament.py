@@ -0,0 +1,54 @@
+"""Tests for the tournaments."""
+
+import csv
+from unittest.mock import Mock
+
+import pytest
+
+from carreras.tournament import Standings, Tournament, main, play_race
+
+
+def test_tournament_schedule():
+    """Test the schedule rotates seats and covers every series."""
+    tournament = Tournament(["A", "B", "C"], players=[2, 3], lengths=[4, 5], races=3)
+    specs = list(tournament.schedule())
+    assert len(specs) == len(tournament) == 12
+    assert [spec.seats for spec in specs[:3]] == [("A", "B"), ("B", "C"), ("C", "A")]
+    assert len({spec.seed for spec in specs}) == 12
+    with pytest.raises(ValueError):
+        Tournament(["A", "B"], players=[3])
+
+
+def test_tournament_standings_do_not_depend_on_workers():
+    """Test parallel and inline runs give the same standings."""
+    tournament = Tournament(["A", "B", "C", "D"], [2, 4], [4, 7], races=20, seed=5)
+    seen = []
+    inline = tournament.run(workers=1, on_result=lambda o, s: seen.append(o.index))
+    parallel = tournament.run(workers=2, batch=7)
+    assert seen == list(range(80))
+    assert list(inline.rows()) == list(parallel.rows())
+    assert inline.races == 80
+    assert sum(e.wins for e in inline.entries.values()) == 80
+
+
+def test_tournament_points():
+    """Test points count the knights finished behind."""
+    standings = Standings()
+    spec = next(Tournament(["A", "B", "C"], [3], [4], seed=1).schedule())
+    outcome = play_race(spec)
+    standings.update(outcome)
+    winner = standings.entries[outcome.seats[outcome.winner]]
+    assert winner.wins == 1 and winner.points == 2
+
+
+def test_tournament_show_and_main(tmp_path):
+    """Test a shown tournament and the console script."""
+    board = Mock()
+    standings = Tournament(["A", "B"], [2], [4], races=2).show(board)
+    assert standings.races == 2 and board.draw_game.call_count > 4
+    output = tmp_path / "table.csv"
+    main(["A", "B", "C", "--players", "2", "--races", "5", "--seed", "1",
+          "--workers", "1", "--output", str(output)])
+    with open(output, encoding="utf-8") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == list(Standings.FIELDS) and len(rows) == 4
@@ -0,0 +1,58 @@
+"""Tests for the race traces."""
+
+import pytest
+
+from carreras.game import Game, TRACE_RESHUFFLE
+from carreras.trace import (
+    TRACE_END,
+    TRACE_START,
+    TraceEvent,
+    TraceReader,
+    TraceWriter,
+    moves,
+)
+
+
+def test_trace_round_trip(tmp_path):
+    """Test a recorded race reads back and replays its knight moves."""
+    path = tmp_path / "races.trace"
+    games = []
+    with TraceWriter(path, buffer_size=8) as writer:
+        for seed in range(3):
+            games.append(writer.record(Game(4, 7, rng=seed)))
+        assert games[0].recorder is None
+    with TraceReader(path) as reader:
+        races = list(reader.races())
+        events = list(reader)
+        assert len(races) == 3
+        for (players, length, winner, steps), game in zip(races, games):
+            assert (players, length, winner) == (4, 7, game.winner)
+            assert len(steps) == game.step_count + game.reshuffles
+        assert events[0] == (TRACE_START, 4, 7)
+        assert sum(event.kind == TRACE_END for event in events) == 3
+        first = events[: events.index(TraceEvent(TRACE_END, games[0].winner)) + 1]
+        rows = [0] * 4
+        for knight, step in moves(first):
+            rows[knight] += step
+        assert rows == games[0].rows
+
+
+def test_trace_reshuffles_and_append(tmp_path):
+    """Test reshuffles are recorded and a file can be appended to."""
+    path = tmp_path / "long.trace"
+    with TraceWriter(path) as writer:
+        game = writer.record(Game(2, 10, rng=0))
+    with TraceWriter(path) as writer:
+        writer.record(Game(2, 4, rng=5))
+    with TraceReader(path) as reader:
+        kinds = [event.kind for event in reader.events()]
+        assert kinds.count(TRACE_RESHUFFLE) == game.reshuffles > 0
+        assert [race[:2] for race in reader.races()] == [(2, 10), (2, 4)]
+
+
+def test_trace_bad_file(tmp_path):
+    """Test a file that is not a trace is rejected."""
+    path = tmp_path / "other"
+    path.write_bytes(b"not a trace")
+    with pytest.raises(ValueError):
+        TraceReader(path)
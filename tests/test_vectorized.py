@@ -0,0 +1,76 @@
+"""Tests for the NumPy vectorized engine."""
+
+import random
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from carreras.simulation import simulate, simulate_vectorized  # noqa: E402
+from carreras.vectorized import VectorizedRaces  # noqa: E402
+
+
+def test_vectorized_run():
+    """Test every race of a batch ends with a winner past the finish line."""
+    engine = VectorizedRaces(500, 3, 5, rng=1).run()
+    assert engine.running == 0
+    assert ((engine.winner >= 0) & (engine.winner < 3)).all()
+    assert (engine.rows[np.arange(500), engine.winner] == 6).all()
+    assert (engine.rows.max(axis=1) == 6).all()
+    assert (engine.steps > 5).all()
+
+
+def test_vectorized_seed():
+    """Test the same seed replays the same races."""
+    first = VectorizedRaces(200, 4, 7, rng=7).run()
+    second = VectorizedRaces(200, 4, 7, rng=7).run()
+    assert (first.steps == second.steps).all()
+    assert (first.winner == second.winner).all()
+
+
+@pytest.mark.parametrize("players,length", [(4, 7), (2, 10)])
+def test_vectorized_matches_game(players, length):
+    """Test the vectorized engine has the same distribution as Game."""
+    random.seed(1234)
+    reference = simulate(players, length, 2000)
+    engine = VectorizedRaces(40000, players, length, rng=1234).run()
+    if length == 10:
+        assert engine.reshuffles.any()
+
+    steps = np.repeat(*zip(*reference.lengths.items()))
+    stderr = (steps.var() / steps.size + engine.steps.var() / engine.races) ** 0.5
+    assert abs(steps.mean() - engine.steps.mean()) < 5 * stderr
+
+    wins = np.bincount(engine.winner, minlength=players) / engine.races
+    for suit, expected in zip(["coins", "cups", "swords", "clubs"], wins):
+        observed = reference.wins[suit] / reference.races
+        stderr = (expected * (1 - expected) / reference.races) ** 0.5
+        assert abs(observed - expected) < 5 * stderr
+
+
+def test_simulate_vectorized():
+    """Test the vectorized simulation tallies every race."""
+    result = simulate_vectorized(2, 4, 2500, batch=1000, rng=3)
+    assert result.races == 2500
+    assert sum(result.wins.values()) == 2500
+    assert sum(result.lengths.values()) == 2500
+
+
+def test_vectorized_invalid_players():
+    """Test a batch rejects more players than suits, or none."""
+    for players in (0, 5):
+        with pytest.raises(ValueError):
+            VectorizedRaces(10, players, 7)
+
+
+def test_vectorized_speedup():
+    """Test the engine is well ahead of Game; see VectorizedRaces for figures."""
+    start = time.perf_counter()
+    VectorizedRaces(50000, 4, 7, rng=1).run()
+    vectorized = 50000 / (time.perf_counter() - start)
+    start = time.perf_counter()
+    simulate(4, 7, 2000, rng=1)
+    scalar = 2000 / (time.perf_counter() - start)
+    # About 30x on an idle machine; the margin absorbs a loaded one
+    assert vectorized > 10 * scalar